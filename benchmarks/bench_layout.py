@@ -0,0 +1,65 @@
+# Extracția per bloc cu layout-ul detectat vs. forțat pe GENERIC_LAYOUT (toate variantele de regex).
+# Blocurile fără „Total EA” (--fara-total-ea) arată costul fallback-urilor pe care layout-ul le sare.
+# Rulare: python -m benchmarks.bench_layout [--blocuri 200] [--fara-total-ea 0.5] [--repetari 3]
+import argparse
+import contextlib
+import io
+import json
+import random
+import time
+
+import extrage_facturi
+from extrage_facturi import DocumentContext, collect_metrics, extract_data_from_text, split_pdf_by_blocuri
+from .sintetic import factura_text
+
+
+def time_blocks(blocuri, full_text, layout, repetari):
+    best = float("inf")
+    for _ in range(repetari):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            context = DocumentContext(full_text, layout=layout)
+            rows = [extract_data_from_text(bloc, context=context) for bloc in blocuri]
+        best = min(best, time.perf_counter() - start)
+    return best / len(blocuri), rows
+
+
+def regex_calls(blocuri, full_text, layout):
+    with collect_metrics() as metrics:
+        context = DocumentContext(full_text, layout=layout)
+        for bloc in blocuri:
+            extract_data_from_text(bloc, context=context)
+    return sum(e["hit"] + e["miss"] for e in metrics.to_dict()["regex"].values()) / len(blocuri)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocuri", type=int, default=200)
+    parser.add_argument("--fara-total-ea", type=float, default=0.5, help="Fracțiunea de blocuri fără „Total EA”")
+    parser.add_argument("--repetari", type=int, default=3)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    full_text = factura_text(0, args.blocuri)
+    full_text = "DETALII LOC DE CONSUM".join(
+        part.replace("Total EA", "Consum EA") if rnd.random() < args.fara_total_ea else part
+        for part in full_text.split("DETALII LOC DE CONSUM"))
+    blocuri = split_pdf_by_blocuri(full_text)
+
+    layout = extrage_facturi.detect_layout(full_text)
+    sec_layout, rows_layout = time_blocks(blocuri, full_text, layout, args.repetari)
+    sec_generic, rows_generic = time_blocks(blocuri, full_text, "generic", args.repetari)
+    print(json.dumps({
+        "parser_version": extrage_facturi.PARSER_VERSION,
+        "layout": layout,
+        "blocuri": len(blocuri),
+        "sec_per_bloc_layout": sec_layout,
+        "sec_per_bloc_generic": sec_generic,
+        "regex_per_bloc_layout": regex_calls(blocuri, full_text, layout),
+        "regex_per_bloc_generic": regex_calls(blocuri, full_text, "generic"),
+        "randuri_identice": rows_layout == rows_generic,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
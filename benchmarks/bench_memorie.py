@@ -0,0 +1,59 @@
+# Memoria ocupată de un lot de rânduri extrase: dict per rând (vechea reprezentare) vs. InvoiceRow (__slots__).
+# Rulare: python -m benchmarks.bench_memorie [--randuri 50000]
+import argparse
+import contextlib
+import io
+import json
+import tracemalloc
+
+import fitz
+
+from extrage_facturi import ROW_FIELDS, InvoiceRow, extract_rows_from_document
+from .sintetic import factura_pdf
+
+
+def template_values(blocuri=20):
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows, _ = extract_rows_from_document(fitz.open(stream=factura_pdf(0, blocuri), filetype="pdf"))
+    return [row.values() for row in rows]
+
+
+_PER_BLOC = {ROW_FIELDS.index("loc_consum"), ROW_FIELDS.index("POD")}
+
+
+def row_values(templates, i):
+    # Ca în extracția reală: numerele și textele din bloc sunt obiecte noi per rând,
+    # textele din antet (factură, date, fișier) sunt partajate de rândurile aceluiași document
+    values = templates[i % len(templates)]
+    return [v + i if isinstance(v, float) else f"{v}{i}" if j in _PER_BLOC else v for j, v in enumerate(values)]
+
+
+def measure(build, randuri, templates):
+    tracemalloc.start()
+    rows = [build(row_values(templates, i)) for i in range(randuri)]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--randuri", type=int, default=50000)
+    args = parser.parse_args()
+
+    templates = template_values()
+    as_dict, _ = measure(lambda values: InvoiceRow.from_values(values).to_dict(), args.randuri, templates)
+    as_row, _ = measure(InvoiceRow.from_values, args.randuri, templates)
+
+    print(json.dumps({
+        "randuri": args.randuri,
+        "mb_dict": as_dict / 2 ** 20,
+        "mb_invoice_row": as_row / 2 ** 20,
+        "bytes_per_rand_dict": as_dict / args.randuri,
+        "bytes_per_rand_invoice_row": as_row / args.randuri,
+        "reducere": 1 - as_row / as_dict,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
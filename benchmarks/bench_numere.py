@@ -0,0 +1,66 @@
+# Conversia numerelor românești (1.234,56 / −12,00): vechea variantă (patru replace-uri + re.sub la fiecare valoare)
+# vs. parse_number (replace-urile doar pentru text non-ASCII, regex-ul de mii doar când valoarea conține „.”).
+# Rulare: python -m benchmarks.bench_numere [--valori 100000] [--repetari 3]
+import argparse
+import json
+import random
+import re
+import time
+
+from extrage_facturi import parse_number, sum_numbers
+
+_PUNCTE_MII_VECHI = re.compile(r'(?<=\d)\.(?=\d{3}(?:\D|$))')
+
+
+def parse_number_vechi(val):
+    if not val:
+        return 0
+    val = val.replace('\xa0', '').replace("−", "-").replace("–", "-").replace("—", "-")
+    val = _PUNCTE_MII_VECHI.sub('', val)
+    val = val.replace(",", ".")
+    try:
+        return float(val)
+    except ValueError:
+        return 0
+
+
+def numar_romanesc(rnd):
+    x = rnd.uniform(0, 1_000_000) * rnd.choice((1, 1, 1, -1))
+    text = f"{abs(x):,.{rnd.choice((0, 2, 3))}f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    if x < 0:
+        text = rnd.choice("-−–") + text
+    return rnd.choice((text, text, text.replace(".", "\xa0"), "", "1.2.3"))
+
+
+def best_of(repetari, func):
+    best = float("inf")
+    for _ in range(repetari):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--valori", type=int, default=100_000)
+    parser.add_argument("--repetari", type=int, default=3)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    valori = [numar_romanesc(rnd) for _ in range(args.valori)]
+
+    sec_vechi, vechi = best_of(args.repetari, lambda: [parse_number_vechi(v) for v in valori])
+    sec_scalar, scalar = best_of(args.repetari, lambda: [parse_number(v) for v in valori])
+    print(json.dumps({
+        "valori": len(valori),
+        "sec_scalar_vechi": sec_vechi,
+        "sec_parse_number": sec_scalar,
+        "accelerare": sec_vechi / sec_scalar,
+        "valori_identice": vechi == scalar,
+        "sume_identice": sum(vechi) == sum_numbers(valori),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
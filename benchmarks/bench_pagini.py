@@ -0,0 +1,48 @@
+# Timpul per document cu selecția paginilor + flag-uri rapide vs. toate paginile cu flag-urile implicite.
+# Rulare: python -m benchmarks.bench_pagini [--blocuri 20] [--pagini-extra 10] [--repetari 5]
+import argparse
+import contextlib
+import io
+import json
+import time
+
+import fitz
+
+from extrage_facturi import PAGE_TEXT_FLAGS, extract_rows_from_document
+from .sintetic import factura_pdf
+
+
+def time_document(pdf_bytes, repetari, **page_options):
+    best = float("inf")
+    for _ in range(repetari):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            rows, _ = extract_rows_from_document(fitz.open(stream=pdf_bytes, filetype="pdf"), **page_options)
+        best = min(best, time.perf_counter() - start)
+    return best, len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocuri", type=int, default=20)
+    parser.add_argument("--pagini-extra", type=int, default=10)
+    parser.add_argument("--repetari", type=int, default=5)
+    args = parser.parse_args()
+
+    pdf_bytes = factura_pdf(0, args.blocuri, pagini_extra=args.pagini_extra)
+    toate, rows_toate = time_document(pdf_bytes, args.repetari, flags=fitz.TEXTFLAGS_TEXT, only_relevant=False)
+    selectiv, rows_selectiv = time_document(pdf_bytes, args.repetari, flags=PAGE_TEXT_FLAGS, only_relevant=True)
+
+    print(json.dumps({
+        "pagini": fitz.open(stream=pdf_bytes, filetype="pdf").page_count,
+        "pagini_extra": args.pagini_extra,
+        "blocuri": args.blocuri,
+        "sec_toate_paginile": toate,
+        "sec_pagini_selectate": selectiv,
+        "sec_economisite": toate - selectiv,
+        "randuri_identice": rows_toate == rows_selectiv,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Extracția per bloc: extractorul actual (PATTERNS precompilate, DocumentContext) față de extractorul inițial
+# (benchmarks/extractor_initial.py: re.search pe șiruri + fallback-uri pe tot documentul pentru fiecare bloc),
+# pe aceleași blocuri; verifică și că ambele dau aceleași valori.
+# Rulare: python -m benchmarks.bench_regex [--blocuri 200] [--repetari 3]
+import argparse
+import contextlib
+import io
+import json
+import time
+
+import extrage_facturi
+from extrage_facturi import DocumentContext, extract_data_from_text, split_pdf_by_blocuri
+from . import extractor_initial
+from .sintetic import factura_text
+
+
+def time_blocks(extract, blocuri, repetari):
+    best = float("inf")
+    for _ in range(repetari):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            rows = extract(blocuri)
+        best = min(best, time.perf_counter() - start)
+    return best / len(blocuri), rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocuri", type=int, default=200)
+    parser.add_argument("--repetari", type=int, default=3)
+    args = parser.parse_args()
+
+    full_text = factura_text(0, args.blocuri)
+    blocuri = split_pdf_by_blocuri(full_text)
+
+    def actual(blocuri):
+        context = DocumentContext(full_text)
+        return [extract_data_from_text(bloc, context=context).to_dict() for bloc in blocuri]
+
+    def initial(blocuri):
+        return [extractor_initial.extract_data_from_text(bloc, global_text=full_text) for bloc in blocuri]
+
+    sec_actual, rows_actual = time_blocks(actual, blocuri, args.repetari)
+    sec_initial, rows_initial = time_blocks(initial, blocuri, args.repetari)
+    rezultat = {
+        "parser_version": extrage_facturi.PARSER_VERSION,
+        "blocuri": len(blocuri),
+        "sec_per_bloc_initial": sec_initial,
+        "sec_per_bloc_actual": sec_actual,
+        "accelerare": round(sec_initial / sec_actual, 2),
+        # câmpurile extractorului inițial; cele adăugate ulterior (fisier, alerte, ...) nu se compară
+        "randuri_identice": all({name: row[name] for name in old} == old
+                                for row, old in zip(rows_actual, rows_initial)),
+    }
+    print(json.dumps(rezultat, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# Timpul validării pe lot (validate_rows) pentru un batch mare de rânduri sintetice.
+# Rulare: python -m benchmarks.bench_validare [--randuri 100000] [--lot 5000]
+import argparse
+import contextlib
+import copy
+import io
+import json
+import time
+
+import fitz
+
+from extrage_facturi import VALIDATION_RULES, extract_rows_from_document, validate_rows
+from .sintetic import factura_pdf
+
+
+def synthetic_rows(randuri, blocuri=20):
+    with contextlib.redirect_stdout(io.StringIO()):
+        template, _ = extract_rows_from_document(fitz.open(stream=factura_pdf(0, blocuri), filetype="pdf"))
+    rows = []
+    for i in range(randuri):
+        data = copy.copy(template[i % len(template)])
+        data["POD"] = f"RO005E{i:09d}"
+        rows.append(data)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--randuri", type=int, default=100000)
+    parser.add_argument("--lot", type=int, default=5000)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.randuri)
+    start = time.perf_counter()
+    state = {}
+    for i in range(0, len(rows), args.lot):
+        validate_rows(rows[i:i + args.lot], VALIDATION_RULES, state)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        "randuri": len(rows),
+        "lot": args.lot,
+        "sec_validare": elapsed,
+        "us_per_rand": elapsed / len(rows) * 1e6,
+        "randuri_cu_alerte": sum(1 for data in rows if data["alerte"]),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
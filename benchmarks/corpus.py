@@ -0,0 +1,48 @@
+# Generează offline un corpus de facturi PDF sintetice.
+# Rulare: python -m benchmarks.corpus <director> [--fisiere 20] [--blocuri 10] [--pagini-extra 2]
+import argparse
+import os
+
+from .sintetic import factura_pdf
+
+
+def generate_corpus(directory, fisiere=20, blocuri=10, pagini_extra=2, linii_pe_pagina=50, seed=0):
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(fisiere):
+        path = os.path.join(directory, f"factura_{i:04d}.pdf")
+        with open(path, "wb") as f:
+            f.write(factura_pdf(i, blocuri, pagini_extra=pagini_extra, linii_pe_pagina=linii_pe_pagina, seed=seed))
+        paths.append(path)
+    return paths
+
+
+def add_corpus_arguments(parser):
+    parser.add_argument("--fisiere", type=int, default=20, help="Numărul de PDF-uri generate")
+    parser.add_argument("--blocuri", type=int, default=10, help="Locuri de consum (blocuri POD) per factură")
+    parser.add_argument("--pagini-extra", type=int, default=2, help="Pagini de termeni/reclame per factură")
+    parser.add_argument("--linii-pe-pagina", type=int, default=50, help="Linii de text per pagină")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def corpus_options(args):
+    return {
+        "fisiere": args.fisiere,
+        "blocuri": args.blocuri,
+        "pagini_extra": args.pagini_extra,
+        "linii_pe_pagina": args.linii_pe_pagina,
+        "seed": args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("director")
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+    paths = generate_corpus(args.director, **corpus_options(args))
+    print(f"[✔] {len(paths)} facturi generate în {args.director}")
+
+
+if __name__ == "__main__":
+    main()
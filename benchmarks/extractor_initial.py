@@ -0,0 +1,201 @@
+# Copie înghețată a extractorului inițial (înainte de PATTERNS / DocumentContext), păstrată doar ca referință
+# „înainte” pentru benchmark-uri: re.search pe șiruri, fallback-uri pe tot documentul pentru fiecare bloc.
+# Nu se modifică odată cu extrage_facturi.py.
+import re
+
+
+def parse_number(val):
+    if not val:
+        return 0
+    val = val.replace('\xa0', '').replace("−", "-").replace("–", "-").replace("—", "-")
+    val = re.sub(r'(?<=\d)\.(?=\d{3}(?:\D|$))', '', val)  # elimină puncte de mii
+    val = val.replace(",", ".")
+    try:
+        return float(val)
+    except ValueError:
+        return 0
+
+
+def extract_all_indexes(text, fallback_text=None):
+    if fallback_text is None:
+        fallback_text = text
+
+    def extract_index_pair(regex):
+        match = re.search(regex, text, re.IGNORECASE)
+        if not match:
+            match = re.search(regex, fallback_text, re.IGNORECASE)
+        if match:
+            return parse_number(match.group(1)), parse_number(match.group(2))
+        return 0, 0
+
+    # Acceptăm "Citire distribuitor" SAU "Estimare convenție" după valorile numerice
+    pattern_common = r"(\d{1,3}(?:\.\d{3})*,\d+)\s+(?:Citire distribuitor|Estimare convenție)\s+(\d{1,3}(?:\.\d{3})*,\d+)\s+(?:Citire distribuitor|Estimare convenție)"
+
+    activ_v, activ_n = extract_index_pair(r"Energie activ[ăa].*?" + pattern_common)
+    inductiv_v, inductiv_n = extract_index_pair(r"Energie reactiv[ăa] inductiv[ăa].*?" + pattern_common)
+    capacitiv_v, capacitiv_n = extract_index_pair(r"Energie reactiv[ăa] capacitiv[ăa].*?" + pattern_common)
+
+    return {
+        "index_activ_vechi": activ_v,
+        "index_activ_nou": activ_n,
+        "index_reactivi_vechi": inductiv_v,
+        "index_reactivi_nou": inductiv_n,
+        "index_reactivc_vechi": capacitiv_v,
+        "index_reactivc_nou": capacitiv_n
+    }
+
+
+def extract_sume_cantitati(text, fallback_text=None):
+    if fallback_text is None:
+        fallback_text = text
+
+    # Încercăm să izolăm secțiunea „DETALII CITIRI” până la următoarea secțiune
+    match_citiri = re.search(r"DETALII CITIRI(.*?)DETALII PRODUSE", fallback_text, re.DOTALL | re.IGNORECASE)
+    citiri_text = " ".join(match.group(1) for match in re.finditer(
+        r"DETALII CITIRI(.*?)(?=DETALII CITIRI|DETALII PRODUSE|TOTAL|$)", fallback_text, re.DOTALL | re.IGNORECASE))
+
+    match_total = re.search(r"Total loc de consum.*?([\-−–]?\d{1,3}(?:[.,]\d{3})*[.,]?\d+)\s*kWh", fallback_text)
+
+
+    def suma_cantitati(denumire):
+        pattern = rf"{denumire}.*?(?:\d{{2}}\.\d{{2}}\.\d{{4}})?\s*[\d.,]+\s*Citire.*?[\d.,]+\s*Citire.*?([\d.,]+)"
+        matches = re.findall(pattern, citiri_text, re.IGNORECASE)
+        if not matches:
+            matches = re.findall(pattern, fallback_text, re.IGNORECASE)
+        return sum(parse_number(v) for v in matches)
+
+    def suma_cantitate_facturata(denumire_fix, x_type="X1", src=None):
+        if src is None:
+            src = text  # fallback
+
+        # Normalizează
+        src = src.replace('\n', ' ').replace('\xa0', ' ').replace('\r', ' ')
+        src = re.sub(r'\s+', ' ', src)
+
+        # Construim un regex robust care caută: <denumire> <X1|X3> <dată> <dată> <valoare> kVArh
+        denumire_fix_escaped = re.sub(r"\s+", r"\\s+", denumire_fix)
+        pattern = rf"{denumire_fix_escaped}\s+{x_type}.*?(?:\d{{2}}\.\d{{2}}\.\d{{2,4}})?\s*-\s*(?:\d{{2}}\.\d{{2}}\.\d{{2,4}})?\s+([\-−–]?\d+(?:[.,]?\d*)?)\s*kVArh"
+        matches = re.findall(pattern, src, re.IGNORECASE)
+
+        print(f"[DEBUG] {denumire_fix} {x_type} → {matches}")
+        return sum(parse_number(v) for v in matches)
+
+    # === nou: căutare energie reactivă X1 și X3 separat pentru capacitiv/inductiv ===
+    def suma_reactivi():
+        return suma_cantitate_facturata("Energie reactiv[ăa] inductiv[ăa] X1")
+
+    def suma_reactivc():
+        return (
+            suma_cantitate_facturata("Energie reactiv[ăa] capacitiv[ăa] X1") +
+            suma_cantitate_facturata("Energie reactiv[ăa] capacitiv[ăa] X3")
+        )
+
+    return {
+        "cantitate_activ": suma_cantitati("Energie activ[ăa]"),
+        "cantitate_reactivi": suma_cantitati("Energie reactiv[ăa] inductiv[ăa]"),
+        "cantitate_reactivc": suma_cantitati("Energie reactiv[ăa] capacitiv[ăa]"),
+        "cantitate_facturata_activ": parse_number(match_total.group(1)) if match_total else 0,
+        "cantitate_facturata_reactivi": (
+            suma_cantitate_facturata("Energie reactivă inductivă", "X1", text) +
+            suma_cantitate_facturata("Energie reactivă inductivă", "X3", text)
+        ),
+        "cantitate_facturata_reactivc": (
+            suma_cantitate_facturata("Energie reactivă capacitivă", "X1", text) +
+            suma_cantitate_facturata("Energie reactivă capacitivă", "X3", text)
+        ),
+
+
+    }
+
+
+def extract_data_from_text(text, global_text=None):
+    if global_text is None:
+        global_text = text
+        # Procesăm separat textul local (doar blocul) și textul global (întregul fișier)
+    local_text = text.replace('\n', ' ').replace('\r', '').replace('\xa0', ' ')
+    full_text = global_text.replace('\n', ' ').replace('\r', '').replace('\xa0', ' ')
+
+    # 👉 1. Extragem loc_consum DOAR din bloc (nu din global_text)
+    zona_consum = ""
+    match_consum_section = re.search(
+        r"DETALII LOC DE (?:CONSUM|PRODUCERE ȘI CONSUM)[\s\-–—:]*?(.*?)(?:Denumirea produsului\s*contractat|COD Loc de consum)",
+        local_text,
+        flags=re.DOTALL | re.IGNORECASE
+    )
+    if match_consum_section:
+        zona_consum = match_consum_section.group(1).strip()
+    else:
+        alt_match = re.search(
+            r"((?:Localitatea|Comuna)[^:]*?Cod postal\s+\d{5,6})\s+Denumirea produsului\s*contractat",
+            local_text,
+            re.IGNORECASE
+        )
+        if alt_match:
+            zona_consum = alt_match.group(1).strip()
+
+    loc_consum_match = re.search(
+        r"(?:Localitatea|Comuna)\s+[A-ZȘȚĂÎÂ].*?Cod postal\s+\d{5,6}",
+        zona_consum,
+        flags=re.IGNORECASE
+    )
+
+    def find(pattern, src=None, group=1):
+        if src is None:
+            src = local_text
+        match = re.search(pattern, src, re.DOTALL | re.IGNORECASE)
+        if match:
+            try:
+                return match.group(group).strip()
+            except IndexError:
+                print(f"[‼️] Regex fără grupul {group}: {pattern}")
+                return ""
+        return ""
+
+    data = {
+        # date care sunt DOAR în bloc
+        "loc_consum": loc_consum_match.group(0).strip() if loc_consum_match else "",
+        "POD": find(r"POD:?\s*([A-Z0-9]{8,})", text),
+
+        # date care sunt doar în header / prima pagină → extragem din global_text
+        "factura": find(r"(?:Nr\. factura|Serie\s*/\s*Nr\.):?\s*([A-Z]+/?\d+)", global_text),
+        "data_emitere": find(r"Dat[ăa] emitere:?\s*(\d{2}\.\d{2}\.\d{4})", global_text),
+        "data_scadenta": find(r"Data scadent[ăa]:?\s*(\d{2}\.\d{2}\.\d{4})", global_text),
+        "perioada_start": find(r"Perioad[ăa] (?:de facturare)?:?\s*(\d{2}\.\d{2}\.\d{4})", global_text),
+        "perioada_end": find(r"Perioad[ăa] (?:de facturare)?:?\s*\d{2}\.\d{2}\.\d{4} - (\d{2}\.\d{2}\.\d{4})",
+                             global_text),
+        "total_net": parse_number(
+            find(r"Valoare facturat[ăa] f[ăa]r[ăa] TVA.*?([\-−–]?\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))", global_text)),
+        "valoare_fara_TVA": parse_number(
+            find(r"Valoare facturat[ăa] f[ăa]r[ăa] TVA.*?([\-−–]?\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))", global_text)),
+        "valoare_cu_TVA": parse_number(
+            find(r"TOTAL FACTUR[ĂA] CURENT[ĂA] CU TVA\s+([\-−–]?\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))", global_text)),
+        "total_plata": parse_number(
+            find(r"TOTAL DE PLAT[ĂA][^\d\-]*([\-−–]?\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))", global_text) or find(
+                r"Cod de bare.*?([\-−–]?\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))", global_text)),
+        "sold_anterior": parse_number(
+            find(r"Sold la data emiterii facturii.*?([\-−–]?\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))", global_text)),
+
+        # opționale, din bloc (dacă există)
+        "index_vechi": parse_number(find(r"Index vechi[^0-9]*([\d.,]+)", text)),
+        "index_nou": parse_number(find(r"Index nou[^0-9]*([\d.,]+)", text)),
+        "cantitate": parse_number(
+            find(r"Total EA.*?([\d.,]+)\s*kWh", text) or
+            find(r"Cantitate facturat[ăa]\s*([\d.,]+)\s*kWh", text) or
+            find(r"Total energie activ[ăa]\s*([\d.,]+)\s*kWh", text))
+    }
+
+    data.update(extract_all_indexes(local_text, fallback_text=full_text))
+    data.update(extract_sume_cantitati(local_text, fallback_text=full_text))
+
+    return data
+
+
+def split_pdf_by_blocuri(text):
+    blocuri = re.split(r"(?=DETALII LOC DE (?:CONSUM|PRODUCERE ȘI CONSUM))", text, flags=re.IGNORECASE)
+
+    rezultate = []
+    for bloc in blocuri:
+        upper_bloc = bloc.upper()
+        if "POD" in upper_bloc and "LOCALITATEA" in upper_bloc:
+            rezultate.append(bloc)
+    return rezultate
@@ -0,0 +1,78 @@
+# Benchmark reproductibil pe un corpus sintetic: timpi separați pe etape + rezultat JSON.
+# Rulare: python -m benchmarks.run [--fisiere 20] [--blocuri 10] [--workers 4] [--output rezultat.json]
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+
+import fitz
+
+import extrage_facturi
+from extrage_facturi import EXPORTERS, collect_metrics, export_filename, export_rows, process_pdfs
+from .corpus import add_corpus_arguments, corpus_options, generate_corpus
+
+
+def best_of(repetari, fn):
+    best = float("inf")
+    for _ in range(repetari):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    add_corpus_arguments(parser)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Procese pentru măsurarea process_pdfs în paralel")
+    parser.add_argument("--repetari", type=int, default=3)
+    parser.add_argument("--output", help="Scrie rezultatul JSON în acest fișier (implicit stdout)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = os.path.join(tmp, "corpus")
+        generate_corpus(corpus_dir, **corpus_options(args))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            # Un pas instrumentat (timpi pe etape + per regex), apoi măsurători best-of fără instrumentare
+            with collect_metrics() as metrics:
+                rows = process_pdfs(corpus_dir, None)
+            summary = metrics.to_dict()
+            stages = summary["stages"]
+            nr_blocuri = summary["counters"].get("blocuri", 0)
+            export_sec = {
+                export_format: best_of(args.repetari, lambda: export_rows(
+                    rows, os.path.join(tmp, export_filename("rezultat", export_format)), export_format=export_format))
+                for export_format in EXPORTERS
+            }
+            stages["finalize_excel"] = export_sec["xlsx"]
+            process_serial = best_of(args.repetari, lambda: process_pdfs(corpus_dir, None))
+            process_parallel = best_of(args.repetari, lambda: process_pdfs(corpus_dir, None, workers=args.workers))
+
+    rezultat = {
+        "parser_version": extrage_facturi.PARSER_VERSION,
+        "python": platform.python_version(),
+        "pymupdf": fitz.VersionBind,
+        "corpus": corpus_options(args),
+        "blocuri_total": nr_blocuri,
+        "randuri": len(rows),
+        "etape_sec": stages,
+        "extract_sec_per_bloc": stages["extract"] / max(1, nr_blocuri),
+        "process_pdfs_sec": {"workers_1": process_serial, f"workers_{args.workers}": process_parallel},
+        "export_sec": export_sec,
+        "regex": summary["regex"],
+    }
+    output = json.dumps(rezultat, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
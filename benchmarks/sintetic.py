@@ -0,0 +1,89 @@
+# Generator de text sintetic de factură, cu aceleași marcaje ca facturile reale
+import random
+
+
+def _numar(x):
+    # 12345.678 → "12.345,678"
+    return f"{x:,.3f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def header_text(i=0):
+    return (
+        "FACTURĂ FISCALĂ\n"
+        f"Serie / Nr.: EON{1000000 + i}\n"
+        "Dată emitere: 05.03.2025\n"
+        "Data scadentă: 20.03.2025\n"
+        "Perioadă de facturare: 01.02.2025 - 28.02.2025\n"
+        f"Valoare facturată fără TVA {1000 + i},67 lei\n"
+        f"TOTAL FACTURĂ CURENTĂ CU TVA 1.{200 + i % 800:03d},35\n"
+        "Sold la data emiterii facturii −12,00\n"
+        f"TOTAL DE PLATĂ 1.{188 + i % 800:03d},35\n"
+    )
+
+
+def bloc_text(j, rnd):
+    activ = rnd.randint(1000, 900000) + 0.5
+    delta_activ = rnd.randint(0, 5000)
+    inductiv = rnd.randint(0, 9000)
+    delta_inductiv = rnd.randint(0, 500)
+    capacitiv = rnd.randint(0, 900)
+    delta_capacitiv = rnd.randint(0, 50)
+    return (
+        "DETALII LOC DE CONSUM\n"
+        f"Localitatea CLUJ-NAPOCA, Str. Fabricii nr {j} Cod postal 4000{j % 10}1\n"
+        "Denumirea produsului contractat Energie electrica activa\n"
+        f"POD: RO005E{100000000 + j}\n"
+        "Index vechi 10,5\nIndex nou 20,5\n"
+        f"Total EA {delta_activ} kWh\n"
+        "DETALII CITIRI\n"
+        f"Energie activă 01.02.2025 {_numar(activ)} Citire distribuitor {_numar(activ + delta_activ)} "
+        f"Citire distribuitor {_numar(delta_activ)}\n"
+        f"Energie reactivă inductivă 01.02.2025 {_numar(inductiv)} Citire distribuitor "
+        f"{_numar(inductiv + delta_inductiv)} Estimare convenție {_numar(delta_inductiv + (j % 3))}\n"
+        f"Energie reactivă capacitivă 01.02.2025 {_numar(capacitiv)} Citire distribuitor "
+        f"{_numar(capacitiv + delta_capacitiv)} Citire distribuitor {_numar(delta_capacitiv)}\n"
+        "DETALII PRODUSE\n"
+        f"Energie reactivă inductivă X1 01.02.2025 - 28.02.2025 {delta_inductiv},5 kVArh\n"
+        f"Energie reactivă capacitivă X3 01.02.2025 - 28.02.2025 {delta_capacitiv + j * 50},0 kVArh\n"
+        f"Total loc de consum {delta_activ} kWh\n"
+    )
+
+
+def factura_text(i=0, n_blocuri=5, seed=0):
+    rnd = random.Random(seed + i)
+    return header_text(i) + "".join(bloc_text(j, rnd) for j in range(n_blocuri)) + "Cod de bare 9999 1.188,35\n"
+
+
+FILLER_TEXT = (
+    "Termenii si conditiile generale ale contractului de furnizare a energiei electrice. "
+    "Clientul poate transmite sesizari prin telefon, e-mail sau la oricare dintre agentiile noastre. "
+    "Informatii despre drepturile consumatorilor sunt disponibile pe site-ul autoritatii de reglementare. "
+)
+
+
+def factura_pdf(i=0, n_blocuri=5, pagini_extra=0, linii_pe_pagina=50, seed=0):
+    # PDF real (PyMuPDF) cu textul sintetic; fontul „tiro” inclus în PyMuPDF acoperă diacriticele românești
+    import fitz
+
+    font = fitz.Font("tiro")
+    lines = factura_text(i, n_blocuri, seed).splitlines()
+    doc = fitz.open()
+
+    def write_page(page_lines):
+        page = doc.new_page()
+        writer = fitz.TextWriter(page.rect)
+        y = 40
+        for line in page_lines:
+            writer.append((30, y), line, font=font, fontsize=8)
+            y += 14
+        writer.write_text(page)
+
+    for start in range(0, len(lines), linii_pe_pagina):
+        write_page(lines[start:start + linii_pe_pagina])
+    for _ in range(pagini_extra):
+        # pagini de termeni / reclame fără niciun marcaj de factură
+        write_page([FILLER_TEXT[k:k + 110] for k in range(0, len(FILLER_TEXT), 110)] * 8)
+
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    return pdf_bytes
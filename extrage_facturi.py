@@ -1,43 +1,829 @@
+import cProfile
+import csv
+import gzip
+import hashlib
+import io
+import json
 import os
+import pstats
 import re
+import shutil
+import time
+from collections import defaultdict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import cached_property
+from itertools import chain, islice
+from operator import attrgetter
 import fitz  # PyMuPDF
+import numpy as np
 import pandas as pd
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
+from openpyxl.utils import get_column_letter
 from openpyxl import Workbook
-from openpyxl.cell.cell import MergedCell
+from openpyxl.cell import WriteOnlyCell
 
+try:  # Parquet e opțional: fără pyarrow formatul pur și simplu nu apare în EXPORTERS
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
 
-def parse_number(val):
-    if not val:
-        return 0
-    val = val.replace('\xa0', '').replace("−", "-").replace("–", "-").replace("—", "-")
-    val = re.sub(r'(?<=\d)\.(?=\d{3}(?:\D|$))', '', val)  # elimină puncte de mii
-    val = val.replace(",", ".")
+# Crește versiunea la orice modificare a regex-urilor sau a schemei rândurilor → intrările vechi din cache devin invalide
+PARSER_VERSION = 5
+
+# Regex-urile „etichetă … valoare” caută doar într-o fereastră de atâtea caractere după etichetă
+MATCH_WINDOW = 500
+# Amprenta de layout se caută doar în începutul documentului (header-ul de pe prima pagină)
+LAYOUT_PROBE_CHARS = 3000
+MATCH_WINDOW_SECTIUNE = 3000
+# Timpul maxim de extracție per document (secunde); după el căutările rămase sunt sărite și marcate
+DOCUMENT_TIME_BUDGET = 5.0
+
+# Flag-uri PyMuPDF pentru textul paginilor: fără imagini și fără ligaturi păstrate (ﬁ → fi)
+PAGE_TEXT_FLAGS = fitz.TEXTFLAGS_TEXT & ~fitz.TEXT_PRESERVE_LIGATURES & ~fitz.TEXT_PRESERVE_IMAGES
+
+# O pagină e relevantă dacă are măcar una dintre etichetele căutate de extractori (litere mici, fără diacritice
+# acolo unde regex-urile acceptă ambele forme)
+PAGE_MARKERS = (
+    "detalii", "pod", "localitatea", "comuna", "nr. factura", "serie", "emitere", "scadent", "perioad",
+    "valoare facturat", "total factur", "total de plat", "sold la data", "cod de bare", "index", "total ea",
+    "cantitate facturat", "total energie", "energie activ", "energie reactiv", "total loc de consum",
+)
+
+
+class ExtractionCache:
+    # Cache pe disc: <directory>/v<PARSER_VERSION>/<sha256 PDF>.json cu rândurile extrase per bloc.
+    # texts (PageTextStore, opțional): textul paginilor fiecărui PDF procesat, păstrat separat de cache
+
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024, texts=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.texts = texts
+        self.version_dir = os.path.join(directory, f"v{PARSER_VERSION}")
+        os.makedirs(self.version_dir, exist_ok=True)
+        # Octeții din version_dir: calculați la primul put, apoi ținuți la zi de put (fără rescanare per fișier).
+        # Scrierile altor procese nu apar aici, dar fiecare evict() recalculează totalul real.
+        self._total = None
+
+        # Doar versiunile mai vechi de parser se șterg: la un deploy gradual procesele cu versiunea nouă și cele
+        # cu versiunea anterioară rulează în paralel, iar alte directoare din `directory` nu aparțin cache-ului
+        for name in os.listdir(directory):
+            match = re.fullmatch(r"v(\d+)", name)
+            if match and int(match.group(1)) < PARSER_VERSION:
+                shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+    def _path(self, digest):
+        return os.path.join(self.version_dir, f"{digest}.json")
+
+    def get(self, digest):
+        path = self._path(digest)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # mtime = ultima accesare → evacuare LRU
+        except (OSError, ValueError):
+            return None
+        if entry.get("campuri") != list(ROW_FIELDS):
+            return None
+        return [InvoiceRow.from_values(values) for values in entry["rows"]], entry["blocuri"]
+
+    def put(self, digest, rows, nr_blocuri):
+        path = self._path(digest)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                # Rândurile ca liste de valori în ordinea ROW_FIELDS: numele câmpurilor apar o singură dată
+                json.dump({"campuri": ROW_FIELDS, "rows": [row.values() for row in rows], "blocuri": nr_blocuri},
+                          f, ensure_ascii=False)
+            size = os.path.getsize(tmp_path)
+            try:
+                previous = os.path.getsize(path)
+            except FileNotFoundError:
+                previous = 0
+            os.replace(tmp_path, path)  # atomic: alte procese nu văd niciodată fișiere pe jumătate scrise
+        except OSError as e:
+            print(f"[⚠️] Cache indisponibil pentru {digest}: {e}")
+            return
+        if self._total is None:
+            self.evict()
+            return
+        self._total += size - previous
+        if self._total > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        # Scanare completă doar aici: la primul put și când totalul ținut de put depășește max_bytes
+        entries = []
+        for entry in os.scandir(self.version_dir):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._total = total
+
+
+class PageTextStore:
+    # Textul brut al paginilor (page.get_text, toate paginile, nefiltrate), comprimat:
+    # <directory>/<sha256[:2]>/<sha256 PDF>.json.gz. Nu depinde de PARSER_VERSION și nu se evacuează →
+    # după o corecție de regex rezultatele se refac din text (reextract_rows), fără decodarea PDF-urilor
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, digest):
+        return os.path.join(self.directory, digest[:2], f"{digest}.json.gz")
+
+    def has(self, digest):
+        return os.path.exists(self._path(digest))
+
+    def get(self, digest):
+        try:
+            with gzip.open(self._path(digest), "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, digest, pages):
+        path = self._path(digest)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(pages, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[⚠️] Textul paginilor nu a putut fi păstrat pentru {digest}: {e}")
+
+
+_VALOARE_LEI = r"([\-−–]?\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))"
+_INDEX_CITIRI = (r"(\d{1,3}(?:\.\d{3})*,\d+)\s+(?:Citire distribuitor|Estimare convenție)\s+"
+                 r"(\d{1,3}(?:\.\d{3})*,\d+)\s+(?:Citire distribuitor|Estimare convenție)")
+_DENUMIRI_CITIRI = {
+    "activ": "Energie activ[ăa]",
+    "inductiv": "Energie reactiv[ăa] inductiv[ăa]",
+    "capacitiv": "Energie reactiv[ăa] capacitiv[ăa]",
+}
+_DENUMIRI_FACTURATE = {
+    "inductiv": "Energie reactivă inductivă",
+    "capacitiv": "Energie reactivă capacitivă",
+}
+_FIND_FLAGS = re.DOTALL | re.IGNORECASE
+
+
+def _pattern_cantitate_citita(denumire):
+    return re.compile(
+        rf"{denumire}.*?(?:\d{{2}}\.\d{{2}}\.\d{{4}})?\s*[\d.,]+\s*Citire.*?[\d.,]+\s*Citire.*?([\d.,]+)",
+        re.IGNORECASE)
+
+
+def _pattern_cantitate_facturata(denumire_fix, x_type):
+    # Construim un regex robust care caută: <denumire> <X1|X3> <dată> <dată> <valoare> kVArh
+    denumire_fix_escaped = re.sub(r"\s+", r"\\s+", denumire_fix)
+    return re.compile(
+        rf"{denumire_fix_escaped}\s+{x_type}.*?(?:\d{{2}}\.\d{{2}}\.\d{{2,4}})?\s*-\s*(?:\d{{2}}\.\d{{2}}\.\d{{2,4}})?"
+        rf"\s+([\-−–]?\d+(?:[.,]?\d*)?)\s*kVArh",
+        re.IGNORECASE)
+
+
+def _pattern_name(key):
+    return key if isinstance(key, str) else "/".join(key)
+
+
+class MatchBudget:
+    # Bugetul de timp al unui document: căutările cu fereastră îl verifică înainte de fiecare încercare
+
+    def __init__(self, seconds):
+        self.deadline = time.perf_counter() + seconds
+        self.skipped = set()
+
+    def exhausted(self, key):
+        if time.perf_counter() <= self.deadline:
+            return False
+        self.skipped.add(key)
+        return True
+
+
+# Bugetul documentului în lucru (None → fără limită, ex. apeluri directe ale extractorilor); ContextVar →
+# documentele extrase simultan în thread-uri diferite (ex. upload-urile din stream) au fiecare bugetul lor
+_budget = ContextVar("extrage_facturi_budget", default=None)
+
+
+@contextmanager
+def match_budget(seconds=DOCUMENT_TIME_BUDGET):
+    budget = MatchBudget(seconds)
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
+
+
+class WindowedPattern:
+    # Regex „etichetă .*? valoare” rulat doar de la aparițiile etichetei și cel mult window caractere după ea
+    # (match cu endpos) → .*? nu mai poate traversa tot textul normalizat (o singură linie lungă).
+    # Aceeași interfață ca re.Pattern pentru search / findall / finditer.
+
+    def __init__(self, pattern, label, window=MATCH_WINDOW):
+        self.pattern = pattern.pattern
+        self.flags = pattern.flags
+        self.groups = pattern.groups
+        self.key = None  # numele din PATTERNS, completat la înregistrare
+        self.window = window
+        self._compiled = pattern
+        self._label = re.compile(label, pattern.flags)
+        # „etichetă.*?rest”: dacă regex-ul fără fereastră nu găsește nimic de la o etichetă, nu găsește nici de la
+        # etichetele următoare pe care .*? le poate traversa (tot textul cu DOTALL, altfel până la sfârșitul liniei)
+        self._lazy_tail = pattern.pattern.startswith(label + ".*?")
+
+    def _iter_matches(self, text):
+        budget = _budget.get()
+        pos = 0
+        while True:
+            label = self._label.search(text, pos)
+            if label is None:
+                return
+            if budget is not None and budget.exhausted(self.key):
+                return
+            start = label.start()
+            end = start + self.window
+            match = self._compiled.match(text, start, end)
+            while (match is None or match.end() >= end) and end < len(text):
+                # Valoarea e după fereastră sau fereastra a tăiat-o (ex. „1.234,5” din „1.234,56”) → fereastra
+                # se dublează până la sfârșitul textului (rezultatul unei căutări obișnuite de la etichetă).
+                # Bugetul se verifică între încercări, deci o coadă cu backtracking costisitor depășește bugetul
+                # cel mult cu o încercare; fără buget (apeluri directe) costul rămâne cel al căutării complete.
+                if budget is not None and budget.exhausted(self.key):
+                    return
+                end = start + 2 * (end - start)
+                match = self._compiled.match(text, start, end)
+            if match is not None:
+                yield match
+                pos = max(match.end(), start + 1)
+            elif not self._lazy_tail:
+                pos = start + 1
+            elif self.flags & re.DOTALL or (pos := text.find("\n", start) + 1) == 0:
+                return
+
+    def search(self, text):
+        return next(self._iter_matches(text), None)
+
+    def finditer(self, text):
+        return self._iter_matches(text)
+
+    def findall(self, text):
+        if self.groups == 0:
+            return [match.group(0) for match in self._iter_matches(text)]
+        if self.groups == 1:
+            return [match.group(1) for match in self._iter_matches(text)]
+        return [match.groups() for match in self._iter_matches(text)]
+
+
+class _PatternRegistry(dict):
+    # Un dict obișnuit, cu o singură diferență: cât timp collect_metrics e activ în contextul curent,
+    # PATTERNS[key] dă regex-ul învelit în _CountedPattern. Registrul în sine nu se modifică niciodată.
+
+    def __getitem__(self, key):
+        pattern = dict.__getitem__(self, key)
+        metrics = _metrics.get()
+        if metrics is None:
+            return pattern
+        return metrics.counted_pattern(key, pattern)
+
+
+# Registrul tuturor regex-urilor, compilate o singură dată la import.
+# Cheie: numele câmpului sau (câmp, variantă) pentru câmpurile cu mai multe denumiri/fallback-uri.
+PATTERNS = _PatternRegistry({
+    # punct de mii: între o cifră și exact 3 cifre (1.234,56 / 12.345); „\.” primul → căutare rapidă după literal
+    "puncte_mii": re.compile(r'\.(?<=\d\.)(?=\d{3}(?:\D|$))'),
+    "spatii": re.compile(r'\s+'),
+    # Tokenizer de secțiuni: toate marcajele într-o singură alternanță, parcurse o dată (tokenize_sections)
+    "sectiuni": re.compile(
+        r"(?P<loc_consum>DETALII LOC DE (?:CONSUM|PRODUCERE ȘI CONSUM))"
+        r"|(?P<citiri>DETALII\s+CITIRI)"
+        r"|(?P<produse>DETALII\s+PRODUSE)"
+        r"|(?P<total>TOTAL)",
+        re.IGNORECASE),
+    "bloc_pod": re.compile(r"POD", re.IGNORECASE),
+    "bloc_localitatea": re.compile(r"LOCALITATEA", re.IGNORECASE),
+
+    # amprente de layout (doar în primele LAYOUT_PROBE_CHARS caractere, vezi detect_layout)
+    ("layout", "eon", "serie"): re.compile(r"Serie\s*/\s*Nr\.", re.IGNORECASE),
+    ("layout", "eon", "total_de_plata"): re.compile(r"TOTAL DE PLAT[ĂA]", re.IGNORECASE),
+
+    # loc de consum (doar din bloc)
+    ("loc_consum", "sectiune"): WindowedPattern(re.compile(
+        r"DETALII LOC DE (?:CONSUM|PRODUCERE ȘI CONSUM)[\s\-–—:]*?(.*?)(?:Denumirea produsului\s*contractat|COD Loc de consum)",
+        re.DOTALL | re.IGNORECASE), r"DETALII LOC DE", MATCH_WINDOW_SECTIUNE),
+    ("loc_consum", "adresa"): WindowedPattern(re.compile(
+        r"((?:Localitatea|Comuna)[^:]*?Cod postal\s+\d{5,6})\s+Denumirea produsului\s*contractat", re.IGNORECASE),
+        r"Localitatea|Comuna"),
+    "loc_consum": WindowedPattern(
+        re.compile(r"(?:Localitatea|Comuna)\s+[A-ZȘȚĂÎÂ].*?Cod postal\s+\d{5,6}", re.IGNORECASE),
+        r"Localitatea|Comuna"),
+    "POD": re.compile(r"POD:?\s*([A-Z0-9]{8,})", _FIND_FLAGS),
+
+    # header
+    "factura": re.compile(r"(?:Nr\. factura|Serie\s*/\s*Nr\.):?\s*([A-Z]+/?\d+)", _FIND_FLAGS),
+    "data_emitere": re.compile(r"Dat[ăa] emitere:?\s*(\d{2}\.\d{2}\.\d{4})", _FIND_FLAGS),
+    "data_scadenta": re.compile(r"Data scadent[ăa]:?\s*(\d{2}\.\d{2}\.\d{4})", _FIND_FLAGS),
+    "perioada_start": re.compile(r"Perioad[ăa] (?:de facturare)?:?\s*(\d{2}\.\d{2}\.\d{4})", _FIND_FLAGS),
+    "perioada_end": re.compile(r"Perioad[ăa] (?:de facturare)?:?\s*\d{2}\.\d{2}\.\d{4} - (\d{2}\.\d{2}\.\d{4})",
+                               _FIND_FLAGS),
+    "valoare_fara_TVA": WindowedPattern(
+        re.compile(r"Valoare facturat[ăa] f[ăa]r[ăa] TVA.*?" + _VALOARE_LEI, _FIND_FLAGS),
+        r"Valoare facturat[ăa] f[ăa]r[ăa] TVA"),
+    "valoare_cu_TVA": re.compile(r"TOTAL FACTUR[ĂA] CURENT[ĂA] CU TVA\s+" + _VALOARE_LEI, _FIND_FLAGS),
+    ("total_plata", "total_de_plata"): re.compile(r"TOTAL DE PLAT[ĂA][^\d\-]*" + _VALOARE_LEI, _FIND_FLAGS),
+    ("total_plata", "cod_de_bare"): WindowedPattern(
+        re.compile(r"Cod de bare.*?" + _VALOARE_LEI, _FIND_FLAGS), r"Cod de bare"),
+    "sold_anterior": WindowedPattern(
+        re.compile(r"Sold la data emiterii facturii.*?" + _VALOARE_LEI, _FIND_FLAGS), r"Sold la data emiterii facturii"),
+
+    # opționale, din bloc
+    "index_vechi": re.compile(r"Index vechi[^0-9]*([\d.,]+)", _FIND_FLAGS),
+    "index_nou": re.compile(r"Index nou[^0-9]*([\d.,]+)", _FIND_FLAGS),
+    ("cantitate", "total_ea"): WindowedPattern(re.compile(r"Total EA.*?([\d.,]+)\s*kWh", _FIND_FLAGS), r"Total EA"),
+    ("cantitate", "cantitate_facturata"): re.compile(r"Cantitate facturat[ăa]\s*([\d.,]+)\s*kWh", _FIND_FLAGS),
+    ("cantitate", "total_energie_activa"): re.compile(r"Total energie activ[ăa]\s*([\d.,]+)\s*kWh", _FIND_FLAGS),
+
+    # total loc de consum
+    "total_loc_consum": WindowedPattern(
+        re.compile(r"Total loc de consum.*?([\-−–]?\d{1,3}(?:[.,]\d{3})*[.,]?\d+)\s*kWh"), r"Total loc de consum"),
+})
+for _varianta, _denumire in _DENUMIRI_CITIRI.items():
+    # Acceptăm "Citire distribuitor" SAU "Estimare convenție" după valorile numerice
+    PATTERNS[("index", _varianta)] = WindowedPattern(
+        re.compile(_denumire + r".*?" + _INDEX_CITIRI, re.IGNORECASE), _denumire)
+    PATTERNS[("cantitate_citita", _varianta)] = WindowedPattern(_pattern_cantitate_citita(_denumire), _denumire)
+for _varianta, _denumire in _DENUMIRI_FACTURATE.items():
+    for _x_type in ("X1", "X3"):
+        PATTERNS[("cantitate_facturata", _varianta, _x_type)] = WindowedPattern(
+            _pattern_cantitate_facturata(_denumire, _x_type), re.sub(r"\s+", r"\\s+", _denumire) + r"\s+" + _x_type)
+for _key, _pattern in PATTERNS.items():
+    if isinstance(_pattern, WindowedPattern):
+        _pattern.key = _pattern_name(_key)
+
+# Layout generic: toate variantele, încercate în ordine până la prima potrivire (pentru documente nerecunoscute)
+GENERIC_LAYOUT = {
+    "amprenta": (),
+    "loc_consum": (("loc_consum", "sectiune"), ("loc_consum", "adresa")),
+    "total_plata": (("total_plata", "total_de_plata"), ("total_plata", "cod_de_bare")),
+    "cantitate": (("cantitate", "total_ea"), ("cantitate", "cantitate_facturata"),
+                  ("cantitate", "total_energie_activa")),
+    "cantitate_facturata": {"inductiv": ("X1", "X3"), "capacitiv": ("X1", "X3")},
+}
+
+# Layout-uri cunoscute: amprenta (chei PATTERNS care trebuie să apară toate în începutul documentului) și
+# variantele de regex încercate primele pentru acel șablon. Un layout doar reordonează: la o ratare se continuă cu
+# restul variantelor din GENERIC_LAYOUT (vezi resolve_layout), deci recunoașterea nu poate pierde valori.
+# Un furnizor nou = o intrare aici.
+LAYOUTS = {
+    # E.ON: „Serie / Nr.” și „TOTAL DE PLATĂ” în header, cantitatea blocului de obicei în „Total EA”
+    "eon": {
+        "amprenta": (("layout", "eon", "serie"), ("layout", "eon", "total_de_plata")),
+        "total_plata": (("total_plata", "total_de_plata"),),
+        "cantitate": (("cantitate", "total_ea"),),
+    },
+}
+
+
+def _layout_chain(preferred, generic):
+    return tuple(preferred) + tuple(key for key in generic if key not in preferred)
+
+
+def resolve_layout(name):
+    # Variantele layout-ului, urmate de cele generice rămase; layout necunoscut → GENERIC_LAYOUT
+    layout = dict(GENERIC_LAYOUT)
+    for field, preferred in LAYOUTS.get(name, {}).items():
+        generic = GENERIC_LAYOUT.get(field)
+        if field == "amprenta" or generic is None:
+            layout[field] = preferred
+        elif isinstance(generic, dict):
+            layout[field] = {varianta: _layout_chain(preferred.get(varianta, ()), generic[varianta])
+                             for varianta in generic}
+        else:
+            layout[field] = _layout_chain(preferred, generic)
+    return layout
+
+
+# === Instrumentare: timpi pe etape / fișiere, contoare per regex, profilare opțională ===
+
+class Metrics:
+    # Colectează metrici în contextul curent (thread / task); to_dict() dă un rezumat JSON care se poate uni cu merge()
+
+    def __init__(self, profile=False):
+        self.stages = defaultdict(float)
+        self.files = defaultdict(lambda: defaultdict(float))
+        self.regex = defaultdict(lambda: {"hit": 0, "miss": 0, "sec": 0.0})
+        self.counters = defaultdict(int)
+        self.current_file = None
+        self.profile = profile
+        self.profile_stats = None
+        self._counted = {}
+
+    def counted_pattern(self, key, pattern):
+        counted = self._counted.get(key)
+        if counted is None:
+            counted = self._counted[key] = _CountedPattern(key, pattern, self)
+        return counted
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stages[name] += elapsed
+            if self.current_file is not None:
+                self.files[self.current_file][name] += elapsed
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def record_regex(self, key, hit, elapsed):
+        entry = self.regex[key]
+        entry["hit" if hit else "miss"] += 1
+        entry["sec"] += elapsed
+
+    def add_profile(self, stats):
+        # stats: dicționarul brut din cProfile (picklable → poate veni din procesele pool-ului)
+        if self.profile_stats is None:
+            self.profile_stats = {}
+        for func, (cc, nc, tt, ct, callers) in stats.items():
+            if func in self.profile_stats:
+                old_cc, old_nc, old_tt, old_ct, old_callers = self.profile_stats[func]
+                callers = {**old_callers, **callers}
+                cc, nc, tt, ct = old_cc + cc, old_nc + nc, old_tt + tt, old_ct + ct
+            self.profile_stats[func] = (cc, nc, tt, ct, callers)
+
+    def profile_text(self, limit=40):
+        if not self.profile_stats:
+            return ""
+
+        class _Raw:
+            def __init__(self, stats):
+                self.stats = stats
+
+            def create_stats(self):
+                pass
+
+        out = io.StringIO()
+        pstats.Stats(_Raw(self.profile_stats), stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+    def merge(self, summary):
+        for name, sec in summary["stages"].items():
+            self.stages[name] += sec
+        for filename, stages in summary["files"].items():
+            for name, sec in stages.items():
+                self.files[filename][name] += sec
+        for key, entry in summary["regex"].items():
+            for field, value in entry.items():
+                self.regex[key][field] += value
+        for name, n in summary["counters"].items():
+            self.counters[name] += n
+        if summary.get("profile_stats"):
+            self.add_profile(summary["profile_stats"])
+
+    def to_dict(self, include_raw_profile=False):
+        summary = {
+            "stages": dict(self.stages),
+            "files": {filename: dict(stages) for filename, stages in self.files.items()},
+            "regex": dict(self.regex),
+            "counters": dict(self.counters),
+        }
+        if include_raw_profile:
+            summary["profile_stats"] = self.profile_stats
+        elif self.profile_stats:
+            summary["profile"] = self.profile_text()
+        return summary
+
+
+class _CountedPattern:
+    # Învelișul unui regex din PATTERNS cât timp metricile sunt active: aceeași interfață, plus hit/miss și timp
+
+    def __init__(self, key, pattern, metrics):
+        self.key = _pattern_name(key)
+        self.pattern = pattern.pattern
+        self._compiled = pattern
+        self._metrics = metrics
+
+    def _timed(self, method, hit, *args):
+        start = time.perf_counter()
+        result = method(*args)
+        self._metrics.record_regex(self.key, hit(result), time.perf_counter() - start)
+        return result
+
+    def search(self, text, *bounds):
+        return self._timed(self._compiled.search, lambda m: m is not None, text, *bounds)
+
+    def findall(self, text):
+        return self._timed(self._compiled.findall, bool, text)
+
+    def finditer(self, text):
+        return iter(self._timed(lambda t: list(self._compiled.finditer(t)), bool, text))
+
+    def split(self, text):
+        return self._timed(self._compiled.split, lambda parts: len(parts) > 1, text)
+
+    def sub(self, repl, text):
+        return self._timed(lambda t: self._compiled.sub(repl, t), lambda _: True, text)
+
+
+# Metricile active în contextul curent (None → instrumentare oprită). ContextVar, nu global: request-urile
+# din thread-uri diferite (sau task-urile async) nu își amestecă metricile.
+_metrics = ContextVar("extrage_facturi_metrics", default=None)
+
+
+@contextmanager
+def collect_metrics(profile=False):
+    metrics = Metrics(profile=profile)
+    profiler = cProfile.Profile() if profile else None
+    token = _metrics.set(metrics)
+    try:
+        if profiler is not None:
+            profiler.enable()
+        yield metrics
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.create_stats()
+            metrics.add_profile(profiler.stats)
+        _metrics.reset(token)
+
+
+def _stage(name):
+    metrics = _metrics.get()
+    if metrics is None:
+        return nullcontext()
+    return metrics.stage(name)
+
+
+def _count(name, n=1):
+    metrics = _metrics.get()
+    if metrics is not None:
+        metrics.count(name, n)
+
+
+def _replace_unicode_minus(val):
+    # spațiu fix eliminat, minus unicode → "-"; textul ASCII (cazul obișnuit) nu are ce înlocui
+    if val.isascii():
+        return val
+    return val.replace('\xa0', '').replace("−", "-").replace("–", "-").replace("—", "-")
+
+
+def _float_or_zero(val):
     try:
         return float(val)
     except ValueError:
         return 0
 
 
-def extract_all_indexes(text, fallback_text=None):
-    if fallback_text is None:
-        fallback_text = text
+def parse_number(val):
+    if not val:
+        return 0
+    val = _replace_unicode_minus(val)
+    if "." in val:
+        val = PATTERNS["puncte_mii"].sub('', val)  # elimină puncte de mii
+    return _float_or_zero(val.replace(",", "."))
+
+
+def sum_numbers(values):
+    # Adunare în ordinea capturilor, ca înainte (sum peste parse_number) → totaluri identice la bit
+    return sum(parse_number(val) for val in values)
+
+
+def normalize_text(text):
+    return text.replace('\n', ' ').replace('\r', '').replace('\xa0', ' ')
+
+
+def _group_value(pattern, match, group):
+    try:
+        return match.group(group).strip()
+    except IndexError:
+        print(f"[‼️] Regex fără grupul {group}: {pattern.pattern}")
+        return ""
+
+
+def _find(key, src, group=1):
+    pattern = PATTERNS[key]
+    match = pattern.search(src)
+    return _group_value(pattern, match, group) if match else ""
+
+
+def _find_first(keys, src, group=1, stop_on_match=False):
+    # Variantele unui câmp (din layout), în ordine; prima valoare nevidă câștigă („find(a) or find(b)”).
+    # stop_on_match: prima variantă care se potrivește câștigă chiar cu grupul gol („if a: … else: b”)
+    for key in keys:
+        pattern = PATTERNS[key]
+        match = pattern.search(src)
+        if match is None:
+            continue
+        value = _group_value(pattern, match, group)
+        if value or stop_on_match:
+            return value
+    return ""
+
+
+# Schema fixă a unui rând extras (un bloc POD); ordinea e și ordinea valorilor din cache
+ROW_FIELDS = (
+    "loc_consum", "POD", "factura", "data_emitere", "data_scadenta", "perioada_start", "perioada_end",
+    "total_net", "valoare_fara_TVA", "valoare_cu_TVA", "total_plata", "sold_anterior",
+    "index_vechi", "index_nou", "cantitate",
+    "index_activ_vechi", "index_activ_nou", "index_reactivi_vechi", "index_reactivi_nou",
+    "index_reactivc_vechi", "index_reactivc_nou",
+    "cantitate_activ", "cantitate_reactivi", "cantitate_reactivc",
+    "cantitate_facturata_activ", "cantitate_facturata_reactivi", "cantitate_facturata_reactivc",
+    "fisier", "campuri_depasite", "alerte", "alerta",
+)
+_ROW_TEXT_FIELDS = {"loc_consum", "POD", "factura", "data_emitere", "data_scadenta", "perioada_start",
+                    "perioada_end", "fisier", "alerta"}
+_ROW_TUPLE_FIELDS = {"campuri_depasite", "alerte"}
+_ROW_DEFAULTS = tuple((name, "" if name in _ROW_TEXT_FIELDS else () if name in _ROW_TUPLE_FIELDS else 0)
+                      for name in ROW_FIELDS)
+
+
+class InvoiceRow:
+    # __slots__ în loc de dict per bloc: fără tabela de chei a dict-ului (~550 B mai puțin per rând, vezi
+    # benchmarks/bench_memorie). Păstrează interfața de dict (get, [], items) pentru codul care lucra cu dicționare.
+    __slots__ = ROW_FIELDS
+
+    def __init__(self, **values):
+        for name, default in _ROW_DEFAULTS:
+            setattr(self, name, values.pop(name, default))
+        if values:
+            raise TypeError(f"Câmpuri necunoscute: {', '.join(values)}")
+
+    @classmethod
+    def from_values(cls, values):
+        row = cls.__new__(cls)
+        for name, value in zip(ROW_FIELDS, values):
+            setattr(row, name, value)
+        return row
+
+    @classmethod
+    def from_dict(cls, data):
+        # Cheile din afara schemei (ex. rânduri salvate de versiuni mai vechi) sunt ignorate
+        return cls(**{name: data[name] for name in ROW_FIELDS if name in data})
+
+    def values(self):
+        return [getattr(self, name) for name in ROW_FIELDS]
+
+    def keys(self):
+        return ROW_FIELDS
+
+    def items(self):
+        return zip(ROW_FIELDS, self.values())
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def get(self, name, default=None):
+        return getattr(self, name, default) if name in _ROW_FIELD_SET else default
+
+    def __getitem__(self, name):
+        if name not in _ROW_FIELD_SET:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __setitem__(self, name, value):
+        if name not in _ROW_FIELD_SET:
+            raise KeyError(name)
+        setattr(self, name, value)
+
+    def __contains__(self, name):
+        return name in _ROW_FIELD_SET
+
+    def __iter__(self):
+        return iter(ROW_FIELDS)
+
+    def __eq__(self, other):
+        if isinstance(other, InvoiceRow):
+            return self.values() == other.values()
+        return NotImplemented
+
+    def __reduce__(self):
+        # Între procese circulă doar tuplul de valori, fără numele câmpurilor
+        return InvoiceRow.from_values, (tuple(self.values()),)
+
+    def __repr__(self):
+        return f"InvoiceRow({self.to_dict()!r})"
+
+
+_ROW_FIELD_SET = frozenset(ROW_FIELDS)
+_ROW_MEASURE_FIELDS = tuple(name for name in ROW_FIELDS if name.startswith(("index_", "cantitate")))
+
+
+def detect_layout(global_text):
+    # Amprenta: marcaje ieftine din primele LAYOUT_PROBE_CHARS caractere; primul layout recunoscut câștigă
+    end = min(len(global_text), LAYOUT_PROBE_CHARS)
+    for name, layout in LAYOUTS.items():
+        if all(PATTERNS[key].search(global_text, 0, end) for key in layout["amprenta"]):
+            _count(f"layout_{name}")
+            return name
+    _count("layout_generic")
+    return "generic"
+
 
-    def extract_index_pair(regex):
-        match = re.search(regex, text, re.IGNORECASE)
-        if not match:
-            match = re.search(regex, fallback_text, re.IGNORECASE)
+class DocumentContext:
+    # Tot ce depinde doar de documentul întreg (layout, header, DETALII CITIRI, fallback-uri pe full_text),
+    # calculat o singură dată per fișier și refolosit de fiecare bloc
+
+    def __init__(self, global_text, layout=None):
+        self.global_text = global_text
+        self.full_text = normalize_text(global_text)
+        # Extractorii încearcă întâi variantele de regex ale layout-ului, apoi restul celor generice
+        self.layout_name = layout or detect_layout(global_text)
+        self.layout = resolve_layout(self.layout_name)
+        self._index_pairs = {}
+        self._cantitati_citite = {}
+
+    @cached_property
+    def header(self):
+        # date care sunt doar în header / prima pagină → extragem din global_text
+        global_text = self.global_text
+        valoare_fara_tva = parse_number(_find("valoare_fara_TVA", global_text))
+        return {
+            "factura": _find("factura", global_text),
+            "data_emitere": _find("data_emitere", global_text),
+            "data_scadenta": _find("data_scadenta", global_text),
+            "perioada_start": _find("perioada_start", global_text),
+            "perioada_end": _find("perioada_end", global_text),
+            "total_net": valoare_fara_tva,
+            "valoare_fara_TVA": valoare_fara_tva,
+            "valoare_cu_TVA": parse_number(_find("valoare_cu_TVA", global_text)),
+            "total_plata": parse_number(_find_first(self.layout["total_plata"], global_text)),
+            "sold_anterior": parse_number(_find("sold_anterior", global_text)),
+        }
+
+    @cached_property
+    def sections(self):
+        return tokenize_sections(self.global_text)
+
+    @cached_property
+    def citiri_text(self):
+        # Secțiunile „DETALII CITIRI”, fiecare până la următoarea secțiune de citiri / produse / total
+        # (un marcaj de loc de consum nu închide citirile)
+        text = self.global_text
+        parts = []
+        for i, section in enumerate(self.sections):
+            if section.tip == "citiri":
+                end = next((s.start for s in self.sections[i + 1:] if s.tip != "loc_consum"), len(text))
+                parts.append(normalize_text(text[section.body_start:end]))
+        return " ".join(parts)
+
+    @cached_property
+    def cantitate_facturata_activ(self):
+        match_total = PATTERNS["total_loc_consum"].search(self.full_text)
+        return parse_number(match_total.group(1)) if match_total else 0
+
+    def index_pair(self, varianta):
+        # Fallback pe tot documentul când blocul nu conține citirea
+        if varianta not in self._index_pairs:
+            match = PATTERNS[("index", varianta)].search(self.full_text)
+            self._index_pairs[varianta] = (
+                (parse_number(match.group(1)), parse_number(match.group(2))) if match else (0, 0))
+        return self._index_pairs[varianta]
+
+    def cantitate_citita(self, varianta):
+        if varianta not in self._cantitati_citite:
+            pattern = PATTERNS[("cantitate_citita", varianta)]
+            matches = pattern.findall(self.citiri_text)
+            if not matches:
+                matches = pattern.findall(self.full_text)
+            self._cantitati_citite[varianta] = sum_numbers(matches)
+        return self._cantitati_citite[varianta]
+
+
+def extract_all_indexes(text, fallback_text=None, context=None):
+    if context is None:
+        context = DocumentContext(text if fallback_text is None else fallback_text)
+
+    def extract_index_pair(varianta):
+        match = PATTERNS[("index", varianta)].search(text)
         if match:
             return parse_number(match.group(1)), parse_number(match.group(2))
-        return 0, 0
-
-    # Acceptăm "Citire distribuitor" SAU "Estimare convenție" după valorile numerice
-    pattern_common = r"(\d{1,3}(?:\.\d{3})*,\d+)\s+(?:Citire distribuitor|Estimare convenție)\s+(\d{1,3}(?:\.\d{3})*,\d+)\s+(?:Citire distribuitor|Estimare convenție)"
+        return context.index_pair(varianta)
 
-    activ_v, activ_n = extract_index_pair(r"Energie activ[ăa].*?" + pattern_common)
-    inductiv_v, inductiv_n = extract_index_pair(r"Energie reactiv[ăa] inductiv[ăa].*?" + pattern_common)
-    capacitiv_v, capacitiv_n = extract_index_pair(r"Energie reactiv[ăa] capacitiv[ăa].*?" + pattern_common)
+    activ_v, activ_n = extract_index_pair("activ")
+    inductiv_v, inductiv_n = extract_index_pair("inductiv")
+    capacitiv_v, capacitiv_n = extract_index_pair("capacitiv")
 
     return {
         "index_activ_vechi": activ_v,
@@ -49,313 +835,781 @@ def extract_all_indexes(text, fallback_text=None):
     }
 
 
-def extract_sume_cantitati(text, fallback_text=None):
-    if fallback_text is None:
-        fallback_text = text
+def extract_sume_cantitati(text, fallback_text=None, context=None):
+    if context is None:
+        context = DocumentContext(text if fallback_text is None else fallback_text)
 
-    # Încercăm să izolăm secțiunea „DETALII CITIRI” până la următoarea secțiune
-    match_citiri = re.search(r"DETALII CITIRI(.*?)DETALII PRODUSE", fallback_text, re.DOTALL | re.IGNORECASE)
-    citiri_text = " ".join(match.group(1) for match in re.finditer(
-        r"DETALII CITIRI(.*?)(?=DETALII CITIRI|DETALII PRODUSE|TOTAL|$)", fallback_text, re.DOTALL | re.IGNORECASE))
+    # Normalizează o singură dată textul blocului pentru cantitățile facturate
+    src = text.replace('\n', ' ').replace('\xa0', ' ').replace('\r', ' ')
+    src = PATTERNS["spatii"].sub(' ', src)
 
-    match_total = re.search(r"Total loc de consum.*?([\-−–]?\d{1,3}(?:[.,]\d{3})*[.,]?\d+)\s*kWh", fallback_text)
+    x_types = context.layout["cantitate_facturata"]
 
+    def suma_cantitate_facturata(varianta):
+        # X1 / X3 doar dacă apar în layout-ul documentului
+        return sum(sum_numbers(PATTERNS[("cantitate_facturata", varianta, x_type)].findall(src))
+                   for x_type in x_types[varianta])
 
-    def suma_cantitati(denumire):
-        pattern = rf"{denumire}.*?(?:\d{{2}}\.\d{{2}}\.\d{{4}})?\s*[\d.,]+\s*Citire.*?[\d.,]+\s*Citire.*?([\d.,]+)"
-        matches = re.findall(pattern, citiri_text, re.IGNORECASE)
-        if not matches:
-            matches = re.findall(pattern, fallback_text, re.IGNORECASE)
-        return sum(parse_number(v) for v in matches)
+    return {
+        "cantitate_activ": context.cantitate_citita("activ"),
+        "cantitate_reactivi": context.cantitate_citita("inductiv"),
+        "cantitate_reactivc": context.cantitate_citita("capacitiv"),
+        "cantitate_facturata_activ": context.cantitate_facturata_activ,
+        "cantitate_facturata_reactivi": suma_cantitate_facturata("inductiv"),
+        "cantitate_facturata_reactivc": suma_cantitate_facturata("capacitiv"),
+    }
 
-    def suma_cantitate_facturata(denumire_fix, x_type="X1", src=None):
-        if src is None:
-            src = text  # fallback
 
-        # Normalizează
-        src = src.replace('\n', ' ').replace('\xa0', ' ').replace('\r', ' ')
-        src = re.sub(r'\s+', ' ', src)
+def _extract_loc_consum(text, local_text, context):
+    # 👉 Extragem loc_consum DOAR din bloc (nu din global_text)
+    # O secțiune „DETALII LOC DE CONSUM” găsită, dar goală, nu trece la varianta „adresa” (ca înainte)
+    zona_consum = _find_first(context.layout["loc_consum"], local_text, stop_on_match=True)
 
-        # Construim un regex robust care caută: <denumire> <X1|X3> <dată> <dată> <valoare> kVArh
-        denumire_fix_escaped = re.sub(r"\s+", r"\\s+", denumire_fix)
-        pattern = rf"{denumire_fix_escaped}\s+{x_type}.*?(?:\d{{2}}\.\d{{2}}\.\d{{2,4}})?\s*-\s*(?:\d{{2}}\.\d{{2}}\.\d{{2,4}})?\s+([\-−–]?\d+(?:[.,]?\d*)?)\s*kVArh"
-        matches = re.findall(pattern, src, re.IGNORECASE)
+    loc_consum_match = PATTERNS["loc_consum"].search(zona_consum)
+    return {"loc_consum": loc_consum_match.group(0).strip() if loc_consum_match else ""}
 
-        print(f"[DEBUG] {denumire_fix} {x_type} → {matches}")
-        return sum(parse_number(v) for v in matches)
 
-    # === nou: căutare energie reactivă X1 și X3 separat pentru capacitiv/inductiv ===
-    def suma_reactivi():
-        return suma_cantitate_facturata("Energie reactiv[ăa] inductiv[ăa] X1")
+def _extract_pod(text, local_text, context):
+    return {"POD": _find("POD", text)}
 
-    def suma_reactivc():
-        return (
-            suma_cantitate_facturata("Energie reactiv[ăa] capacitiv[ăa] X1") +
-            suma_cantitate_facturata("Energie reactiv[ăa] capacitiv[ăa] X3")
-        )
 
-    return {
-        "cantitate_activ": suma_cantitati("Energie activ[ăa]"),
-        "cantitate_reactivi": suma_cantitati("Energie reactiv[ăa] inductiv[ăa]"),
-        "cantitate_reactivc": suma_cantitati("Energie reactiv[ăa] capacitiv[ăa]"),
-        "cantitate_facturata_activ": parse_number(match_total.group(1)) if match_total else 0,
-        "cantitate_facturata_reactivi": (
-            suma_cantitate_facturata("Energie reactivă inductivă", "X1", text) +
-            suma_cantitate_facturata("Energie reactivă inductivă", "X3", text)
-        ),
-        "cantitate_facturata_reactivc": (
-            suma_cantitate_facturata("Energie reactivă capacitivă", "X1", text) +
-            suma_cantitate_facturata("Energie reactivă capacitivă", "X3", text)
-        ),
+def _extract_header(text, local_text, context):
+    return context.header
 
 
+def _extract_index_bloc(text, local_text, context):
+    # opționale, din bloc (dacă există)
+    return {
+        "index_vechi": parse_number(_find("index_vechi", text)),
+        "index_nou": parse_number(_find("index_nou", text)),
+        "cantitate": parse_number(_find_first(context.layout["cantitate"], text)),
     }
 
 
-def extract_data_from_text(text, global_text=None):
-    if global_text is None:
-        global_text = text
-        # Procesăm separat textul local (doar blocul) și textul global (întregul fișier)
-    local_text = text.replace('\n', ' ').replace('\r', '').replace('\xa0', ' ')
-    full_text = global_text.replace('\n', ' ').replace('\r', '').replace('\xa0', ' ')
+def _extract_indexuri(text, local_text, context):
+    return extract_all_indexes(local_text, context=context)
 
-    # 👉 1. Extragem loc_consum DOAR din bloc (nu din global_text)
-    zona_consum = ""
-    match_consum_section = re.search(
-        r"DETALII LOC DE (?:CONSUM|PRODUCERE ȘI CONSUM)[\s\-–—:]*?(.*?)(?:Denumirea produsului\s*contractat|COD Loc de consum)",
-        local_text,
-        flags=re.DOTALL | re.IGNORECASE
-    )
-    if match_consum_section:
-        zona_consum = match_consum_section.group(1).strip()
-    else:
-        alt_match = re.search(
-            r"((?:Localitatea|Comuna)[^:]*?Cod postal\s+\d{5,6})\s+Denumirea produsului\s*contractat",
-            local_text,
-            re.IGNORECASE
-        )
-        if alt_match:
-            zona_consum = alt_match.group(1).strip()
-
-    loc_consum_match = re.search(
-        r"(?:Localitatea|Comuna)\s+[A-ZȘȚĂÎÂ].*?Cod postal\s+\d{5,6}",
-        zona_consum,
-        flags=re.IGNORECASE
-    )
-
-    def find(pattern, src=None, group=1):
-        if src is None:
-            src = local_text
-        match = re.search(pattern, src, re.DOTALL | re.IGNORECASE)
-        if match:
-            try:
-                return match.group(group).strip()
-            except IndexError:
-                print(f"[‼️] Regex fără grupul {group}: {pattern}")
-                return ""
-        return ""
 
-    data = {
-        # date care sunt DOAR în bloc
-        "loc_consum": loc_consum_match.group(0).strip() if loc_consum_match else "",
-        "POD": find(r"POD:?\s*([A-Z0-9]{8,})", text),
+def _extract_cantitati(text, local_text, context):
+    return extract_sume_cantitati(local_text, context=context)
+
+
+# (câmpuri, extractor) în ordinea în care rulează pe un bloc; re-extracția limitată la câteva câmpuri
+# (reextract_rows) rulează doar extractorii care le produc
+FIELD_EXTRACTORS = (
+    (("loc_consum",), _extract_loc_consum),
+    (("POD",), _extract_pod),
+    (("factura", "data_emitere", "data_scadenta", "perioada_start", "perioada_end", "total_net", "valoare_fara_TVA",
+      "valoare_cu_TVA", "total_plata", "sold_anterior"), _extract_header),
+    (("index_vechi", "index_nou", "cantitate"), _extract_index_bloc),
+    (("index_activ_vechi", "index_activ_nou", "index_reactivi_vechi", "index_reactivi_nou", "index_reactivc_vechi",
+      "index_reactivc_nou"), _extract_indexuri),
+    (("cantitate_activ", "cantitate_reactivi", "cantitate_reactivc", "cantitate_facturata_activ",
+      "cantitate_facturata_reactivi", "cantitate_facturata_reactivc"), _extract_cantitati),
+)
+EXTRACTED_FIELDS = tuple(name for names, _ in FIELD_EXTRACTORS for name in names)
+
+
+def extract_data_from_text(text, global_text=None, context=None, fields=None):
+    # fields (set de nume din EXTRACTED_FIELDS) → doar extractorii acestor câmpuri; restul rămân la valoarea implicită
+    if context is None:
+        context = DocumentContext(text if global_text is None else global_text)
+    # Procesăm separat textul local (doar blocul); tot ce ține de fișierul întreg vine din context
+    local_text = normalize_text(text)
+
+    values = {}
+    for names, extractor in FIELD_EXTRACTORS:
+        if fields is None or not fields.isdisjoint(names):
+            values.update(extractor(text, local_text, context))
+    return InvoiceRow(**values)
 
-        # date care sunt doar în header / prima pagină → extragem din global_text
-        "factura": find(r"(?:Nr\. factura|Serie\s*/\s*Nr\.):?\s*([A-Z]+/?\d+)", global_text),
-        "data_emitere": find(r"Dat[ăa] emitere:?\s*(\d{2}\.\d{2}\.\d{4})", global_text),
-        "data_scadenta": find(r"Data scadent[ăa]:?\s*(\d{2}\.\d{2}\.\d{4})", global_text),
-        "perioada_start": find(r"Perioad[ăa] (?:de facturare)?:?\s*(\d{2}\.\d{2}\.\d{4})", global_text),
-        "perioada_end": find(r"Perioad[ăa] (?:de facturare)?:?\s*\d{2}\.\d{2}\.\d{4} - (\d{2}\.\d{2}\.\d{4})",
-                             global_text),
-        "total_net": parse_number(
-            find(r"Valoare facturat[ăa] f[ăa]r[ăa] TVA.*?([\-−–]?\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))", global_text)),
-        "valoare_fara_TVA": parse_number(
-            find(r"Valoare facturat[ăa] f[ăa]r[ăa] TVA.*?([\-−–]?\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))", global_text)),
-        "valoare_cu_TVA": parse_number(
-            find(r"TOTAL FACTUR[ĂA] CURENT[ĂA] CU TVA\s+([\-−–]?\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))", global_text)),
-        "total_plata": parse_number(
-            find(r"TOTAL DE PLAT[ĂA][^\d\-]*([\-−–]?\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))", global_text) or find(
-                r"Cod de bare.*?([\-−–]?\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))", global_text)),
-        "sold_anterior": parse_number(
-            find(r"Sold la data emiterii facturii.*?([\-−–]?\d{1,3}(?:[.,]\d{3})*(?:[.,]\d{2}))", global_text)),
-
-        # opționale, din bloc (dacă există)
-        "index_vechi": parse_number(find(r"Index vechi[^0-9]*([\d.,]+)", text)),
-        "index_nou": parse_number(find(r"Index nou[^0-9]*([\d.,]+)", text)),
-        "cantitate": parse_number(
-            find(r"Total EA.*?([\d.,]+)\s*kWh", text) or
-            find(r"Cantitate facturat[ăa]\s*([\d.,]+)\s*kWh", text) or
-            find(r"Total energie activ[ăa]\s*([\d.,]+)\s*kWh", text))
-    }
 
-    data.update(extract_all_indexes(local_text, fallback_text=full_text))
-    data.update(extract_sume_cantitati(local_text, fallback_text=full_text))
+# Secțiune tipizată din textul unui document: tip ∈ header / loc_consum / citiri / produse / total,
+# [start, end) = de la marcaj până la următorul marcaj (de orice tip), body_start = imediat după marcaj
+Section = namedtuple("Section", "tip start body_start end")
 
-    return data
 
+def tokenize_sections(text):
+    # O singură trecere prin text; extractorii folosesc apoi offset-urile în loc să re-scaneze documentul
+    sections = []
+    tip, start, body_start = "header", 0, 0
+    for match in PATTERNS["sectiuni"].finditer(text):
+        sections.append(Section(tip, start, body_start, match.start()))
+        tip, start, body_start = match.lastgroup, match.start(), match.end()
+    sections.append(Section(tip, start, body_start, len(text)))
+    return sections
 
-def split_pdf_by_blocuri(text):
-    blocuri = re.split(r"(?=DETALII LOC DE (?:CONSUM|PRODUCERE ȘI CONSUM))", text, flags=re.IGNORECASE)
 
+def split_pdf_by_blocuri(text, sections=None):
+    if sections is None:
+        sections = tokenize_sections(text)
+
+    # Un bloc ține de la un marcaj „DETALII LOC DE CONSUM” până la următorul (textul dinaintea primului marcaj
+    # e și el un bloc candidat); POD / LOCALITATEA sunt căutate direct în intervalul blocului, fără copii upper()
+    starts = [0] + [section.start for section in sections if section.tip == "loc_consum"]
+    ends = starts[1:] + [len(text)]
     rezultate = []
-    for bloc in blocuri:
-        upper_bloc = bloc.upper()
-        if "POD" in upper_bloc and "LOCALITATEA" in upper_bloc:
-            rezultate.append(bloc)
+    for start, end in zip(starts, ends):
+        if PATTERNS["bloc_pod"].search(text, start, end) and PATTERNS["bloc_localitatea"].search(text, start, end):
+            rezultate.append(text[start:end])
     return rezultate
 
 
+# === Pipeline: fișiere → text pagini → blocuri → câmpuri → validare → sink ===
+# Fiecare etapă e un generator; în memorie stă cel mult un document odată.
+
+def list_pdfs(folder_path):
+    # Ordine sortată → rezultate deterministe indiferent de numărul de procese
+    return sorted(f for f in os.listdir(folder_path) if f.lower().endswith(".pdf"))
+
+
+def iter_pdf_paths(folder_path):
+    for filename in list_pdfs(folder_path):
+        yield os.path.join(folder_path, filename)
 
-def process_pdfs(folder_path, output_excel_path):
-    rows = []
-    for filename in os.listdir(folder_path):
-        if not filename.lower().endswith(".pdf"):
+
+def is_relevant_page(text):
+    # Căutare de subșiruri pe textul cu litere mici: mult mai ieftină decât un regex cu alternative
+    text = text.lower()
+    return any(marker in text for marker in PAGE_MARKERS)
+
+
+def iter_relevant_pages(texts):
+    # Paginile fără niciun marcaj folosit de extractori (termeni, reclame, cupoane de plată fără sume)
+    # nu mai intră în textul documentului și nu mai sunt scanate de regex-uri
+    for text in texts:
+        if not is_relevant_page(text):
+            _count("pagini_sarite")
             continue
-        pdf_path = os.path.join(folder_path, filename)
+        yield text
+
+
+def iter_page_texts(doc, flags=PAGE_TEXT_FLAGS, only_relevant=True):
+    # Paginile sunt citite pe rând
+    texts = (page.get_text(flags=flags) for page in doc)
+    return iter_relevant_pages(texts) if only_relevant else texts
+
+
+def read_page_texts(doc, flags=PAGE_TEXT_FLAGS):
+    # Toate paginile, nefiltrate: forma păstrată în PageTextStore
+    with _stage("get_text"):
+        return [page.get_text(flags=flags) for page in doc]
+
+
+def iter_extracted_rows(blocuri, context, fields=None):
+    for bloc in blocuri:
+        yield extract_data_from_text(bloc, context=context, fields=fields)
+
+
+def iter_validated_rows(rows):
+    # Rândurile fără niciun index / cantitate nu sunt citiri; alertele se calculează ulterior, pe lot (validate_rows)
+    for data in rows:
+        # Rândurile incomplete din cauza bugetului de timp rămân, ca să apară marcate în rezultat
+        if data.campuri_depasite or any(data[name] != 0 for name in _ROW_MEASURE_FIELDS):
+            yield data
+
+
+def _split_document(full_text):
+    context = DocumentContext(full_text)
+    with _stage("split"):
+        blocuri = split_pdf_by_blocuri(full_text, context.sections)
+    return context, blocuri
+
+
+def _extract_blocuri(blocuri, context, time_budget, fields=None):
+    with _stage("extract"), match_budget(time_budget) as budget:
+        extracted = list(iter_extracted_rows(blocuri, context, fields))
+    if budget.skipped:
+        # Bugetul e pe document: toate rândurile lui sunt marcate cu regex-urile care n-au mai rulat
+        _count("buget_depasit")
+        print(f"[⚠️] Timp de extracție depășit, câmpuri sărite: {', '.join(sorted(budget.skipped))}")
+        for data in extracted:
+            data.campuri_depasite = tuple(sorted(budget.skipped))
+    return extracted
+
+
+def _extract_rows(context, blocuri, time_budget):
+    extracted = _extract_blocuri(blocuri, context, time_budget)
+    with _stage("validate"):
+        rows = list(iter_validated_rows(extracted))
+    _count("blocuri", len(blocuri))
+    return rows, len(blocuri)
+
+
+def extract_rows_from_document(doc, time_budget=DOCUMENT_TIME_BUDGET, **page_options):
+    with _stage("get_text"):
+        full_text = "\n".join(iter_page_texts(doc, **page_options))
+    return _extract_rows(*_split_document(full_text), time_budget)
+
+
+def extract_rows_from_pages(pages, time_budget=DOCUMENT_TIME_BUDGET):
+    # Paginile deja citite (read_page_texts / PageTextStore): aceeași filtrare ca iter_page_texts
+    return _extract_rows(*_split_document("\n".join(iter_relevant_pages(pages))), time_budget)
+
+
+def reextract_rows(pages, rows=None, fields=None, time_budget=DOCUMENT_TIME_BUDGET):
+    # Re-extracție din textul păstrat al paginilor, fără PDF. Cu fields + rows (rândurile vechi ale documentului),
+    # pe fiecare bloc rulează doar extractorii acelor câmpuri (plus POD, pentru aliniere) și doar ele se
+    # înlocuiesc în rows. Extracția completă rămâne necesară când câmpurile decid ce blocuri devin rânduri
+    # (indexuri / cantități) sau când blocurile nu se mai aliniază cu rândurile vechi.
+    # Întoarce (rânduri, nr_blocuri, parțial)
+    context, blocuri = _split_document("\n".join(iter_relevant_pages(pages)))
+    partial = (fields is not None and rows is not None and fields.isdisjoint(_ROW_MEASURE_FIELDS)
+               and len(blocuri) == len(rows) and not any(data.campuri_depasite for data in rows))
+    if partial:
+        extracted = _extract_blocuri(blocuri, context, time_budget, fields | {"POD"})
+        if all(new.POD == old.POD and not new.campuri_depasite for new, old in zip(extracted, rows)):
+            for old, new in zip(rows, extracted):
+                for name in fields:
+                    old[name] = new[name]
+            _count("blocuri", len(blocuri))
+            return rows, len(blocuri), True
+    return (*_extract_rows(context, blocuri, time_budget), False)
+
+
+def _open_pdf_bytes(pdf_bytes):
+    with _stage("open"):
+        return fitz.open(stream=pdf_bytes, filetype="pdf")
+
+
+def process_pdf_bytes(filename, pdf_bytes, cache=None):
+    # PDF-ul e deschis direct din memorie (fitz stream), fără fișier temporar
+    metrics = _metrics.get()
+    if metrics is None:
+        return _process_pdf_bytes(filename, pdf_bytes, cache)
+    metrics.current_file = filename
+    _count("fisiere")
+    try:
+        return _process_pdf_bytes(filename, pdf_bytes, cache)
+    finally:
+        metrics.current_file = None
+
+
+def _process_pdf_bytes(filename, pdf_bytes, cache):
+    if cache is None:
+        rows, nr_blocuri = extract_rows_from_document(_open_pdf_bytes(pdf_bytes))
+    else:
+        digest = hashlib.sha256(pdf_bytes).hexdigest()
+        texts = cache.texts
+        cached = cache.get(digest)
+        if cached is not None:
+            _count("cache_hit")
+            rows, nr_blocuri = cached
+            if texts is not None and not texts.has(digest):
+                # PDF extras înaintea PageTextStore: se completează doar textul, fără extracție
+                texts.put(digest, read_page_texts(_open_pdf_bytes(pdf_bytes)))
+        else:
+            _count("cache_miss")
+            if texts is None:
+                rows, nr_blocuri = extract_rows_from_document(_open_pdf_bytes(pdf_bytes))
+            else:
+                pages = read_page_texts(_open_pdf_bytes(pdf_bytes))
+                texts.put(digest, pages)
+                rows, nr_blocuri = extract_rows_from_pages(pages)
+            # Un document oprit de bugetul de timp nu intră în cache: altă rulare poate avea mai mult timp
+            if not any(data.campuri_depasite for data in rows):
+                cache.put(digest, rows, nr_blocuri)
+
+    # Numele fișierului nu intră în cache: același PDF poate veni sub alt nume
+    for data in rows:
+        data["fisier"] = filename
+    return rows, nr_blocuri
+
+
+def process_pdf_file(pdf_path, cache=None):
+    with open(pdf_path, "rb") as f:
+        pdf_bytes = f.read()
+    return process_pdf_bytes(os.path.basename(pdf_path), pdf_bytes, cache=cache)
+
+
+def source_name(source):
+    # O sursă e fie calea unui PDF pe disc, fie un tuplu (nume fișier, bytes) venit din memorie
+    return source[0] if isinstance(source, tuple) else os.path.basename(source)
+
+
+def process_source(source, cache=None):
+    # Rulează în procesele din pool (și din view-ul async): excepțiile se întorc ca text, nu se propagă
+    try:
+        if isinstance(source, tuple):
+            rows, nr_blocuri = process_pdf_bytes(*source, cache=cache)
+        else:
+            rows, nr_blocuri = process_pdf_file(source, cache=cache)
+        return rows, nr_blocuri, None
+    except Exception as e:
+        return [], 0, str(e)
+
+
+def _process_pdf_chunk(sources, cache=None, profile=None):
+    # profile=None → fără metrici; altfel chunk-ul își colectează metricile și le trimite înapoi
+    if profile is None:
+        # Procesul din pool e un fork al părintelui: contextul moștenit nu trebuie să mai colecteze nimic
+        token = _metrics.set(None)
         try:
-            doc = fitz.open(pdf_path)
-            full_text = "\n".join(page.get_text() for page in doc)
-            blocuri = split_pdf_by_blocuri(full_text)
-            for bloc in blocuri:
-                data = extract_data_from_text(bloc, global_text=full_text)
+            return [process_source(source, cache=cache) for source in sources], None
+        finally:
+            _metrics.reset(token)
+    with collect_metrics(profile=profile) as metrics:
+        results = [process_source(source, cache=cache) for source in sources]
+    return results, metrics.to_dict(include_raw_profile=True)
 
-                # ✅ Calcul diferențe
-                delta_activ = round(data["index_activ_nou"] - data["index_activ_vechi"], 3)
-                delta_reactivi = round(data["index_reactivi_nou"] - data["index_reactivi_vechi"], 3)
-                delta_reactivc = round(data["index_reactivc_nou"] - data["index_reactivc_vechi"], 3)
 
-                alert = []
-                if abs(delta_activ - data["cantitate_activ"]) > 1:
-                    alert.append("index activ ≠ cantitate")
+def _iter_file_results(sources, workers, chunksize, cache):
+    if workers <= 1:
+        for source in sources:
+            yield process_source(source, cache=cache)
+        return
 
-                if abs(delta_reactivi - data["cantitate_reactivi"]) > 1:
-                    alert.append("index reactiv I ≠ cantitate")
+    # Trimitem câte chunksize fișiere per task și ținem cel mult 2 × workers task-uri în zbor,
+    # ca rezultatele gata dar neconsumate să nu se adune în memorie. Ordinea se păstrează.
+    chunksize = max(1, chunksize)
+    metrics = _metrics.get()
+    profile = metrics.profile if metrics is not None else None
 
-                if abs(delta_reactivc - data["cantitate_reactivc"]) > 1:
-                    alert.append("index reactiv C ≠ cantitate")
+    def chunk_results(future):
+        results, summary = future.result()
+        if summary is not None and metrics is not None:
+            metrics.merge(summary)
+        return results
 
-                data["alerta"] = " | ".join(alert)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for start in range(0, len(sources), chunksize):
+            pending.append(pool.submit(_process_pdf_chunk, sources[start:start + chunksize], cache, profile))
+            if len(pending) >= 2 * workers:
+                yield from chunk_results(pending.popleft())
+        while pending:
+            yield from chunk_results(pending.popleft())
 
-                if any([v != 0 for k, v in data.items() if k.startswith("index_") or k.startswith("cantitate")]):
-                    data["fisier"] = filename
-                    rows.append(data)
 
-            print(f"[✔] Procesat: {filename} ({len(blocuri)} blocuri)")
-        except Exception as e:
-            print(f"[⚠️] Eroare la {filename}: {e}")
+# === Validare pe lot: regulile rulează vectorizat (numpy / pandas) pe coloanele unui lot de rânduri ===
+# tip: index_vs_citit (index nou − vechi față de cantitatea citită), citit_vs_facturat, tva, duplicat (POD + perioadă).
+# Fiecare regulă dă un flag per rând; excel=True → mesajul apare și în coloana „alerta” din Excel.
+VALIDATION_RULES = {
+    "index_activ": {"tip": "index_vs_citit", "energie": "activ", "prag": 1, "mesaj": "index activ ≠ cantitate"},
+    "index_reactivi": {"tip": "index_vs_citit", "energie": "reactivi", "prag": 1,
+                       "mesaj": "index reactiv I ≠ cantitate"},
+    "index_reactivc": {"tip": "index_vs_citit", "energie": "reactivc", "prag": 1,
+                       "mesaj": "index reactiv C ≠ cantitate"},
+    "facturat_reactivc": {"tip": "citit_vs_facturat", "energie": "reactivc", "prag": 100,
+                          "mesaj": "⚠️ Diferență mare la reactiv C", "excel": True},
+    "tva": {"tip": "tva", "cote": (0.19, 0.21), "prag": 0.01, "mesaj": "TVA inconsistent"},
+    "duplicat": {"tip": "duplicat", "mesaj": "POD / perioadă duplicat"},
+    "timp_depasit": {"tip": "campuri_depasite", "mesaj": "⏱ Extracție incompletă (timp depășit)", "excel": True},
+}
+VALIDATION_BATCH_ROWS = 5000
+
+_VALIDATION_NUMERIC = tuple(f"{prefix}_{v}{suffix}"
+                            for prefix, suffix in (("index", "_vechi"), ("index", "_nou"), ("cantitate", ""),
+                                                   ("cantitate_facturata", ""))
+                            for v in ("activ", "reactivi", "reactivc")) + ("valoare_fara_TVA", "valoare_cu_TVA")
+_VALIDATION_TEXT = ("POD", "perioada_start", "perioada_end", "campuri_depasite")
+
+
+def _check_index_vs_citit(frame, rule, seen):
+    v = rule["energie"]
+    delta = np.round(frame[f"index_{v}_nou"] - frame[f"index_{v}_vechi"], 3)
+    return (delta - frame[f"cantitate_{v}"]).abs() > rule["prag"]
+
+
+def _check_citit_vs_facturat(frame, rule, seen):
+    v = rule["energie"]
+    return (frame[f"cantitate_{v}"] - frame[f"cantitate_facturata_{v}"]).abs() > rule["prag"]
+
+
+def _check_tva(frame, rule, seen):
+    # Valoare lipsă (0) = extracție incompletă, nu inconsistență
+    fara, cu = frame["valoare_fara_TVA"], frame["valoare_cu_TVA"]
+    consistent = np.zeros(len(frame), dtype=bool)
+    for cota in rule["cote"]:
+        consistent |= ((cu - fara * (1 + cota)).abs() <= rule["prag"] * cu.abs()).to_numpy()
+    return ~consistent & (fara != 0).to_numpy() & (cu != 0).to_numpy()
+
+
+def _check_duplicat(frame, rule, seen):
+    # seen persistă între loturi → duplicatele sunt găsite în tot batch-ul, nu doar în lotul curent
+    has_pod = frame["POD"] != ""
+    keys = frame["POD"] + "|" + frame["perioada_start"] + "|" + frame["perioada_end"]
+    # isin(seen) ar converti tot setul la fiecare lot; verificarea directă în set rămâne O(lot)
+    already_seen = np.array([key in seen for key in keys.tolist()], dtype=bool)
+    duplicate = (keys.duplicated().to_numpy() | already_seen) & has_pod.to_numpy()
+    seen.update(keys[has_pod])
+    return duplicate
+
+
+def _check_campuri_depasite(frame, rule, seen):
+    return frame["campuri_depasite"].astype(bool).to_numpy()
+
+
+_VALIDATION_CHECKS = {
+    "index_vs_citit": _check_index_vs_citit,
+    "citit_vs_facturat": _check_citit_vs_facturat,
+    "tva": _check_tva,
+    "duplicat": _check_duplicat,
+    "campuri_depasite": _check_campuri_depasite,
+}
+
+
+_numeric_values = attrgetter(*_VALIDATION_NUMERIC)
+_text_values = attrgetter(*_VALIDATION_TEXT)
+
+
+def _validation_frame(rows):
+    # O singură trecere prin rânduri per tip de coloană; dicționarele (sau rândurile incomplete) iau calea lentă
+    try:
+        numeric = np.array([_numeric_values(data) for data in rows], dtype=float)
+        text = [_text_values(data) for data in rows]
+    except AttributeError:
+        numeric = np.array([[data.get(name, 0) for name in _VALIDATION_NUMERIC] for data in rows], dtype=float)
+        text = [[data.get(name, "") for name in _VALIDATION_TEXT] for data in rows]
+    columns = dict(zip(_VALIDATION_NUMERIC, numeric.T))
+    columns.update(zip(_VALIDATION_TEXT, zip(*text)))
+    return pd.DataFrame(columns)
+
+
+def validate_rows(rows, rules=VALIDATION_RULES, state=None):
+    # rows = listă; fiecare rând primește "alerte" (numele regulilor încălcate) și "alerta" (mesajele lor).
+    # state păstrează între apeluri ce trebuie văzut pe tot batch-ul (cheile deja întâlnite pentru duplicate).
+    state = {} if state is None else state
+    if not rows:
+        return rows
+
+    names = list(rules)
+    codes = np.zeros(len(rows), dtype=np.int64)
+    if names:
+        frame = _validation_frame(rows)
+        for bit, name in enumerate(names):
+            rule = rules[name]
+            flags = np.asarray(_VALIDATION_CHECKS[rule["tip"]](frame, rule, state.setdefault(name, set())), dtype=bool)
+            codes |= flags.astype(np.int64) << bit
+
+    # Combinațiile distincte de reguli încălcate sunt puține → mesajele se construiesc o dată per combinație
+    combos = {}
+    for code in np.unique(codes).tolist():
+        alerte = tuple(name for bit, name in enumerate(names) if code >> bit & 1)
+        combos[code] = (alerte, " | ".join(rules[name]["mesaj"] for name in alerte))
+    for data, code in zip(rows, codes.tolist()):
+        data["alerte"], data["alerta"] = combos[code]
+    _count("randuri_cu_alerte", int(np.count_nonzero(codes)))
     return rows
 
 
-def finalize_excel(data_rows, output_excel_path):
-    df = pd.DataFrame(data_rows)
-
-    multi_columns = pd.MultiIndex.from_tuples([
-        ("", "loc consum"), ("", "PERIOADA CONSUM"), ("", ""), ("", "POD"), ("", "factura"),
-        ("", "pret"), ("", "valoare_fara_TVA"), ("", "valoare_cu_TVA"), ("", "total_plata"),
-        ("", "sold_anterior"), ("index vechi", "activ"), ("index vechi", "reactiv I"), ("index vechi", "reactiv C"),
-        ("index nou", "activ"), ("index nou", "reactiv I"), ("index nou", "reactiv C"),
-        ("cantitate citita", "activ"), ("cantitate citita", "reactiv I"), ("cantitate citita", "reactiv C"),
-        ("cantitate facturata", "activ"), ("cantitate facturata", "reactiv I"), ("cantitate facturata", "reactiv C"),
-        ("", "fisier"), ("", "alerta")
-    ])
-
-    df_reordered = pd.DataFrame([
-        [
-            row.get("loc_consum", ""),
-            row.get("perioada_start", "") + "-" + row.get("perioada_end", ""),
-            "",
-            row.get("POD", ""),
-            row.get("factura", ""),
-            row.get("total_net", 0),
-            row.get("valoare_fara_TVA", 0),
-            row.get("valoare_cu_TVA", 0),
-            row.get("total_plata", 0),
-            row.get("sold_anterior", 0),
-            row.get("index_activ_vechi", 0),
-            row.get("index_reactivi_vechi", 0),
-            row.get("index_reactivc_vechi", 0),
-            row.get("index_activ_nou", 0),
-            row.get("index_reactivi_nou", 0),
-            row.get("index_reactivc_nou", 0),
-            row.get("cantitate_activ", 0),
-            row.get("cantitate_reactivi", 0),
-            row.get("cantitate_reactivc", 0),
-            row.get("cantitate_facturata_activ", 0),
-            row.get("cantitate_facturata_reactivi", 0),
-            row.get("cantitate_facturata_reactivc", 0),
-            row.get("fisier", ""),
-            "⚠️ Diferență mare la reactiv C" if abs(
-                row.get("cantitate_reactivc", 0) - row.get("cantitate_facturata_reactivc", 0)) > 100 else ""
-        ] for row in data_rows
-    ], columns=multi_columns)
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Facturi"
-    ws.freeze_panes = "A3"
+def iter_source_rows(sources, workers=1, chunksize=1, on_file=None, cache=None, rules=VALIDATION_RULES,
+                     batch_rows=VALIDATION_BATCH_ROWS, on_progress=None):
+    sources = list(sources)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(sources))
+
+    # Rândurile se strâng în loturi de ~batch_rows și sunt validate împreună; ordinea rămâne aceeași:
+    # rândurile fiecărui fișier ies imediat înaintea apelului on_file pentru acel fișier. on_progress (aceeași
+    # semnătură) vine imediat ce fișierul e extras, fără să aștepte validarea lotului → progres per fișier
+    state = {}
+    batch, done_files = [], []
+
+    def flush():
+        with _stage("validate_batch"):
+            validate_rows(batch, rules, state)
+        start = 0
+        for filename, nr_rows, nr_blocuri, error in done_files:
+            yield from batch[start:start + nr_rows]
+            start += nr_rows
+            # on_file(filename, nr_blocuri, error) → progres pentru apelant (ex. joburi în fundal)
+            if on_file is not None:
+                on_file(filename, nr_blocuri, error)
+        batch.clear()
+        done_files.clear()
+
+    results = _iter_file_results(sources, workers, chunksize, cache)
+    for source, (file_rows, nr_blocuri, error) in zip(sources, results):
+        filename = source_name(source)
+        if error is not None:
+            print(f"[⚠️] Eroare la {filename}: {error}")
+        else:
+            print(f"[✔] Procesat: {filename} ({nr_blocuri} blocuri)")
+            batch.extend(file_rows)
+        done_files.append((filename, len(file_rows), nr_blocuri, error))
+        if on_progress is not None:
+            on_progress(filename, nr_blocuri, error)
+        if len(batch) >= batch_rows:
+            yield from flush()
+    yield from flush()
+
+
+def iter_rows(folder_path, **kwargs):
+    return iter_source_rows(iter_pdf_paths(folder_path), **kwargs)
+
+
+def process_pdfs(folder_path, output_excel_path, workers=1, chunksize=1, on_file=None, cache=None):
+    return list(iter_rows(folder_path, workers=workers, chunksize=chunksize, on_file=on_file, cache=cache))
+
+
+def run_pipeline(folder_path, output_path, export_format="xlsx", **kwargs):
+    # Rândurile curg direct din extracție în exportator, fără listă intermediară
+    return export_rows(iter_rows(folder_path, **kwargs), output_path, export_format=export_format,
+                       rules=kwargs.get("rules", VALIDATION_RULES))
+
+
+# Antetul pe două rânduri al foii Excel: (grup, coloană); grupurile nevide se unesc pe rândul 1
+EXCEL_COLUMNS = [
+    ("", "loc consum"), ("", "PERIOADA CONSUM"), ("", ""), ("", "POD"), ("", "factura"),
+    ("", "pret"), ("", "valoare_fara_TVA"), ("", "valoare_cu_TVA"), ("", "total_plata"),
+    ("", "sold_anterior"), ("index vechi", "activ"), ("index vechi", "reactiv I"), ("index vechi", "reactiv C"),
+    ("index nou", "activ"), ("index nou", "reactiv I"), ("index nou", "reactiv C"),
+    ("cantitate citita", "activ"), ("cantitate citita", "reactiv I"), ("cantitate citita", "reactiv C"),
+    ("cantitate facturata", "activ"), ("cantitate facturata", "reactiv I"), ("cantitate facturata", "reactiv C"),
+    ("", "fisier"), ("", "alerta")
+]
+EXCEL_MERGE_GROUPS = {
+    "index vechi": (11, 13),
+    "index nou": (14, 16),
+    "cantitate citita": (17, 19),
+    "cantitate facturata": (20, 22)
+}
+# Benzile de culoare pe coloane (1-based); coloana 24 (alerta) e colorată doar când are valoare
+EXCEL_FILL_COLORS = {
+    "index_vechi": ("C6EFCE", (11, 12, 13)),
+    "index_nou": ("E4DFEC", (14, 15, 16)),
+    "cantitate_citita": ("DDEBF7", (17, 18, 19)),
+    "cantitate_facturata": ("FCE4D6", (20,)),
+    "cantitate_facturata_c": ("FFF2CC", (21, 22)),
+    "alerta": ("FFC7CE", ()),
+}
+EXCEL_ALERT_COLUMN = 24
+
+
+def excel_row_values(row, rules=VALIDATION_RULES):
+    # row = InvoiceRow: atribute citite direct, fără căutări în dict; un dict (ex. citit din JSON) e convertit întâi
+    if not isinstance(row, InvoiceRow):
+        row = InvoiceRow.from_dict(row)
+    return [
+        row.loc_consum,
+        row.perioada_start + "-" + row.perioada_end,
+        "",
+        row.POD,
+        row.factura,
+        row.total_net,
+        row.valoare_fara_TVA,
+        row.valoare_cu_TVA,
+        row.total_plata,
+        row.sold_anterior,
+        row.index_activ_vechi,
+        row.index_reactivi_vechi,
+        row.index_reactivc_vechi,
+        row.index_activ_nou,
+        row.index_reactivi_nou,
+        row.index_reactivc_nou,
+        row.cantitate_activ,
+        row.cantitate_reactivi,
+        row.cantitate_reactivc,
+        row.cantitate_facturata_activ,
+        row.cantitate_facturata_reactivi,
+        row.cantitate_facturata_reactivc,
+        row.fisier,
+        " | ".join(rules[name]["mesaj"] for name in row.alerte if rules.get(name, {}).get("excel"))
+    ]
+
 
-    for r in dataframe_to_rows(df_reordered, index=False, header=True):
-        ws.append(r)
+def _excel_header_rows():
+    titlu = [None] * len(EXCEL_COLUMNS)
+    merged = set()
+    for title, (start_col, end_col) in EXCEL_MERGE_GROUPS.items():
+        titlu[start_col - 1] = title
+        merged.update(range(start_col + 1, end_col + 1))
+    coloane = [sub or None for _, sub in EXCEL_COLUMNS]
+    return titlu, coloane, merged
 
-    bold_center = Font(bold=True)
-    center = Alignment(horizontal="center", vertical="center")
+
+def _register_excel_styles(wb):
+    # Stiluri cu nume, înregistrate o singură dată în workbook și refolosite de toate celulele
     thin_border = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'),
                          bottom=Side(style='thin'))
+    bands = {col: band for band, (_, cols) in EXCEL_FILL_COLORS.items() for col in cols}
+    styles = {}
+    for band in [None, *EXCEL_FILL_COLORS]:
+        for header in (False, True):
+            name = f"facturi_{'header' if header else 'body'}_{band or 'simplu'}"
+            style = NamedStyle(name=name, border=thin_border)
+            if header:
+                style.font = Font(bold=True)
+                style.alignment = Alignment(horizontal="center", vertical="center")
+            if band is not None:
+                color = EXCEL_FILL_COLORS[band][0]
+                style.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+            wb.add_named_style(style)
+            styles[band, header] = name
 
-    for row in ws.iter_rows(min_row=1, max_row=2):
-        for cell in row:
-            cell.font = bold_center
-            cell.alignment = center
-            cell.border = thin_border
-
-    merge_groups = {
-        "index vechi": (11, 13),
-        "index nou": (14, 16),
-        "cantitate citita": (17, 19),
-        "cantitate facturata": (20, 22)
-    }
-    for title, (start_col, end_col) in merge_groups.items():
-        ws.merge_cells(start_row=1, start_column=start_col, end_row=1, end_column=end_col)
-        ws.cell(row=1, column=start_col).value = title
-        for col in range(start_col, end_col + 1):
-            ws.cell(row=2, column=col).value = multi_columns[col - 1][1]
-
-    fill_colors = {
-        "index_vechi": PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid"),
-        "index_nou": PatternFill(start_color="E4DFEC", end_color="E4DFEC", fill_type="solid"),
-        "cantitate_citita": PatternFill(start_color="DDEBF7", end_color="DDEBF7", fill_type="solid"),
-        "cantitate_facturata": PatternFill(start_color="FCE4D6", end_color="FCE4D6", fill_type="solid"),
-        "cantitate_facturata_c": PatternFill(start_color="FFF2CC", end_color="FFF2CC", fill_type="solid")
-    }
+    def style_for(col, value, header=False):
+        if col == EXCEL_ALERT_COLUMN and value:
+            return styles["alerta", header]
+        return styles[bands.get(col), header]
+
+    return style_for
+
+
+def finalize_excel(data_rows, output_excel_path, width_sample_rows=200, rules=VALIDATION_RULES):
+    # Workbook write-only: rândurile se scriu direct în fișier, memoria nu crește cu numărul de rânduri.
+    # data_rows poate fi orice iterabil (listă sau generator).
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Facturi")
+    ws.freeze_panes = "A3"
+    style_for = _register_excel_styles(wb)
+
+    titlu, coloane, merged = _excel_header_rows()
+    values_iter = (excel_row_values(row, rules) for row in data_rows)
+
+    # Lățimile coloanelor trebuie scrise înaintea rândurilor, deci le calculăm din antet și din primele
+    # width_sample_rows rânduri (exact pentru loturile mai mici decât eșantionul). Eșantionul e ținut în memorie
+    # până la scrierea lui, deci rămâne mic: valorile din coloane au lungimi apropiate de la un rând la altul.
+    sample = list(islice(values_iter, width_sample_rows))
+    max_length = [0] * len(EXCEL_COLUMNS)
+    for values in (titlu, coloane, *sample):
+        for i, value in enumerate(values):
+            if value:
+                max_length[i] = max(max_length[i], len(str(value)))
+    for i, length in enumerate(max_length):
+        ws.column_dimensions[get_column_letter(i + 1)].width = length + 2
+
+    cell_cache = {}
 
-    for row in ws.iter_rows(min_row=1, max_row=ws.max_row):
-        for cell in row:
-            if isinstance(cell, MergedCell):
+    def styled(values, header=False, skip=()):
+        cells = []
+        for col, value in enumerate(values, start=1):
+            if col in skip:
+                cells.append(None)
                 continue
-            cell.border = thin_border
-            col = cell.column
-            if col == 24 and cell.value:
-                cell.fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-            elif col in [11, 12, 13]:
-                cell.fill = fill_colors["index_vechi"]
-            elif col in [14, 15, 16]:
-                cell.fill = fill_colors["index_nou"]
-            elif col in [17, 18, 19]:
-                cell.fill = fill_colors["cantitate_citita"]
-            elif col == 20:
-                cell.fill = fill_colors["cantitate_facturata"]
-            elif col in [21, 22]:
-                cell.fill = fill_colors["cantitate_facturata_c"]
-
-    for col in ws.columns:
-        max_length = 0
-        col_letter = None
-        for cell in col:
-            if not isinstance(cell, MergedCell):
-                col_letter = cell.column_letter
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-        if col_letter:
-            ws.column_dimensions[col_letter].width = max_length + 2
-
-    wb.save(output_excel_path)
+            style = style_for(col, value, header)
+            # O celulă per (coloană, stil), refolosită: ws.append serializează rândul imediat
+            cell = cell_cache.get((col, style))
+            if cell is None:
+                cell = cell_cache[col, style] = WriteOnlyCell(ws)
+                cell.style = style
+            cell.value = value
+            cells.append(cell)
+        return cells
+
+    ws.append(styled(titlu, header=True, skip=merged))
+    ws.append(styled(coloane, header=True))
+    nr_rows = 0
+    for values in chain(sample, values_iter):
+        with _stage("excel_write"):
+            ws.append(styled(values))
+        nr_rows += 1
+
+    for start_col, end_col in EXCEL_MERGE_GROUPS.values():
+        ws.merged_cells.add(f"{get_column_letter(start_col)}1:{get_column_letter(end_col)}1")
+
+    with _stage("excel_write"):
+        wb.save(output_excel_path)
+    return nr_rows
+
+
+# === Exportatori pentru consumatori automați: aceleași coloane ca antetul Excel, fără stiluri ===
+# Numele coloanei = „grup / coloană” din EXCEL_COLUMNS; coloana goală de separare (3) nu se exportă.
+EXPORT_COLUMNS = [(i, f"{grup} / {coloana}" if grup else coloana)
+                  for i, (grup, coloana) in enumerate(EXCEL_COLUMNS) if coloana]
+EXPORT_NUMERIC_COLUMNS = range(5, 22)  # pret … cantitate facturata / reactiv C (0-based)
+EXPORT_BATCH_ROWS = 10000
+
+
+def iter_export_records(data_rows, rules=VALIDATION_RULES):
+    for row in data_rows:
+        values = excel_row_values(row, rules)
+        yield [values[i] for i, _ in EXPORT_COLUMNS]
+
+
+@contextmanager
+def _text_output(output):
+    # output = cale sau buffer binar (ex. BytesIO pentru răspunsul HTTP)
+    if isinstance(output, (str, os.PathLike)):
+        with open(output, "w", encoding="utf-8", newline="") as f:
+            yield f
+    else:
+        f = io.TextIOWrapper(output, encoding="utf-8", newline="")
+        try:
+            yield f
+        finally:
+            f.flush()
+            f.detach()  # buffer-ul apelantului rămâne deschis
+
+
+def export_csv(data_rows, output, rules=VALIDATION_RULES):
+    nr_rows = 0
+    with _text_output(output) as f:
+        f.write("\ufeff")  # BOM → Excel deschide diacriticele corect
+        writer = csv.writer(f)
+        writer.writerow([name for _, name in EXPORT_COLUMNS])
+        for record in iter_export_records(data_rows, rules):
+            with _stage("export_write"):
+                writer.writerow(record)
+            nr_rows += 1
+    return nr_rows
+
+
+def export_jsonl(data_rows, output, rules=VALIDATION_RULES):
+    names = [name for _, name in EXPORT_COLUMNS]
+    nr_rows = 0
+    with _text_output(output) as f:
+        for record in iter_export_records(data_rows, rules):
+            with _stage("export_write"):
+                f.write(json.dumps(dict(zip(names, record)), ensure_ascii=False))
+                f.write("\n")
+            nr_rows += 1
+    return nr_rows
+
+
+def export_parquet(data_rows, output, rules=VALIDATION_RULES, batch_rows=EXPORT_BATCH_ROWS):
+    # Scris pe loturi (row groups) → memoria rămâne mărginită și pentru batch-uri foarte mari
+    if pa is None:
+        raise RuntimeError("Exportul Parquet necesită pachetul pyarrow")
+    schema = pa.schema([(name, pa.float64() if i in EXPORT_NUMERIC_COLUMNS else pa.string())
+                        for i, name in EXPORT_COLUMNS])
+    nr_rows = 0
+    with pq.ParquetWriter(output, schema) as writer:
+        records = iter_export_records(data_rows, rules)
+        while batch := list(islice(records, batch_rows)):
+            with _stage("export_write"):
+                writer.write_batch(pa.record_batch(
+                    [pa.array(column, type=field.type) for column, field in zip(zip(*batch), schema)],
+                    schema=schema))
+            nr_rows += len(batch)
+    return nr_rows
+
+
+# format → (funcție de export, extensie fișier)
+EXPORTERS = {
+    "xlsx": (finalize_excel, "xlsx"),
+    "csv": (export_csv, "csv"),
+    "jsonl": (export_jsonl, "jsonl"),
+}
+if pa is not None:
+    EXPORTERS["parquet"] = (export_parquet, "parquet")
+DEFAULT_EXPORT_FORMAT = "xlsx"
+
+
+def export_rows(data_rows, output, export_format=DEFAULT_EXPORT_FORMAT, rules=VALIDATION_RULES):
+    if export_format not in EXPORTERS:
+        raise ValueError(f"Format de export necunoscut: {export_format} (disponibile: {', '.join(EXPORTERS)})")
+    exporter, _ = EXPORTERS[export_format]
+    return exporter(data_rows, output, rules=rules)
+
+
+def export_filename(stem, export_format=DEFAULT_EXPORT_FORMAT):
+    return f"{stem}.{EXPORTERS[export_format][1]}"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Extrage datele din facturile PDF dintr-un folder într-un Excel")
+    parser.add_argument("folder", help="Folderul cu fișiere PDF")
+    parser.add_argument("output", help="Calea fișierului rezultat (.xlsx sau formatul ales cu --format)")
+    parser.add_argument("--workers", type=int, default=1, help="Numărul de procese pentru extracție")
+    parser.add_argument("--chunksize", type=int, default=1, help="Fișiere trimise odată fiecărui proces")
+    parser.add_argument("--format", choices=list(EXPORTERS), default=DEFAULT_EXPORT_FORMAT,
+                        help="Formatul rezultatului")
+    args = parser.parse_args()
+
+    nr_rows = run_pipeline(args.folder, args.output, workers=args.workers, chunksize=args.chunksize,
+                           export_format=args.format)
+    print(f"[✔] {nr_rows} rânduri scrise în {args.output}")
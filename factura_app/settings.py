@@ -131,3 +131,39 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 104857600  # 100 MB limita totală (opțional)
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
+
+# === Procesare PDF ===
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", os.cpu_count() or 1))  # procese paralele pentru extracție
+PDF_CHUNKSIZE = int(os.environ.get("PDF_CHUNKSIZE", 4))  # fișiere trimise odată fiecărui proces
+
+# === Cache extracție (cheie: SHA-256 PDF + PARSER_VERSION) ===
+EXTRACTION_CACHE_DIR = os.path.join(BASE_DIR, 'media', 'cache_extractie')  # None → fără cache
+EXTRACTION_CACHE_MAX_BYTES = 200 * 1024 * 1024  # evacuare LRU peste 200 MB
+# Textul paginilor fiecărui PDF procesat (gzip, cheie SHA-256), fără evacuare: sursa pentru manage.py reextrage.
+# Se scrie doar împreună cu cache-ul de extracție și stă în afara EXTRACTION_CACHE_DIR (acolo versiunile vechi se șterg)
+PAGE_TEXT_DIR = os.path.join(BASE_DIR, 'media', 'texte_pagini')  # None → textul nu se păstrează
+
+# Loturile mici (ambele praguri) se procesează din memorie în request, sincron; restul devin joburi în fundal.
+# Pragurile rămân mici: extracția din request ține un worker web ocupat pe toată durata ei
+INLINE_MAX_FILES = int(os.environ.get("INLINE_MAX_FILES", 3))  # 0 → totul prin joburi
+INLINE_MAX_BYTES = int(os.environ.get("INLINE_MAX_BYTES", 1024 * 1024))
+# Un job „running” mai vechi de atât (secunde) e considerat abandonat (worker oprit) și e preluat din nou
+JOB_TIMEOUT = int(os.environ.get("JOB_TIMEOUT", 2 * 3600))
+
+# Reguli de validare pe lot (praguri, mesaje); None → extrage_facturi.VALIDATION_RULES
+VALIDATION_RULES = None
+
+# === Rezultate păstrate (media/temp_results), evacuate de manage.py curata_rezultate (rulat periodic) ===
+RESULT_STORE_TTL = int(os.environ.get("RESULT_STORE_TTL", 7 * 24 * 3600))  # secunde de la ultima descărcare
+RESULT_STORE_MAX_BYTES = 1024 * 1024 * 1024  # evacuare LRU peste 1 GB
+
+# === Admitere (per proces server): procesări din request simultane, coadă mărginită, cote per client ===
+# Limitele nu sunt partajate între procese: cu N workeri gunicorn / uvicorn, serverul admite până la
+# N × ADMISSION_MAX_ACTIVE procesări simultane (și N × ADMISSION_MAX_PER_CLIENT per client)
+ADMISSION_MAX_ACTIVE = int(os.environ.get("ADMISSION_MAX_ACTIVE", 2))  # upload-uri procesate simultan în request
+ADMISSION_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", 8))  # cereri care pot aștepta; peste → 503
+ADMISSION_MAX_WAIT = 30  # secunde maxime de așteptare în coadă, apoi 503
+ADMISSION_MAX_PER_CLIENT = 2  # cereri active + în așteptare per client; peste → 429
+ADMISSION_MAX_UPLOAD_BYTES = 1024 * 1024 * 1024  # Content-Length peste limită → 413, fără citirea corpului
+ADMISSION_CLIENT_HEADER = None  # ex. "HTTP_X_FORWARDED_FOR" în spatele unui proxy; None → REMOTE_ADDR
+JOB_QUEUE_MAX = int(os.environ.get("JOB_QUEUE_MAX", 50))  # joburi în așteptare; peste → 503 pentru loturi mari
@@ -1,3 +1,83 @@
+import json
+
 from django.contrib import admin
+from django.utils.html import format_html
+
+from .models import ConsumptionPoint, Invoice, Job, Reading, StoredResult
+
+
+def _pre(text):
+    return format_html('<pre style="white-space: pre-wrap">{}</pre>', text)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "status", "processed_files", "total_files", "rows", "durata_extractie", "created_at",
+                    "finished_at")
+    list_filter = ("status", "profile")
+    exclude = ("metrics",)
+    readonly_fields = ("created_at", "started_at", "finished_at", "metrici_etape", "metrici_regex",
+                       "metrici_fisiere", "metrici_profil")
+
+    @admin.display(description="Extracție (s)")
+    def durata_extractie(self, job):
+        if not job.metrics:
+            return "-"
+        return f"{sum(job.metrics['stages'].values()):.2f}"
+
+    @admin.display(description="Etape")
+    def metrici_etape(self, job):
+        if not job.metrics:
+            return "-"
+        stages = "\n".join(f"{name:<14} {sec:10.4f} s" for name, sec in job.metrics["stages"].items())
+        counters = json.dumps(job.metrics["counters"], ensure_ascii=False)
+        return _pre(f"{stages}\n\n{counters}")
+
+    @admin.display(description="Regex (hit / miss / timp)")
+    def metrici_regex(self, job):
+        if not job.metrics:
+            return "-"
+        # cele mai scumpe regex-uri primele
+        regex = sorted(job.metrics["regex"].items(), key=lambda item: item[1]["sec"], reverse=True)
+        return _pre("\n".join(f"{key:<45} {e['hit']:>7} {e['miss']:>7} {e['sec']:10.4f} s" for key, e in regex))
+
+    @admin.display(description="Cele mai lente fișiere")
+    def metrici_fisiere(self, job):
+        if not job.metrics:
+            return "-"
+        files = sorted(job.metrics["files"].items(), key=lambda item: sum(item[1].values()), reverse=True)[:20]
+        return _pre("\n".join(f"{name:<50} {sum(stages.values()):10.4f} s" for name, stages in files))
+
+    @admin.display(description="Profil cProfile")
+    def metrici_profil(self, job):
+        if not job.metrics or not job.metrics.get("profile"):
+            return "-"
+        return _pre(job.metrics["profile"])
+
+
+@admin.register(StoredResult)
+class StoredResultAdmin(admin.ModelAdmin):
+    list_display = ("batch_hash", "format", "rows", "size", "created_at", "last_access")
+    list_filter = ("format",)
+    readonly_fields = ("batch_hash", "path", "size", "rows", "created_at", "last_access")
+
+
+@admin.register(ConsumptionPoint)
+class ConsumptionPointAdmin(admin.ModelAdmin):
+    list_display = ("pod", "loc_consum")
+    search_fields = ("pod", "loc_consum")
+
+
+class ReadingInline(admin.TabularInline):
+    model = Reading
+    extra = 0
+    raw_id_fields = ("consumption_point",)
+
 
-# Register your models here.
+@admin.register(Invoice)
+class InvoiceAdmin(admin.ModelAdmin):
+    list_display = ("numar", "perioada_start", "perioada_end", "valoare_cu_TVA", "total_plata", "fisier")
+    search_fields = ("numar", "fisier")
+    date_hierarchy = "perioada_start"
+    raw_id_fields = ("job",)
+    inlines = [ReadingInline]
@@ -0,0 +1,189 @@
+import asyncio
+import math
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from functools import partial
+from itertools import count
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import Job
+
+
+class AdmissionRejected(Exception):
+    # status: 429 (cota clientului) / 503 (server ocupat); retry_after în secunde pentru antetul Retry-After
+    def __init__(self, status, reason, retry_after):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    # Admitere pentru procesările din request (upload inline / stream SSE), per proces server:
+    # cel mult max_active simultan, cel mult max_queue în așteptare (FIFO, max_wait secunde), cel mult
+    # max_per_client active + în așteptare per client. Restul primesc imediat 429 / 503 cu Retry-After,
+    # așa că latența celor admise rămâne mărginită în loc să crească odată cu încărcarea.
+    # Starea e în memoria procesului: cu N procese server (workeri gunicorn / uvicorn) limitele efective
+    # sunt de N ori mai mari, iar cota unui client se numără separat în fiecare proces.
+
+    def __init__(self, max_active, max_queue, max_per_client, max_wait):
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.max_per_client = max_per_client
+        self.max_wait = max_wait
+        self._cond = threading.Condition()
+        self._tickets = count()
+        self.queue = deque()
+        self.active = 0
+        self.clients = Counter()
+        self.counters = Counter()
+        self.waits = deque(maxlen=1000)  # timpii de așteptare recenți, pentru percentile
+        self.service_time = 5.0  # medie exponențială a duratei unei procesări, pentru Retry-After
+
+    def retry_after(self):
+        # Estimare: cât durează până se eliberează destule locuri pentru coada curentă + această cerere
+        return max(1, min(60, math.ceil(self.service_time * (len(self.queue) + 1) / self.max_active)))
+
+    def _reject(self, status, reason, counter):
+        self.counters[counter] += 1
+        raise AdmissionRejected(status, reason, self.retry_after())
+
+    def acquire(self, client):
+        with self._cond:
+            if self.clients[client] >= self.max_per_client:
+                self._reject(429, "Prea multe procesări simultane de la acest client", "respinse_client")
+            if (self.active >= self.max_active or self.queue) and len(self.queue) >= self.max_queue:
+                self._reject(503, "Serverul este ocupat, încearcă din nou mai târziu", "respinse_coada")
+
+            ticket = next(self._tickets)
+            self.queue.append(ticket)
+            self.clients[client] += 1
+            start = time.monotonic()
+            deadline = start + self.max_wait
+            try:
+                # FIFO: o cerere nouă nu trece înaintea celor care așteaptă deja
+                while self.active >= self.max_active or self.queue[0] != ticket:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._reject(503, "Timpul de așteptare în coadă a expirat", "expirate")
+                    self._cond.wait(remaining)
+            except BaseException:
+                self._forget_client(client)
+                raise
+            finally:
+                self.queue.remove(ticket)
+                self._cond.notify_all()
+            self.active += 1
+            self.waits.append(time.monotonic() - start)
+            self.counters["admise"] += 1
+            return time.monotonic()
+
+    async def aacquire(self, client):
+        # acquire dintr-un view async: așteptarea blochează un thread, nu event loop-ul. Dacă cererea e anulată
+        # (clientul închide conexiunea) cât timp thread-ul așteaptă, locul primit ulterior se eliberează imediat.
+        future = asyncio.ensure_future(sync_to_async(self.acquire, thread_sensitive=False)(client))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            future.add_done_callback(partial(self._release_abandoned, client))
+            raise
+
+    def _release_abandoned(self, client, future):
+        if not future.cancelled() and future.exception() is None:
+            self.release(client, future.result())
+
+    def _forget_client(self, client):
+        self.clients[client] -= 1
+        if self.clients[client] <= 0:
+            del self.clients[client]
+
+    def release(self, client, started):
+        with self._cond:
+            self.active -= 1
+            self._forget_client(client)
+            self.service_time = 0.8 * self.service_time + 0.2 * (time.monotonic() - started)
+            self._cond.notify_all()
+
+    @contextmanager
+    def admit(self, client):
+        started = self.acquire(client)
+        try:
+            yield
+        finally:
+            self.release(client, started)
+
+    def snapshot(self):
+        with self._cond:
+            waits = sorted(self.waits)
+            state = {
+                "active": self.active,
+                "in_asteptare": len(self.queue),
+                "clienti": len(self.clients),
+                "max_active": self.max_active,
+                "max_coada": self.max_queue,
+                "max_per_client": self.max_per_client,
+                "durata_medie_sec": self.service_time,
+                **self.counters,
+            }
+
+        def percentile(p):
+            return waits[min(len(waits) - 1, int(p * len(waits)))] if waits else 0
+
+        state["asteptare_sec"] = {"p50": percentile(0.5), "p95": percentile(0.95), "p99": percentile(0.99),
+                                  "max": waits[-1] if waits else 0}
+        return state
+
+
+_admission = None
+_admission_lock = threading.Lock()
+
+
+def get_admission():
+    # Un singur controller per proces server; procesele nu își împart locurile (vezi AdmissionController)
+    global _admission
+    with _admission_lock:
+        if _admission is None:
+            _admission = AdmissionController(settings.ADMISSION_MAX_ACTIVE, settings.ADMISSION_MAX_QUEUE,
+                                             settings.ADMISSION_MAX_PER_CLIENT, settings.ADMISSION_MAX_WAIT)
+        return _admission
+
+
+def client_id(request):
+    # În spatele unui proxy, ADMISSION_CLIENT_HEADER (ex. "HTTP_X_FORWARDED_FOR") dă adresa reală
+    if settings.ADMISSION_CLIENT_HEADER and request.META.get(settings.ADMISSION_CLIENT_HEADER):
+        return request.META[settings.ADMISSION_CLIENT_HEADER].split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def request_size(request):
+    try:
+        return int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        return 0
+
+
+def check_job_queue():
+    # Apelat de enqueue_job → orice lot care devine job e numărat, indiferent de mărimea corpului
+    if Job.objects.filter(status=Job.STATUS_PENDING).count() >= settings.JOB_QUEUE_MAX:
+        raise AdmissionRejected(503, "Coada de joburi este plină, încearcă din nou mai târziu", 60)
+
+
+def check_upload_limits(request, queue_jobs=True):
+    # Verificări înaintea citirii corpului (doar Content-Length + numărul de joburi în așteptare). Un corp peste
+    # INLINE_MAX_BYTES sigur devine job → respins devreme; loturile cu multe fișiere mici ajung la check_job_queue.
+    size = request_size(request)
+    if size > settings.ADMISSION_MAX_UPLOAD_BYTES:
+        raise AdmissionRejected(413, f"Lot prea mare: {size / 1024 / 1024:.0f} MB (maxim "
+                                     f"{settings.ADMISSION_MAX_UPLOAD_BYTES / 1024 / 1024:.0f} MB)", None)
+    if queue_jobs and size > settings.INLINE_MAX_BYTES:
+        check_job_queue()
+
+
+def with_retry_after(response, rejected):
+    if rejected.retry_after:
+        response["Retry-After"] = str(rejected.retry_after)
+    return response
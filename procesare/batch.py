@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+
+from extrage_facturi import (DEFAULT_EXPORT_FORMAT, VALIDATION_BATCH_ROWS, VALIDATION_RULES, InvoiceRow,
+                             export_filename, export_rows, iter_source_rows, reextract_rows, validate_rows)
+
+MANIFEST_NAME = "manifest.json"
+RESULTS_NAME = "rezultate.jsonl"
+EXPORT_STEM = "facturi"
+MANIFEST_SAVE_EVERY = 50
+
+
+def iter_tree_pdfs(root):
+    # Parcurgere recursivă, în ordine sortată → aceeași ordine la fiecare rulare
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith(".pdf"):
+                yield os.path.relpath(os.path.join(dirpath, filename), root)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(f"{path}.tmp", path)
+
+
+def find_new_files(root, manifest):
+    # Un fișier e sărit dacă (mtime, size) coincid cu manifestul; dacă doar mtime s-a schimbat,
+    # hash-ul decide. Fișierele dispărute din arbore ies din manifest (și din rezultat).
+    present = set()
+    new_files = []
+    for relpath in iter_tree_pdfs(root):
+        present.add(relpath)
+        stat = os.stat(os.path.join(root, relpath))
+        entry = manifest.get(relpath)
+        if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            continue
+        sha256 = file_sha256(os.path.join(root, relpath))
+        if entry and entry["sha256"] == sha256:
+            entry.update(mtime=stat.st_mtime, size=stat.st_size)
+            continue
+        new_files.append((relpath, {"mtime": stat.st_mtime, "size": stat.st_size, "sha256": sha256}))
+
+    for relpath in set(manifest) - present:
+        del manifest[relpath]
+    return new_files
+
+
+def process_directory(root, output_dir, workers=1, chunksize=1, cache=None, rules=VALIDATION_RULES):
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    new_files = find_new_files(root, manifest)
+    changed = {relpath for relpath, _ in new_files}
+    stats = {"noi": len(new_files), "sarite": sum(relpath not in changed for relpath in manifest), "erori": 0,
+             "randuri_noi": 0}
+
+    file_rows = []
+    done = 0
+
+    with open(os.path.join(output_dir, RESULTS_NAME), "a", encoding="utf-8") as results:
+        def on_file(filename, nr_blocuri, error):
+            # on_file vine în ordinea surselor, după ce rândurile fișierului au fost produse
+            nonlocal done
+            relpath, entry = new_files[done]
+            done += 1
+            if error is not None:
+                stats["erori"] += 1
+            else:
+                for data in file_rows:
+                    data["fisier"] = relpath
+                # o linie per fișier, scrisă înaintea manifestului: la o întrerupere fișierul doar se reprocesează
+                results.write(json.dumps({"fisier": relpath, "sha256": entry["sha256"],
+                                          "rows": [data.to_dict() for data in file_rows]},
+                                         ensure_ascii=False) + "\n")
+                results.flush()
+                manifest[relpath] = {**entry, "rows": len(file_rows)}
+                stats["randuri_noi"] += len(file_rows)
+            file_rows.clear()
+            if done % MANIFEST_SAVE_EVERY == 0:
+                save_manifest(output_dir, manifest)
+
+        sources = [os.path.join(root, relpath) for relpath, _ in new_files]
+        for data in iter_source_rows(sources, workers=workers, chunksize=chunksize, on_file=on_file, cache=cache,
+                                     rules=rules):
+            file_rows.append(data)
+
+    save_manifest(output_dir, manifest)
+    return manifest, stats
+
+
+def _latest_offsets(path, manifest):
+    # Offset-ul ultimei înregistrări valide per fișier (nu și rândurile) + numărul total de înregistrări
+    offsets = {}
+    total = 0
+    with open(path, "rb") as f:
+        offset = f.tell()
+        for line in iter(f.readline, b""):
+            total += 1
+            record = json.loads(line)
+            entry = manifest.get(record["fisier"])
+            if entry and entry["sha256"] == record["sha256"]:
+                offsets[record["fisier"]] = offset
+            offset = f.tell()
+    return offsets, total
+
+
+def iter_result_rows(output_dir, manifest):
+    # Primul pas reține doar offset-urile, al doilea citește înregistrările în ordinea căilor.
+    # Înregistrările depășite sunt eliminate la final.
+    path = os.path.join(output_dir, RESULTS_NAME)
+    if not os.path.exists(path):
+        return
+
+    offsets, total = _latest_offsets(path, manifest)
+    with open(path, "rb") as f:
+        for relpath in sorted(offsets):
+            f.seek(offsets[relpath])
+            for data in json.loads(f.readline())["rows"]:
+                yield InvoiceRow.from_dict(data)
+
+    if total > len(offsets):
+        _compact_results(path, offsets)
+
+
+def _compact_results(path, offsets):
+    with open(path, "rb") as src, open(f"{path}.tmp", "wb") as dst:
+        for relpath in sorted(offsets):
+            src.seek(offsets[relpath])
+            dst.write(src.readline())
+    os.replace(f"{path}.tmp", path)
+
+
+def _extracted_values(rows):
+    # Pentru comparație: valorile extrase, fără alerte (se recalculează oricum) și independent de list / tuple
+    return json.dumps([[value for name, value in data.items() if name not in ("alerte", "alerta")] for data in rows])
+
+
+def reextract_results(output_dir, manifest, texts, fields=None, rules=VALIDATION_RULES,
+                      batch_rows=VALIDATION_BATCH_ROWS):
+    # După o corecție de regex: rândurile fiecărui fișier din manifest se refac din textul păstrat (PageTextStore),
+    # fără PDF-uri. rezultate.jsonl e rescris complet (tmp + replace) cu alertele recalculate pe tot lotul,
+    # ca la o rulare nouă; fișierele fără text păstrat își păstrează rândurile vechi.
+    path = os.path.join(output_dir, RESULTS_NAME)
+    stats = {"partiale": 0, "complete": 0, "fara_text": 0, "modificate": 0}
+    if not os.path.exists(path):
+        return stats
+
+    offsets, _ = _latest_offsets(path, manifest)
+    state = {}
+    pending = []
+
+    def flush(dst):
+        validate_rows([data for _, rows in pending for data in rows], rules, state)
+        for record, rows in pending:
+            record["rows"] = [data.to_dict() for data in rows]
+            dst.write(json.dumps(record, ensure_ascii=False) + "\n")
+        pending.clear()
+
+    with open(path, "rb") as src, open(f"{path}.tmp", "w", encoding="utf-8") as dst:
+        nr_rows = 0
+        for relpath in sorted(offsets):
+            src.seek(offsets[relpath])
+            record = json.loads(src.readline())
+            rows = [InvoiceRow.from_dict(data) for data in record["rows"]]
+            pages = texts.get(record["sha256"])
+            if pages is None:
+                stats["fara_text"] += 1
+            else:
+                before = _extracted_values(rows)
+                rows, _, partial = reextract_rows(pages, rows, fields)
+                for data in rows:
+                    data["fisier"] = relpath
+                stats["partiale" if partial else "complete"] += 1
+                if _extracted_values(rows) != before:
+                    stats["modificate"] += 1
+                    print(f"[♻️] Re-extras cu modificări: {relpath}")
+                manifest[relpath]["rows"] = len(rows)
+
+            pending.append((record, rows))
+            nr_rows += len(rows)
+            if nr_rows >= batch_rows:
+                flush(dst)
+                nr_rows = 0
+        flush(dst)
+    os.replace(f"{path}.tmp", path)
+    return stats
+
+
+def export_results(output_dir, manifest, rules=VALIDATION_RULES, export_format=DEFAULT_EXPORT_FORMAT):
+    output_path = os.path.join(output_dir, export_filename(EXPORT_STEM, export_format))
+    nr_rows = export_rows(iter_result_rows(output_dir, manifest), output_path, export_format=export_format,
+                          rules=rules)
+    return nr_rows, output_path
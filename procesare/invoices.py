@@ -0,0 +1,132 @@
+from datetime import date, datetime
+
+from django.db import transaction
+
+from extrage_facturi import InvoiceRow
+
+from .models import ConsumptionPoint, Invoice, Reading
+
+INVOICE_FIELDS = ("total_net", "valoare_fara_TVA", "valoare_cu_TVA", "total_plata", "sold_anterior")
+READING_FIELDS = tuple(f"{prefix}_{v}{suffix}"
+                       for prefix, suffix in (("index", "_vechi"), ("index", "_nou"), ("cantitate", ""),
+                                              ("cantitate_facturata", ""))
+                       for v in ("activ", "reactivi", "reactivc"))
+DATE_FORMAT = "%d.%m.%Y"
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, DATE_FORMAT).date()
+    except (TypeError, ValueError):
+        return None
+
+
+def format_date(value):
+    return value.strftime(DATE_FORMAT) if value else ""
+
+
+def months_ago(months, today=None):
+    today = today or date.today()
+    year, month = divmod(today.year * 12 + today.month - 1 - months, 12)
+    return date(year, month + 1, 1)
+
+
+def _invoice_key(data):
+    return data.get("fisier", ""), data.get("factura", "")
+
+
+@transaction.atomic
+def save_rows(rows, job=None):
+    # Rândurile vin grupate pe factură; o factură reîncărcată (același fișier și număr, inclusiv număr gol)
+    # înlocuiește versiunea veche, chiar și una salvată de același job (job reluat după JOB_TIMEOUT sau
+    # rulat din nou). Același număr din alt fișier rămâne. iter_indexed_rows nu împarte o factură în două loturi.
+    invoices = {}
+    for data in rows:
+        invoices.setdefault(_invoice_key(data), []).append(data)
+
+    previous = Invoice.objects.filter(fisier__in={fisier for fisier, _ in invoices})
+    stale = [pk for pk, fisier, numar in previous.values_list("pk", "fisier", "numar") if (fisier, numar) in invoices]
+    Invoice.objects.filter(pk__in=stale).delete()
+
+    pods = {}
+    for data in rows:
+        if data.get("POD"):
+            pods.setdefault(data["POD"], data.get("loc_consum", ""))
+    ConsumptionPoint.objects.bulk_create(
+        [ConsumptionPoint(pod=pod, loc_consum=loc_consum) for pod, loc_consum in pods.items()],
+        ignore_conflicts=True)
+    points = ConsumptionPoint.objects.in_bulk(list(pods), field_name="pod")
+
+    created = Invoice.objects.bulk_create([
+        Invoice(numar=numar, fisier=fisier, job=job,
+                data_emitere=parse_date(block[0].get("data_emitere")),
+                data_scadenta=parse_date(block[0].get("data_scadenta")),
+                perioada_start=parse_date(block[0].get("perioada_start")),
+                perioada_end=parse_date(block[0].get("perioada_end")),
+                **{field: block[0].get(field, 0) for field in INVOICE_FIELDS})
+        for (fisier, numar), block in invoices.items()
+    ])
+
+    readings = []
+    for invoice, block in zip(created, invoices.values()):
+        for data in block:
+            if data.get("POD") not in points:
+                continue
+            readings.append(Reading(invoice=invoice, consumption_point=points[data["POD"]],
+                                    perioada_start=invoice.perioada_start, loc_consum=data.get("loc_consum", ""),
+                                    alerta=data.get("alerta", ""), alerte=data.get("alerte", []),
+                                    **{field: data.get(field, 0) for field in READING_FIELDS}))
+    Reading.objects.bulk_create(readings)
+    return len(readings)
+
+
+def iter_indexed_rows(rows, job=None, batch_size=500):
+    # Rândurile trec mai departe neschimbate (spre Excel); în paralel sunt salvate în loturi în DB.
+    # Un lot se închide doar la granița dintre facturi, ca o factură să nu fie împărțită în două loturi.
+    batch = []
+    for data in rows:
+        if len(batch) >= batch_size and _invoice_key(batch[-1]) != _invoice_key(data):
+            save_rows(batch, job=job)
+            batch = []
+        batch.append(data)
+        yield data
+    if batch:
+        save_rows(batch, job=job)
+
+
+def filter_readings(pod=None, factura=None, de_la=None, pana_la=None, luni=None):
+    readings = Reading.objects.all()
+    if pod:
+        readings = readings.filter(consumption_point__pod=pod)
+    if factura:
+        readings = readings.filter(invoice__numar=factura)
+    if luni is not None:
+        de_la = months_ago(luni)
+    if de_la:
+        readings = readings.filter(perioada_start__gte=de_la)
+    if pana_la:
+        readings = readings.filter(perioada_start__lte=pana_la)
+    return readings
+
+
+def iter_reading_rows(readings, chunk_size=2000):
+    # Aceeași schemă ca extract_data_from_text (InvoiceRow) → Excel-ul din DB iese identic cu cel din PDF-uri
+    values = readings.values(
+        "loc_consum", "alerta", "alerte", "consumption_point__pod", "invoice__numar", "invoice__fisier",
+        "invoice__data_emitere", "invoice__data_scadenta", "invoice__perioada_start", "invoice__perioada_end",
+        *(f"invoice__{field}" for field in INVOICE_FIELDS), *READING_FIELDS)
+    for row in values.iterator(chunk_size=chunk_size):
+        yield InvoiceRow(
+            loc_consum=row["loc_consum"],
+            POD=row["consumption_point__pod"],
+            factura=row["invoice__numar"],
+            data_emitere=format_date(row["invoice__data_emitere"]),
+            data_scadenta=format_date(row["invoice__data_scadenta"]),
+            perioada_start=format_date(row["invoice__perioada_start"]),
+            perioada_end=format_date(row["invoice__perioada_end"]),
+            fisier=row["invoice__fisier"],
+            alerta=row["alerta"],
+            alerte=row["alerte"],
+            **{field: row[f"invoice__{field}"] for field in INVOICE_FIELDS},
+            **{field: row[field] for field in READING_FIELDS},
+        )
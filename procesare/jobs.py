@@ -0,0 +1,132 @@
+import os
+import shutil
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from extrage_facturi import (ExtractionCache, PageTextStore, VALIDATION_RULES, collect_metrics, iter_rows,
+                             iter_source_rows)
+from .admission import check_job_queue
+from .invoices import iter_indexed_rows
+from .models import Job
+from .results import export_stored
+
+JOBS_DIR = os.path.join(settings.BASE_DIR, "media", "jobs")
+
+
+def get_page_text_store():
+    if not settings.PAGE_TEXT_DIR:
+        return None
+    return PageTextStore(settings.PAGE_TEXT_DIR)
+
+
+def get_extraction_cache():
+    if not settings.EXTRACTION_CACHE_DIR:
+        return None
+    return ExtractionCache(settings.EXTRACTION_CACHE_DIR, max_bytes=settings.EXTRACTION_CACHE_MAX_BYTES,
+                           texts=get_page_text_store())
+
+
+def get_validation_rules():
+    return settings.VALIDATION_RULES or VALIDATION_RULES
+
+
+def enqueue_job(files, profile=False, format="xlsx", batch_hash=""):
+    # Fiecare job are propriul director → upload-urile simultane nu se mai suprascriu.
+    # Coada plină (JOB_QUEUE_MAX) → AdmissionRejected, înainte să scriem ceva pe disc
+    check_job_queue()
+    job = Job(total_files=len(files), profile=profile, format=format, batch_hash=batch_hash)
+    job.input_dir = os.path.join(JOBS_DIR, job.id.hex)
+    os.makedirs(job.input_dir, exist_ok=True)
+
+    for f in files:
+        path = os.path.join(job.input_dir, os.path.basename(f.name))
+        if hasattr(f, 'temporary_file_path'):
+            # Django a scris deja fișierul mare pe disc → îl mutăm, nu îl copiem încă o dată
+            shutil.move(f.temporary_file_path(), path)
+            continue
+        with open(path, 'wb+') as dest:
+            for chunk in f.chunks():
+                dest.write(chunk)
+
+    # Salvăm jobul abia după ce fișierele sunt pe disc, ca worker-ul să nu-l ia prea devreme
+    job.save()
+    return job
+
+
+def runs_inline(files):
+    return 0 < len(files) <= settings.INLINE_MAX_FILES and sum(f.size for f in files) <= settings.INLINE_MAX_BYTES
+
+
+def process_in_memory(files, format="xlsx", batch_hash=""):
+    # Loturile mici nu ating discul la extracție: bytes-urile merg direct în fitz.open(stream=...);
+    # doar rezultatul se scrie în RESULT_DIR, ca un upload identic să-l primească direct.
+    # Un singur proces, ca în stream: pentru cel mult INLINE_MAX_FILES fișiere mici pornirea unui pool în
+    # request costă mai mult decât extracția, iar fiecare request simultan și-ar porni propriul pool
+    sources = [(os.path.basename(f.name), f.read()) for f in files]
+    rules = get_validation_rules()
+    rows = iter_source_rows(sources, workers=1, cache=get_extraction_cache(), rules=rules)
+    return export_stored(iter_indexed_rows(rows), batch_hash, format, rules)
+
+
+def claim_next_job():
+    # Un job rămas „running” de mai mult de JOB_TIMEOUT secunde aparține unui worker oprit → e preluat din nou.
+    # Joburile fără input_dir (upload-urile mici din stream, procesate în request) nu sunt ale worker-ilor.
+    stale = timezone.now() - timedelta(seconds=settings.JOB_TIMEOUT)
+    candidates = Job.objects.filter(Q(status=Job.STATUS_PENDING) | Q(status=Job.STATUS_RUNNING, started_at__lt=stale))
+    candidates = candidates.exclude(input_dir="")
+    for job_id, status, started_at in candidates.values_list("id", "status", "started_at")[:5]:
+        # UPDATE condiționat → un singur worker câștigă jobul, fără broker extern
+        claimed = Job.objects.filter(pk=job_id, status=status, started_at=started_at).update(
+            status=Job.STATUS_RUNNING, started_at=timezone.now(), processed_files=0)
+        if claimed:
+            if status == Job.STATUS_RUNNING:
+                print(f"[♻️] Job {job_id} reluat: worker-ul anterior nu l-a terminat din {started_at}")
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+def run_job(job):
+    # Toate scrierile sunt condiționate de started_at: dacă jobul a fost preluat între timp de alt worker
+    # (JOB_TIMEOUT depășit), acest worker nu-i mai suprascrie progresul, statusul sau fișierele
+    owned = Job.objects.filter(pk=job.pk, started_at=job.started_at)
+
+    def on_progress(filename, nr_blocuri, error):
+        owned.update(processed_files=F("processed_files") + 1)
+
+    rules = get_validation_rules()
+    with collect_metrics(profile=job.profile) as metrics:
+        try:
+            rows = iter_rows(job.input_dir, workers=settings.PDF_WORKERS, chunksize=settings.PDF_CHUNKSIZE,
+                             on_progress=on_progress, cache=get_extraction_cache(), rules=rules)
+            # Rândurile ajung în fișierul rezultat și, în loturi, în indexul din DB (Invoice / ConsumptionPoint / Reading)
+            nr_rows, output_path = export_stored(iter_indexed_rows(rows, job=job), job.batch_hash, job.format, rules)
+        except Exception as e:
+            print(f"[⚠️] Eroare la job {job.pk}: {e}")
+            status = {"status": Job.STATUS_FAILED, "error": str(e)}
+        else:
+            status = {"status": Job.STATUS_DONE, "result_path": output_path, "rows": nr_rows}
+
+    if owned.update(metrics=metrics.to_dict(), finished_at=timezone.now(), **status):
+        shutil.rmtree(job.input_dir, ignore_errors=True)
+    else:
+        print(f"[⚠️] Job {job.pk} preluat de alt worker; rezultatul acestei rulări e ignorat")
+
+    job.refresh_from_db()
+    return job
+
+
+def run_worker(poll_interval=1.0, once=False):
+    while True:
+        job = claim_next_job()
+        if job is not None:
+            print(f"[▶] Job {job.pk}: {job.total_files} fișiere")
+            job = run_job(job)
+            print(f"[✔] Job {job.pk}: {job.status} ({job.rows} rânduri)")
+            continue
+        if once:
+            return
+        time.sleep(poll_interval)
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from procesare.results import evict_results
+
+
+class Command(BaseCommand):
+    help = ("Șterge din media/temp_results rezultatele neaccesate de RESULT_STORE_TTL secunde, apoi pe cele "
+            "mai vechi până sub RESULT_STORE_MAX_BYTES; de rulat periodic (cron / systemd timer)")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ttl", type=int, default=settings.RESULT_STORE_TTL,
+                            help="Secunde de la ultima accesare după care un rezultat expiră")
+        parser.add_argument("--max-bytes", type=int, default=settings.RESULT_STORE_MAX_BYTES,
+                            help="Spațiul maxim ocupat de rezultate")
+        parser.add_argument("--dry-run", action="store_true", help="Doar afișează ce s-ar șterge")
+
+    def handle(self, *args, **options):
+        removed, freed = evict_results(ttl=options["ttl"], max_bytes=options["max_bytes"],
+                                       dry_run=options["dry_run"])
+        prefix = "[dry-run] " if options["dry_run"] else ""
+        self.stdout.write(f"{prefix}[🧹] {removed} rezultate șterse, {freed / 1024 / 1024:.1f} MB eliberați")
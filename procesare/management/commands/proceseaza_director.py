@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from extrage_facturi import DEFAULT_EXPORT_FORMAT, EXPORTERS
+from procesare.batch import export_results, process_directory
+from procesare.jobs import get_extraction_cache, get_validation_rules
+
+
+class Command(BaseCommand):
+    help = ("Procesează recursiv facturile PDF dintr-un director, doar fișierele noi sau modificate, "
+            "și reconstruiește fișierul rezultat (Excel implicit) din rezultatele acumulate")
+
+    def add_arguments(self, parser):
+        parser.add_argument("director", help="Directorul (arborele) cu facturi PDF")
+        parser.add_argument("output_dir", help="Directorul cu manifest.json, rezultate.jsonl și facturi.<format>")
+        parser.add_argument("--workers", type=int, default=settings.PDF_WORKERS,
+                            help="Numărul de procese pentru extracție")
+        parser.add_argument("--chunksize", type=int, default=settings.PDF_CHUNKSIZE,
+                            help="Fișiere trimise odată fiecărui proces")
+        parser.add_argument("--format", choices=list(EXPORTERS), default=DEFAULT_EXPORT_FORMAT,
+                            help="Formatul fișierului rezultat")
+        parser.add_argument("--fara-export", "--fara-excel", action="store_true", dest="fara_export",
+                            help="Nu reconstrui fișierul rezultat (doar actualizează rezultatele); "
+                                 "--fara-excel e numele vechi")
+
+    def handle(self, *args, **options):
+        rules = get_validation_rules()
+        manifest, stats = process_directory(options["director"], options["output_dir"], workers=options["workers"],
+                                            chunksize=options["chunksize"], cache=get_extraction_cache(),
+                                            rules=rules)
+        self.stdout.write(f"[✔] {stats['noi']} fișiere noi ({stats['randuri_noi']} rânduri), "
+                          f"{stats['sarite']} deja procesate, {stats['erori']} erori")
+
+        if not options["fara_export"]:
+            nr_rows, output_path = export_results(options["output_dir"], manifest, rules=rules,
+                                                  export_format=options["format"])
+            self.stdout.write(f"[✔] {nr_rows} rânduri scrise în {output_path}")
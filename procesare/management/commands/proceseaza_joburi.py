@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from procesare.jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = "Worker local care procesează joburile de extracție din baza de date"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=1.0,
+                            help="Secunde între verificările pentru joburi noi")
+        parser.add_argument("--once", action="store_true",
+                            help="Procesează joburile existente și se oprește")
+
+    def handle(self, *args, **options):
+        run_worker(poll_interval=options["interval"], once=options["once"])
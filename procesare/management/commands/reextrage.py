@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from extrage_facturi import DEFAULT_EXPORT_FORMAT, EXTRACTED_FIELDS, EXPORTERS
+from procesare.batch import export_results, load_manifest, reextract_results, save_manifest
+from procesare.jobs import get_page_text_store, get_validation_rules
+
+
+class Command(BaseCommand):
+    help = ("Refă rezultatele unui director proceseaza_director din textul păstrat al paginilor (PAGE_TEXT_DIR), "
+            "fără decodarea PDF-urilor — după o corecție a regex-urilor din extrage_facturi.py")
+
+    def add_arguments(self, parser):
+        parser.add_argument("output_dir", help="Directorul cu manifest.json și rezultate.jsonl")
+        parser.add_argument("--campuri",
+                            help="Doar aceste câmpuri, separate prin virgulă (ex. total_plata,loc_consum); "
+                                 "restul rândului rămâne neschimbat")
+        parser.add_argument("--format", choices=list(EXPORTERS), default=DEFAULT_EXPORT_FORMAT,
+                            help="Formatul fișierului rezultat")
+        parser.add_argument("--fara-export", action="store_true",
+                            help="Nu reconstrui fișierul rezultat (doar actualizează rezultatele)")
+
+    def handle(self, *args, **options):
+        texts = get_page_text_store()
+        if texts is None:
+            raise CommandError("PAGE_TEXT_DIR nu e setat: textul paginilor nu se păstrează")
+
+        fields = None
+        if options["campuri"]:
+            fields = {name.strip() for name in options["campuri"].split(",") if name.strip()}
+            unknown = fields - set(EXTRACTED_FIELDS)
+            if unknown:
+                raise CommandError(f"Câmpuri necunoscute: {', '.join(sorted(unknown))} "
+                                   f"(disponibile: {', '.join(EXTRACTED_FIELDS)})")
+
+        manifest = load_manifest(options["output_dir"])
+        if not manifest:
+            raise CommandError(f"Niciun manifest în {options['output_dir']}")
+
+        rules = get_validation_rules()
+        stats = reextract_results(options["output_dir"], manifest, texts, fields=fields, rules=rules)
+        save_manifest(options["output_dir"], manifest)
+        self.stdout.write(f"[✔] {stats['partiale'] + stats['complete']} fișiere re-extrase "
+                          f"({stats['partiale']} doar pe câmpurile cerute, {stats['modificate']} modificate), "
+                          f"{stats['fara_text']} fără text păstrat")
+
+        if not options["fara_export"]:
+            nr_rows, output_path = export_results(options["output_dir"], manifest, rules=rules,
+                                                  export_format=options["format"])
+            self.stdout.write(f"[✔] {nr_rows} rânduri scrise în {output_path}")
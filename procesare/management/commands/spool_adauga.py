@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from procesare.spool import add_to_spool
+
+
+class Command(BaseCommand):
+    help = "Copiază PDF-urile dintr-un director (recursiv) în coada spool-ului partajat"
+
+    def add_arguments(self, parser):
+        parser.add_argument("director", help="Directorul (arborele) cu facturi PDF")
+        parser.add_argument("spool", help="Directorul spool partajat de workeri")
+
+    def handle(self, *args, **options):
+        added = add_to_spool(options["spool"], options["director"])
+        self.stdout.write(f"[✔] {added} fișiere adăugate în {options['spool']}")
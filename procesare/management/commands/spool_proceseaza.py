@@ -0,0 +1,39 @@
+from multiprocessing import Process
+
+from django.core.management.base import BaseCommand
+
+from procesare.jobs import get_extraction_cache
+from procesare.spool import SPOOL_CLAIM_FILES, SPOOL_STALE_SECONDS, run_spool_worker
+
+
+class Command(BaseCommand):
+    help = ("Worker pentru spool-ul partajat: revendică PDF-uri din <spool>/intrare și scrie shard-uri de rezultate; "
+            "rulat pe oricâte mașini care văd același director")
+
+    def add_arguments(self, parser):
+        parser.add_argument("spool", help="Directorul spool partajat de workeri")
+        parser.add_argument("--procese", type=int, default=1, help="Workeri porniți pe această mașină")
+        parser.add_argument("--lot", type=int, default=SPOOL_CLAIM_FILES,
+                            help="PDF-uri revendicate odată (un shard)")
+        parser.add_argument("--interval", type=float, default=5.0, help="Secunde între verificări când coada e goală")
+        parser.add_argument("--expirare", type=int, default=SPOOL_STALE_SECONDS,
+                            help="Secunde fără heartbeat după care fișierele unui worker se repun în coadă")
+        parser.add_argument("--once", action="store_true", help="Se oprește când coada e goală")
+
+    def handle(self, *args, **options):
+        kwargs = {"cache": get_extraction_cache(), "claim_files_limit": options["lot"],
+                  "poll_interval": options["interval"], "once": options["once"],
+                  "stale_seconds": options["expirare"]}
+        if options["procese"] <= 1:
+            stats = run_spool_worker(options["spool"], **kwargs)
+            self.stdout.write(f"[✔] {stats['fisiere']} fișiere ({stats['randuri']} rânduri, {stats['erori']} erori) "
+                              f"în {stats['shards']} shard-uri")
+            return
+
+        workers = [Process(target=run_spool_worker, args=(options["spool"],), kwargs=kwargs)
+                   for _ in range(options["procese"])]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.stdout.write(f"[✔] {len(workers)} workeri opriți")
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from extrage_facturi import DEFAULT_EXPORT_FORMAT, EXPORTERS
+from procesare.jobs import get_validation_rules
+from procesare.spool import merge_spool, spool_status
+
+
+class Command(BaseCommand):
+    help = "Unește shard-urile de rezultate din spool într-un singur fișier (Excel implicit)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("spool", help="Directorul spool partajat de workeri")
+        parser.add_argument("--output", help="Fișierul rezultat (implicit <spool>/facturi.<format>)")
+        parser.add_argument("--format", choices=list(EXPORTERS), default=DEFAULT_EXPORT_FORMAT,
+                            help="Formatul fișierului rezultat")
+        parser.add_argument("--asteapta", action="store_true",
+                            help="Așteaptă până când coada și fișierele în lucru se golesc")
+
+    def handle(self, *args, **options):
+        status = spool_status(options["spool"])
+        while options["asteapta"] and (status["in_asteptare"] or status["in_lucru"]):
+            time.sleep(2)
+            status = spool_status(options["spool"])
+        if status["in_asteptare"] or status["in_lucru"]:
+            self.stdout.write(f"[⚠️] {status['in_asteptare']} fișiere în așteptare și {status['in_lucru']} în lucru "
+                              f"nu sunt incluse")
+
+        nr_rows, output_path = merge_spool(options["spool"], options["output"], export_format=options["format"],
+                                           rules=get_validation_rules())
+        self.stdout.write(f"[✔] {nr_rows} rânduri din {status['shards']} shard-uri scrise în {output_path}")
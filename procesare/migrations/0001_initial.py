@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-16 22:25
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('pending', 'În așteptare'), ('running', 'În procesare'), ('done', 'Finalizat'), ('failed', 'Eșuat')], db_index=True, default='pending', max_length=16)),
+                ('input_dir', models.CharField(max_length=500)),
+                ('result_path', models.CharField(blank=True, max_length=500)),
+                ('total_files', models.PositiveIntegerField(default=0)),
+                ('processed_files', models.PositiveIntegerField(default=0)),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
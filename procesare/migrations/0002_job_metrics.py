@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-16 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('procesare', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='metrics',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='profile',
+            field=models.BooleanField(default=False, help_text='Rulează jobul sub cProfile'),
+        ),
+    ]
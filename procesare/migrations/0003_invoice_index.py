@@ -0,0 +1,81 @@
+# Generated by Django 5.2 on 2026-10-16 22:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('procesare', '0002_job_metrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsumptionPoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pod', models.CharField(max_length=64, unique=True)),
+                ('loc_consum', models.CharField(blank=True, max_length=500)),
+            ],
+            options={
+                'ordering': ['pod'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Invoice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('numar', models.CharField(db_index=True, max_length=64)),
+                ('data_emitere', models.DateField(blank=True, null=True)),
+                ('data_scadenta', models.DateField(blank=True, null=True)),
+                ('perioada_start', models.DateField(blank=True, null=True)),
+                ('perioada_end', models.DateField(blank=True, null=True)),
+                ('total_net', models.FloatField(default=0)),
+                ('valoare_fara_TVA', models.FloatField(default=0)),
+                ('valoare_cu_TVA', models.FloatField(default=0)),
+                ('total_plata', models.FloatField(default=0)),
+                ('sold_anterior', models.FloatField(default=0)),
+                ('fisier', models.CharField(blank=True, max_length=500)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invoices', to='procesare.job')),
+            ],
+            options={
+                'ordering': ['perioada_start', 'numar'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Reading',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('perioada_start', models.DateField(blank=True, null=True)),
+                ('loc_consum', models.CharField(blank=True, max_length=500)),
+                ('index_activ_vechi', models.FloatField(default=0)),
+                ('index_reactivi_vechi', models.FloatField(default=0)),
+                ('index_reactivc_vechi', models.FloatField(default=0)),
+                ('index_activ_nou', models.FloatField(default=0)),
+                ('index_reactivi_nou', models.FloatField(default=0)),
+                ('index_reactivc_nou', models.FloatField(default=0)),
+                ('cantitate_activ', models.FloatField(default=0)),
+                ('cantitate_reactivi', models.FloatField(default=0)),
+                ('cantitate_reactivc', models.FloatField(default=0)),
+                ('cantitate_facturata_activ', models.FloatField(default=0)),
+                ('cantitate_facturata_reactivi', models.FloatField(default=0)),
+                ('cantitate_facturata_reactivc', models.FloatField(default=0)),
+                ('alerta', models.CharField(blank=True, max_length=500)),
+                ('consumption_point', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='readings', to='procesare.consumptionpoint')),
+                ('invoice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='readings', to='procesare.invoice')),
+            ],
+            options={
+                'ordering': ['perioada_start', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['perioada_start', 'perioada_end'], name='procesare_i_perioad_c9f78c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reading',
+            index=models.Index(fields=['consumption_point', 'perioada_start'], name='procesare_r_consump_5e5d36_idx'),
+        ),
+    ]
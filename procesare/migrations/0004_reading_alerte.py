@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-16 22:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('procesare', '0003_invoice_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reading',
+            name='alerte',
+            field=models.JSONField(blank=True, default=list, help_text='Regulile de validare încălcate'),
+        ),
+    ]
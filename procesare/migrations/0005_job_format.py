@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-16 22:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('procesare', '0004_reading_alerte'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='format',
+            field=models.CharField(default='xlsx', help_text='Formatul rezultatului (vezi EXPORTERS)', max_length=16),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-16 22:59
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('procesare', '0005_job_format'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_hash', models.CharField(max_length=64, unique=True)),
+                ('format', models.CharField(default='xlsx', max_length=16)),
+                ('path', models.CharField(max_length=500)),
+                ('size', models.BigIntegerField(default=0)),
+                ('rows', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_access', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-last_access'],
+            },
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='batch_hash',
+            field=models.CharField(blank=True, help_text='Cheia lotului în StoredResult', max_length=64),
+        ),
+    ]
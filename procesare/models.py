@@ -1,3 +1,126 @@
+import os
+import uuid
+
 from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "În așteptare"),
+        (STATUS_RUNNING, "În procesare"),
+        (STATUS_DONE, "Finalizat"),
+        (STATUS_FAILED, "Eșuat"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    input_dir = models.CharField(max_length=500)
+    result_path = models.CharField(max_length=500, blank=True)
+    total_files = models.PositiveIntegerField(default=0)
+    processed_files = models.PositiveIntegerField(default=0)
+    rows = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    profile = models.BooleanField(default=False, help_text="Rulează jobul sub cProfile")
+    format = models.CharField(max_length=16, default="xlsx", help_text="Formatul rezultatului (vezi EXPORTERS)")
+    batch_hash = models.CharField(max_length=64, blank=True, help_text="Cheia lotului în StoredResult")
+    metrics = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+
+    def __str__(self):
+        return f"Job {self.id} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+
+class StoredResult(models.Model):
+    # Fișier rezultat păstrat în media/temp_results: același lot (nume + conținut PDF, format, reguli de
+    # validare, PARSER_VERSION) → același fișier, servit fără re-procesare până la evacuare (curata_rezultate)
+    batch_hash = models.CharField(max_length=64, unique=True)
+    format = models.CharField(max_length=16, default="xlsx")
+    path = models.CharField(max_length=500)
+    size = models.BigIntegerField(default=0)
+    rows = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_access = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ["-last_access"]
+
+    def __str__(self):
+        return os.path.basename(self.path)
+
+
+class ConsumptionPoint(models.Model):
+    pod = models.CharField(max_length=64, unique=True)
+    loc_consum = models.CharField(max_length=500, blank=True)
+
+    class Meta:
+        ordering = ["pod"]
+
+    def __str__(self):
+        return self.pod
+
+
+class Invoice(models.Model):
+    numar = models.CharField(max_length=64, db_index=True)
+    data_emitere = models.DateField(null=True, blank=True)
+    data_scadenta = models.DateField(null=True, blank=True)
+    perioada_start = models.DateField(null=True, blank=True)
+    perioada_end = models.DateField(null=True, blank=True)
+    total_net = models.FloatField(default=0)
+    valoare_fara_TVA = models.FloatField(default=0)
+    valoare_cu_TVA = models.FloatField(default=0)
+    total_plata = models.FloatField(default=0)
+    sold_anterior = models.FloatField(default=0)
+    fisier = models.CharField(max_length=500, blank=True)
+    job = models.ForeignKey(Job, null=True, blank=True, on_delete=models.SET_NULL, related_name="invoices")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["perioada_start", "numar"]
+        indexes = [models.Index(fields=["perioada_start", "perioada_end"])]
+
+    def __str__(self):
+        return self.numar or self.fisier
+
+
+class Reading(models.Model):
+    # Un rând din Excel = o citire (un bloc POD dintr-o factură)
+    invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE, related_name="readings")
+    consumption_point = models.ForeignKey(ConsumptionPoint, on_delete=models.CASCADE, related_name="readings")
+    # Denormalizat din factură → interogarea „POD X în ultimele N luni” folosește un singur index
+    perioada_start = models.DateField(null=True, blank=True)
+    loc_consum = models.CharField(max_length=500, blank=True)
+    index_activ_vechi = models.FloatField(default=0)
+    index_reactivi_vechi = models.FloatField(default=0)
+    index_reactivc_vechi = models.FloatField(default=0)
+    index_activ_nou = models.FloatField(default=0)
+    index_reactivi_nou = models.FloatField(default=0)
+    index_reactivc_nou = models.FloatField(default=0)
+    cantitate_activ = models.FloatField(default=0)
+    cantitate_reactivi = models.FloatField(default=0)
+    cantitate_reactivc = models.FloatField(default=0)
+    cantitate_facturata_activ = models.FloatField(default=0)
+    cantitate_facturata_reactivi = models.FloatField(default=0)
+    cantitate_facturata_reactivc = models.FloatField(default=0)
+    alerta = models.CharField(max_length=500, blank=True)
+    alerte = models.JSONField(default=list, blank=True, help_text="Regulile de validare încălcate")
+
+    class Meta:
+        ordering = ["perioada_start", "id"]
+        indexes = [models.Index(fields=["consumption_point", "perioada_start"])]
 
-# Create your models here.
+    def __str__(self):
+        return f"{self.consumption_point_id} / {self.invoice_id}"
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+
+from extrage_facturi import PARSER_VERSION, export_filename, export_rows
+from .models import StoredResult
+
+RESULT_DIR = os.path.join(settings.BASE_DIR, "media", "temp_results")
+
+
+def new_result_path(format):
+    os.makedirs(RESULT_DIR, exist_ok=True)
+    # uuid complet: fișierele rămân acum pe disc, 6 caractere hex nu mai sunt suficiente contra coliziunilor
+    return os.path.join(RESULT_DIR, export_filename(f"rezultate_facturi_{uuid.uuid4().hex}", format))
+
+
+def batch_hash(files, format, rules):
+    # files: (nume, sha256) în ordinea din upload — numele și ordinea apar în rezultat, deci intră în cheie
+    digest = hashlib.sha256(json.dumps([PARSER_VERSION, format, rules], sort_keys=True, default=str,
+                                       ensure_ascii=False).encode("utf-8"))
+    for name, sha256 in files:
+        digest.update(f"\n{name}\0{sha256}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def hash_sources(sources, format, rules):
+    return batch_hash(((name, hashlib.sha256(pdf_bytes).hexdigest()) for name, pdf_bytes in sources), format, rules)
+
+
+def _upload_sha256(f):
+    digest = hashlib.sha256()
+    for chunk in f.chunks():
+        digest.update(chunk)
+    f.seek(0)  # fișierul se citește din nou la procesare
+    return digest.hexdigest()
+
+
+def hash_uploads(files, format, rules):
+    return batch_hash(((os.path.basename(f.name), _upload_sha256(f)) for f in files), format, rules)
+
+
+def touch_result(path):
+    StoredResult.objects.filter(path=path).update(last_access=timezone.now())
+
+
+def find_result(batch_hash):
+    stored = StoredResult.objects.filter(batch_hash=batch_hash).first()
+    if stored is None:
+        return None
+    if not os.path.exists(stored.path):
+        # Fișierul a dispărut de pe disc (șters manual) → intrarea nu mai e validă
+        stored.delete()
+        return None
+    touch_result(stored.path)  # last_access = ultima descărcare → evacuare LRU
+    return stored
+
+
+def store_result(batch_hash, path, format, nr_rows):
+    # Instrucțiuni individuale, nu update_or_create: tranzacția citire → scriere a acestuia eșuează imediat
+    # cu „database is locked” în SQLite când mai multe upload-uri identice se termină simultan
+    values = {"path": path, "format": format, "size": os.path.getsize(path), "rows": nr_rows,
+              "last_access": timezone.now()}
+    if StoredResult.objects.filter(batch_hash=batch_hash).update(**values):
+        return
+    try:
+        StoredResult.objects.create(batch_hash=batch_hash, **values)
+    except IntegrityError:
+        StoredResult.objects.filter(batch_hash=batch_hash).update(**values)
+
+
+def _iter_complete_rows(rows, state):
+    for data in rows:
+        if data.campuri_depasite:
+            state["incomplet"] = True
+        yield data
+
+
+def export_stored(rows, batch_hash, format, rules):
+    # Scrie rezultatul într-un fișier nou din RESULT_DIR și îl înregistrează sub cheia lotului;
+    # loturile cu extracții incomplete (buget de timp depășit) nu se refolosesc
+    output_path = new_result_path(format)
+    state = {}
+    nr_rows = export_rows(_iter_complete_rows(rows, state), output_path, export_format=format, rules=rules)
+    if batch_hash and not state:
+        store_result(batch_hash, output_path, format, nr_rows)
+    return nr_rows, output_path
+
+
+def evict_results(ttl=None, max_bytes=None, dry_run=False):
+    # Evacuare din RESULT_DIR: tot ce n-a fost accesat în ultimele `ttl` secunde, apoi cele mai vechi
+    # fișiere până când totalul intră sub max_bytes. Fișierele fără StoredResult (joburi cu rezultat incomplet,
+    # rezultate de dinainte de store) folosesc mtime ca ultimă accesare.
+    ttl = settings.RESULT_STORE_TTL if ttl is None else ttl
+    max_bytes = settings.RESULT_STORE_MAX_BYTES if max_bytes is None else max_bytes
+    cutoff = (timezone.now() - timedelta(seconds=ttl)).timestamp()
+
+    stored = {entry.path: entry for entry in StoredResult.objects.all()}
+    entries = []
+    if os.path.isdir(RESULT_DIR):
+        for entry in os.scandir(RESULT_DIR):
+            if not entry.is_file():
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            result = stored.pop(entry.path, None)
+            last_access = result.last_access.timestamp() if result else stat.st_mtime
+            entries.append((last_access, stat.st_size, entry.path, result))
+
+    removed = freed = 0
+    total = 0
+    for last_access, size, path, result in sorted(entries, reverse=True):
+        total += size
+        if last_access >= cutoff and total <= max_bytes:
+            continue
+        total -= size
+        removed += 1
+        freed += size
+        if dry_run:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        if result is not None:
+            result.delete()
+
+    # Intrări al căror fișier nu mai există
+    if not dry_run:
+        StoredResult.objects.filter(pk__in=[result.pk for result in stored.values()]).delete()
+    return removed, freed
@@ -0,0 +1,267 @@
+import hashlib
+import json
+import os
+import shutil
+import socket
+import time
+import uuid
+from contextlib import ExitStack
+from itertools import islice
+
+from extrage_facturi import (DEFAULT_EXPORT_FORMAT, VALIDATION_BATCH_ROWS, VALIDATION_RULES, InvoiceRow,
+                             export_filename, export_rows, process_source, validate_rows)
+from .batch import EXPORT_STEM, iter_tree_pdfs
+
+# Director spool partajat (NFS / SMB / disc local), fără broker: toate operațiile de coordonare sunt
+# os.rename / os.replace în același sistem de fișiere, deci atomice.
+#   intrare/            PDF-uri de procesat, cu subdirectoarele originale (add_to_spool: copiere .tmp + rename)
+#   lucru/<worker>/     PDF-uri revendicate de un worker (rename din intrare/, aceeași cale relativă)
+#   heartbeat/<worker>  atins de worker la fiecare PDF; în afara lucru/<worker>/, deci nu dispare odată cu el
+#   rezultate/*.jsonl   shard-uri: o linie {"fisier", "sha256", "rows", "eroare"} per PDF
+#   procesate/, erori/  PDF-urile terminate, mutate după ce shard-ul lor a fost scris
+SPOOL_DIRS = ("intrare", "lucru", "heartbeat", "rezultate", "procesate", "erori")
+# Ora de referință: mtime-ul unui fișier atins chiar atunci în spool, pe același sistem de fișiere ca
+# heartbeat-urile → ceasurile desincronizate ale mașinilor nu fac un worker viu să pară oprit
+CLOCK_NAME = ".ceas"
+SPOOL_CLAIM_FILES = 10  # PDF-uri revendicate odată = un shard
+SPOOL_STALE_SECONDS = 600  # un worker fără heartbeat de atâta timp e considerat oprit
+
+
+def init_spool(spool_dir):
+    for name in SPOOL_DIRS:
+        os.makedirs(os.path.join(spool_dir, name), exist_ok=True)
+
+
+def add_to_spool(spool_dir, root):
+    # Copiere sub un nume temporar ascuns, apoi rename → workerii nu văd niciodată un PDF pe jumătate copiat
+    init_spool(spool_dir)
+    intrare = os.path.join(spool_dir, "intrare")
+    added = 0
+    for relpath in iter_tree_pdfs(root):
+        tmp_path = os.path.join(intrare, f".{uuid.uuid4().hex}.tmp")
+        shutil.copyfile(os.path.join(root, relpath), tmp_path)
+        _move(tmp_path, os.path.join(intrare, relpath))
+        added += 1
+    return added
+
+
+def _pending_pdfs(directory):
+    # Căile relative ale PDF-urilor (fișierele .tmp nu se potrivesc)
+    return list(iter_tree_pdfs(directory))
+
+
+def _iter_queued_pdfs(directory, root=None):
+    # Ca iter_tree_pdfs, dar leneș și nesortat: revendicarea se oprește după primele fișiere găsite,
+    # fără să listeze și să sorteze toată coada la fiecare lot (ordinea nu contează, merge-ul sortează)
+    root = directory if root is None else root
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_queued_pdfs(entry.path, root)
+            elif entry.name.lower().endswith(".pdf"):
+                yield os.path.relpath(entry.path, root)
+
+
+def _move(src, dst):
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    os.replace(src, dst)
+
+
+def _touch(path):
+    with open(path, "a"):
+        pass
+    os.utime(path)
+    return os.stat(path).st_mtime
+
+
+def _remove_empty_dirs(directory):
+    # Doar directoarele goale, nu rmtree: un PDF revendicat între timp de un worker încă viu nu se pierde
+    for dirpath, _, _ in os.walk(directory, topdown=False):
+        try:
+            os.rmdir(dirpath)
+        except OSError:
+            pass
+
+
+def claim_files(spool_dir, worker_dir, limit=SPOOL_CLAIM_FILES):
+    # Revendicare = rename din intrare/ în lucru/<worker>/: un singur worker reușește, ceilalți primesc
+    # FileNotFoundError și trec la următorul fișier
+    intrare = os.path.join(spool_dir, "intrare")
+    claimed = []
+    for name in _iter_queued_pdfs(intrare):
+        try:
+            _move(os.path.join(intrare, name), os.path.join(worker_dir, name))
+        except FileNotFoundError:
+            continue
+        claimed.append(name)
+        if len(claimed) >= limit:
+            break
+    return claimed
+
+
+def requeue_stale(spool_dir, stale_seconds=SPOOL_STALE_SECONDS):
+    # PDF-urile unui worker oprit (heartbeat vechi) se întorc în intrare/; un shard deja scris pentru ele
+    # e înlocuit la merge de rezultatul mai nou
+    lucru = os.path.join(spool_dir, "lucru")
+    intrare = os.path.join(spool_dir, "intrare")
+    now = _touch(os.path.join(spool_dir, CLOCK_NAME))
+    requeued = 0
+    for worker in os.listdir(lucru):
+        worker_dir = os.path.join(lucru, worker)
+        heartbeat = os.path.join(spool_dir, "heartbeat", worker)
+        try:
+            last_seen = os.stat(heartbeat).st_mtime
+        except FileNotFoundError:
+            try:
+                last_seen = os.stat(worker_dir).st_mtime
+            except FileNotFoundError:
+                continue  # alt worker l-a curățat deja
+        if now - last_seen < stale_seconds:
+            continue
+        names = _pending_pdfs(worker_dir)
+        for name in names:
+            try:
+                _move(os.path.join(worker_dir, name), os.path.join(intrare, name))
+            except FileNotFoundError:
+                continue  # alt worker l-a repus deja
+            requeued += 1
+        _remove_empty_dirs(worker_dir)
+        try:
+            os.remove(heartbeat)
+        except FileNotFoundError:
+            pass
+        print(f"[♻️] Worker oprit {worker}: {len(names)} fișiere repuse în coadă")
+    return requeued
+
+
+def _write_shard(spool_dir, shard_name, records):
+    path = os.path.join(spool_dir, "rezultate", shard_name)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(f"{path}.tmp", path)  # merge-ul citește doar shard-urile complete (*.jsonl)
+
+
+def run_spool_worker(spool_dir, cache=None, claim_files_limit=SPOOL_CLAIM_FILES, poll_interval=5.0, once=False,
+                     stale_seconds=SPOOL_STALE_SECONDS):
+    init_spool(spool_dir)
+    worker = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    worker_dir = os.path.join(spool_dir, "lucru", worker)
+    heartbeat = os.path.join(spool_dir, "heartbeat", worker)
+    stats = {"fisiere": 0, "erori": 0, "randuri": 0, "shards": 0}
+
+    try:
+        while True:
+            _touch(heartbeat)
+            requeue_stale(spool_dir, stale_seconds)
+            # Un worker lent poate fi declarat oprit de alții: lucru/<worker>/ a dispărut → se recreează
+            os.makedirs(worker_dir, exist_ok=True)
+            claimed = claim_files(spool_dir, worker_dir, claim_files_limit)
+            if not claimed:
+                if once:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            records = []
+            for name in claimed:
+                _touch(heartbeat)
+                try:
+                    with open(os.path.join(worker_dir, name), "rb") as f:
+                        pdf_bytes = f.read()
+                except FileNotFoundError:
+                    print(f"[♻️] {name} a fost repus în coadă între timp, sărit")
+                    continue
+                rows, nr_blocuri, error = process_source((name, pdf_bytes), cache)
+                if error is not None:
+                    print(f"[⚠️] Eroare la {name}: {error}")
+                    stats["erori"] += 1
+                else:
+                    print(f"[✔] Procesat: {name} ({nr_blocuri} blocuri)")
+                records.append({"fisier": name, "sha256": hashlib.sha256(pdf_bytes).hexdigest(),
+                                "rows": [data.to_dict() for data in rows], "eroare": error})
+                stats["fisiere"] += 1
+                stats["randuri"] += len(rows)
+
+            # Întâi shard-ul, apoi mutarea PDF-urilor: o oprire între cele două doar reprocesează lotul
+            _write_shard(spool_dir, f"{worker}-{stats['shards']:06d}.jsonl", records)
+            stats["shards"] += 1
+            for record in records:
+                target = "erori" if record["eroare"] else "procesate"
+                try:
+                    _move(os.path.join(worker_dir, record["fisier"]), os.path.join(spool_dir, target, record["fisier"]))
+                except FileNotFoundError:
+                    pass  # worker considerat oprit, fișierul a fost repus în coadă; merge-ul păstrează cel mai nou
+    finally:
+        # PDF-urile revendicate dar neprocesate (ex. Ctrl+C) se întorc imediat în coadă
+        for name in _pending_pdfs(worker_dir):
+            try:
+                _move(os.path.join(worker_dir, name), os.path.join(spool_dir, "intrare", name))
+            except FileNotFoundError:
+                pass
+        _remove_empty_dirs(worker_dir)
+        try:
+            os.remove(heartbeat)
+        except FileNotFoundError:
+            pass
+    return stats
+
+
+def spool_status(spool_dir):
+    init_spool(spool_dir)
+    lucru = os.path.join(spool_dir, "lucru")
+    return {
+        "in_asteptare": len(_pending_pdfs(os.path.join(spool_dir, "intrare"))),
+        "in_lucru": sum(len(_pending_pdfs(os.path.join(lucru, worker))) for worker in os.listdir(lucru)),
+        "shards": sum(1 for name in os.listdir(os.path.join(spool_dir, "rezultate")) if name.endswith(".jsonl")),
+    }
+
+
+def iter_spool_rows(spool_dir):
+    # Ca iter_result_rows: primul pas reține doar (shard, offset) al celui mai nou rezultat per fișier,
+    # al doilea citește rândurile în ordinea numelor de fișier → același rezultat indiferent de workeri
+    rezultate = os.path.join(spool_dir, "rezultate")
+    shards = sorted((os.path.join(rezultate, name) for name in os.listdir(rezultate) if name.endswith(".jsonl")),
+                    key=os.path.getmtime)
+    latest = {}
+    for shard in shards:
+        with open(shard, "rb") as f:
+            offset = f.tell()
+            for line in iter(f.readline, b""):
+                latest[json.loads(line)["fisier"]] = (shard, offset)
+                offset = f.tell()
+
+    with ExitStack() as stack:
+        handles = {}
+        for name in sorted(latest):
+            shard, offset = latest[name]
+            if shard not in handles:
+                handles[shard] = stack.enter_context(open(shard, "rb"))
+            f = handles[shard]
+            f.seek(offset)
+            for data in json.loads(f.readline())["rows"]:
+                yield InvoiceRow.from_dict(data)
+
+
+def _iter_validated(rows, rules, batch_rows):
+    # Alertele se calculează abia la merge, pe toate shard-urile (duplicatele între workeri sunt găsite)
+    state = {}
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_rows)):
+        validate_rows(batch, rules, state)
+        yield from batch
+
+
+def merge_spool(spool_dir, output_path=None, export_format=DEFAULT_EXPORT_FORMAT, rules=VALIDATION_RULES,
+                batch_rows=VALIDATION_BATCH_ROWS):
+    # xlsx → finalize_excel (write-only), ca pentru un lot procesat pe o singură mașină
+    if output_path is None:
+        output_path = os.path.join(spool_dir, export_filename(EXPORT_STEM, export_format))
+    rows = _iter_validated(iter_spool_rows(spool_dir), rules, batch_rows)
+    return export_rows(rows, output_path, export_format=export_format, rules=rules), output_path
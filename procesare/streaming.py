@@ -0,0 +1,123 @@
+# Server-Sent Events pentru upload-ul cu progres (upload_stream_view). Necesită server ASGI (factura_app.asgi,
+# ex. uvicorn / daphne): sub WSGI (gunicorn sync) răspunsul e ținut în buffer și evenimentele ajung toate la final.
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.urls import reverse
+from django.utils import timezone
+
+from extrage_facturi import process_source, validate_rows
+from .invoices import iter_indexed_rows
+from .jobs import get_extraction_cache, get_validation_rules
+from .models import Job
+from .results import export_stored, find_result, hash_sources
+
+JOB_POLL_INTERVAL = 1.0  # secunde între citirile progresului unui job din DB
+
+
+class AdmittedStream:
+    # Evenimentele SSE ale unui upload admis; Django apelează close() la închiderea răspunsului (și când
+    # clientul renunță înainte de primul eveniment) → locul de admitere se eliberează o singură dată
+    def __init__(self, events, release):
+        self.events = events
+        self._release = release
+
+    def __aiter__(self):
+        return self.events.__aiter__()
+
+    def close(self):
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _export(rows, batch_hash, format, rules, job):
+    # Rulează într-un thread: validare pe tot lotul, scrierea fișierului rezultat și, în loturi, indexul din DB
+    validate_rows(rows, rules)
+    return export_stored(iter_indexed_rows(rows, job=job), batch_hash, format, rules)
+
+
+async def iter_stored_events(stored, total_files):
+    # Lot identic procesat deja → direct la descărcare, fără job și fără extracție
+    yield sse_event("start", {"job": None, "total_files": total_files})
+    yield sse_event("gata", {"rows": stored.rows, "download_url": reverse("result_download",
+                                                                          args=[stored.batch_hash])})
+
+
+async def iter_job_events(job, poll_interval=JOB_POLL_INTERVAL):
+    # Lot mare: extracția rulează în worker (manage.py proceseaza_joburi), aici doar citim progresul jobului
+    yield sse_event("start", {"job": str(job.pk), "total_files": job.total_files})
+    processed = 0
+    while True:
+        job = await Job.objects.aget(pk=job.pk)
+        if job.processed_files != processed:
+            processed = job.processed_files
+            yield sse_event("progres", {"procesate": processed, "total": job.total_files})
+        if job.status == Job.STATUS_DONE:
+            yield sse_event("gata", {"rows": job.rows, "download_url": reverse("job_download", args=[job.pk])})
+            return
+        if job.status == Job.STATUS_FAILED:
+            yield sse_event("eroare", {"error": job.error})
+            return
+        await asyncio.sleep(poll_interval)
+
+
+async def iter_upload_events(sources, format):
+    # Lot mic (runs_inline), extras în request: start → câte un „fisier” pe măsură ce extracțiile se termină
+    # → „gata” sau „eroare”. Extracția rulează în thread-urile executorului implicit, nu în event loop și nu
+    # într-un pool de procese al serverului web; loturile mari nu ajung aici (iter_job_events).
+    loop = asyncio.get_running_loop()
+    cache = get_extraction_cache()
+    rules = get_validation_rules()
+    batch_hash = await loop.run_in_executor(None, hash_sources, sources, format, rules)
+    stored = await sync_to_async(find_result)(batch_hash)
+    if stored is not None:
+        async for event in iter_stored_events(stored, len(sources)):
+            yield event
+        return
+
+    job = await Job.objects.acreate(total_files=len(sources), format=format, status=Job.STATUS_RUNNING,
+                                    started_at=timezone.now(), batch_hash=batch_hash)
+    yield sse_event("start", {"job": str(job.pk), "total_files": len(sources)})
+
+    pending = {loop.run_in_executor(None, process_source, source, cache): i for i, source in enumerate(sources)}
+    results = [None] * len(sources)
+    status = {"status": Job.STATUS_FAILED, "error": "Upload întrerupt"}
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                i = pending.pop(future)
+                file_rows, nr_blocuri, error = results[i] = future.result()
+                filename = sources[i][0]
+                processed = len(sources) - len(pending)
+                await Job.objects.filter(pk=job.pk).aupdate(processed_files=processed)
+                yield sse_event("fisier", {
+                    "fisier": filename,
+                    "blocuri": nr_blocuri,
+                    "eroare": error,
+                    "mesaj": (f"Eroare la {filename}: {error}" if error
+                              else f"Procesat: {filename} ({nr_blocuri} blocuri)"),
+                    "procesate": processed,
+                    "total": len(sources),
+                })
+
+        # Rândurile păstrează ordinea fișierelor din upload, nu ordinea în care s-au terminat
+        rows = [data for file_rows, _, _ in results for data in file_rows]
+        nr_rows, output_path = await sync_to_async(_export)(rows, batch_hash, format, rules, job)
+        status = {"status": Job.STATUS_DONE, "result_path": output_path, "rows": nr_rows}
+        yield sse_event("gata", {"rows": nr_rows, "download_url": reverse("job_download", args=[job.pk])})
+    except Exception as e:
+        print(f"[⚠️] Eroare la upload {job.pk}: {e}")
+        status = {"status": Job.STATUS_FAILED, "error": str(e)}
+        yield sse_event("eroare", {"error": str(e)})
+    finally:
+        # Clientul s-a deconectat (sau a apărut o eroare) → fișierele încă neîncepute nu mai sunt procesate
+        for future in pending:
+            future.cancel()
+        await Job.objects.filter(pk=job.pk).aupdate(finished_at=timezone.now(), **status)
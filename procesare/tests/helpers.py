@@ -0,0 +1,30 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from benchmarks.sintetic import factura_pdf
+
+
+def pdf_upload(name="factura_0.pdf", i=0, n_blocuri=3):
+    # Factură PDF sintetică (aceleași marcaje ca facturile reale), ca fișier încărcat prin formular
+    return SimpleUploadedFile(name, factura_pdf(i, n_blocuri), content_type="application/pdf")
+
+
+class TempMediaMixin:
+    # Joburile, rezultatele, cache-ul și textul paginilor ajung într-un director temporar, nu în media/
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        for target, name in (("procesare.jobs.JOBS_DIR", "jobs"), ("procesare.results.RESULT_DIR", "temp_results")):
+            patcher = mock.patch(target, os.path.join(self.tmp, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        override = self.settings(EXTRACTION_CACHE_DIR=os.path.join(self.tmp, "cache"),
+                                 PAGE_TEXT_DIR=os.path.join(self.tmp, "texte"), PDF_WORKERS=1)
+        override.enable()
+        self.addCleanup(override.disable)
@@ -0,0 +1,78 @@
+import asyncio
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from procesare.admission import AdmissionController, AdmissionRejected
+from procesare.models import Job
+
+from .helpers import TempMediaMixin, pdf_upload
+
+
+class AdmissionControllerTests(SimpleTestCase):
+    def test_client_quota_and_full_queue_are_rejected(self):
+        admission = AdmissionController(max_active=1, max_queue=0, max_per_client=1, max_wait=1)
+        admission.acquire("a")
+
+        with self.assertRaises(AdmissionRejected) as rejected:
+            admission.acquire("a")
+        self.assertEqual(rejected.exception.status, 429)
+        with self.assertRaises(AdmissionRejected) as rejected:
+            admission.acquire("b")
+        self.assertEqual(rejected.exception.status, 503)
+        self.assertEqual(dict(admission.clients), {"a": 1})
+
+    def test_expired_wait_forgets_the_client(self):
+        admission = AdmissionController(max_active=1, max_queue=1, max_per_client=1, max_wait=0.05)
+        started = admission.acquire("a")
+
+        with self.assertRaises(AdmissionRejected) as rejected:
+            admission.acquire("b")
+
+        self.assertEqual(rejected.exception.status, 503)
+        self.assertNotIn("b", admission.clients)
+        admission.release("a", started)
+        self.assertEqual((admission.active, dict(admission.clients), len(admission.queue)), (0, {}, 0))
+
+    async def test_cancelled_wait_releases_the_slot(self):
+        admission = AdmissionController(max_active=1, max_queue=1, max_per_client=1, max_wait=5)
+        started = admission.acquire("a")
+        waiting = asyncio.create_task(admission.aacquire("b"))
+        await asyncio.sleep(0.05)
+
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        admission.release("a", started)
+
+        for _ in range(100):
+            if admission.counters["admise"] == 2 and not admission.active:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual((admission.counters["admise"], admission.active, dict(admission.clients)), (2, 0, {}))
+
+
+@override_settings(INLINE_MAX_FILES=2, INLINE_MAX_BYTES=10 * 1024 * 1024)
+class UploadAdmissionTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        # Singurul loc e ocupat și nu există coadă: orice procesare în request e respinsă imediat
+        admission = AdmissionController(max_active=1, max_queue=0, max_per_client=1, max_wait=1)
+        admission.acquire("alt client")
+        patcher = mock.patch("procesare.views.get_admission", return_value=admission)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _post(self, n):
+        uploads = [pdf_upload(f"factura_{i}.pdf", i, n_blocuri=1) for i in range(n)]
+        return self.client.post("/", {"pdf_files": uploads, "format": "csv"})
+
+    def test_inline_batch_needs_a_slot(self):
+        response = self._post(2)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+
+    def test_job_batch_is_queued_without_a_slot(self):
+        self.assertEqual(self._post(3).status_code, 202)
+        self.assertEqual(Job.objects.count(), 1)
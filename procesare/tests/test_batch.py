@@ -0,0 +1,71 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from benchmarks.sintetic import factura_pdf
+from procesare.batch import find_new_files, iter_result_rows, load_manifest, process_directory
+
+
+class ManifestTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.root = os.path.join(self.tmp, "facturi")
+        self.output_dir = os.path.join(self.tmp, "rezultat")
+        os.makedirs(os.path.join(self.root, "2024"))
+
+    def _write_pdf(self, relpath, i, n_blocuri=2):
+        with open(os.path.join(self.root, relpath), "wb") as f:
+            f.write(factura_pdf(i, n_blocuri))
+
+    def _process(self):
+        return process_directory(self.root, self.output_dir)
+
+    def test_only_new_or_changed_files_are_processed(self):
+        self._write_pdf("a.pdf", 0)
+        self._write_pdf("2024/b.pdf", 1)
+        _, stats = self._process()
+        self.assertEqual((stats["noi"], stats["sarite"], stats["randuri_noi"]), (2, 0, 4))
+
+        self._write_pdf("2024/b.pdf", 2, n_blocuri=3)
+        self._write_pdf("c.pdf", 3)
+        manifest, stats = self._process()
+
+        self.assertEqual((stats["noi"], stats["sarite"], stats["randuri_noi"]), (2, 1, 5))
+        self.assertEqual(manifest["2024/b.pdf"]["rows"], 3)
+        self.assertEqual(len(list(iter_result_rows(self.output_dir, manifest))), 7)
+
+    def test_touched_file_with_same_content_is_skipped(self):
+        self._write_pdf("a.pdf", 0)
+        self._process()
+        os.utime(os.path.join(self.root, "a.pdf"), (1, 1))
+
+        manifest = load_manifest(self.output_dir)
+        self.assertEqual(find_new_files(self.root, manifest), [])
+        self.assertEqual(manifest["a.pdf"]["mtime"], 1)
+
+    def test_removed_files_leave_manifest_and_results(self):
+        self._write_pdf("a.pdf", 0)
+        self._write_pdf("2024/b.pdf", 1)
+        self._process()
+        os.remove(os.path.join(self.root, "a.pdf"))
+
+        manifest, stats = self._process()
+
+        self.assertEqual(list(manifest), ["2024/b.pdf"])
+        self.assertEqual((stats["noi"], stats["sarite"]), (0, 1))
+        self.assertEqual({data["fisier"] for data in iter_result_rows(self.output_dir, manifest)}, {"2024/b.pdf"})
+
+    @override_settings(EXTRACTION_CACHE_DIR=None, PAGE_TEXT_DIR=None)
+    def test_old_no_excel_flag_still_skips_export(self):
+        self._write_pdf("a.pdf", 0)
+
+        call_command("proceseaza_director", self.root, self.output_dir, "--workers", "1", "--fara-excel",
+                     stdout=io.StringIO())
+
+        self.assertIn("a.pdf", load_manifest(self.output_dir))
+        self.assertFalse(any(name.startswith("facturi.") for name in os.listdir(self.output_dir)))
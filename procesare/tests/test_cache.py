@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from extrage_facturi import PARSER_VERSION, ExtractionCache, InvoiceRow
+
+
+def _rows(n=2):
+    return [InvoiceRow(POD=f"RO005E{100000000 + i}", factura="EON1", cantitate=10.5 + i) for i in range(n)]
+
+
+class ExtractionCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def test_rows_round_trip(self):
+        cache = ExtractionCache(self.directory)
+        cache.put("a" * 64, _rows(), 3)
+
+        rows, nr_blocuri = cache.get("a" * 64)
+
+        self.assertEqual([(data.POD, data.cantitate) for data in rows], [(data.POD, data.cantitate) for data in _rows()])
+        self.assertEqual(nr_blocuri, 3)
+        self.assertIsNone(cache.get("b" * 64))
+
+    def test_only_older_parser_versions_are_removed(self):
+        for name in (f"v{PARSER_VERSION - 1}", f"v{PARSER_VERSION + 1}", "altceva"):
+            os.makedirs(os.path.join(self.directory, name))
+
+        ExtractionCache(self.directory)
+
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         sorted([f"v{PARSER_VERSION}", f"v{PARSER_VERSION + 1}", "altceva"]))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        probe = ExtractionCache(tempfile.mkdtemp(dir=self.directory))
+        probe.put("0" * 64, _rows(), 2)
+        entry_size = os.path.getsize(probe._path("0" * 64))
+
+        cache = ExtractionCache(os.path.join(self.directory, "lru"), max_bytes=int(entry_size * 2.5))
+        now = time.time()
+        cache.put("a" * 64, _rows(), 2)
+        os.utime(cache._path("a" * 64), (now - 100, now - 100))
+        cache.put("b" * 64, _rows(), 2)
+        os.utime(cache._path("b" * 64), (now - 50, now - 50))
+        cache.get("a" * 64)  # a devine cea mai recent accesată
+        cache.put("c" * 64, _rows(), 2)
+
+        self.assertIsNotNone(cache.get("a" * 64))
+        self.assertIsNone(cache.get("b" * 64))
+        self.assertIsNotNone(cache.get("c" * 64))
+
+    def test_put_under_the_limit_does_not_rescan(self):
+        cache = ExtractionCache(self.directory)
+        cache.put("a" * 64, _rows(), 2)
+
+        with mock.patch.object(cache, "evict") as evict:
+            cache.put("b" * 64, _rows(), 2)
+            cache.put("a" * 64, _rows(), 2)
+
+        evict.assert_not_called()
@@ -0,0 +1,61 @@
+import csv
+import io
+import json
+from unittest import skipIf
+
+from django.test import SimpleTestCase
+from openpyxl import load_workbook
+
+from extrage_facturi import EXPORT_COLUMNS, InvoiceRow, export_rows, validate_rows
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+def _rows():
+    return validate_rows([
+        InvoiceRow(POD="RO005E100000001", factura="EON1", perioada_start="01.01.2024", perioada_end="31.01.2024",
+                   total_plata=119.0, cantitate_reactivc=500, fisier="a.pdf"),
+        InvoiceRow(POD="RO005E100000002", factura="EON1", perioada_start="01.01.2024", perioada_end="31.01.2024",
+                   total_plata=238.0, fisier="a.pdf"),
+    ])
+
+
+def _sheet_values(output):
+    output.seek(0)
+    return [[cell.value for cell in row] for row in load_workbook(output).active.iter_rows(min_row=3)]
+
+
+class ExportRowsTests(SimpleTestCase):
+    def test_excel_accepts_mappings(self):
+        from_rows, from_dicts = io.BytesIO(), io.BytesIO()
+
+        self.assertEqual(export_rows(_rows(), from_rows), 2)
+        self.assertEqual(export_rows([data.to_dict() for data in _rows()], from_dicts), 2)
+
+        values = _sheet_values(from_rows)
+        self.assertEqual(values, _sheet_values(from_dicts))
+        self.assertEqual(values[0][3:5], ["RO005E100000001", "EON1"])
+        self.assertIn("reactiv C", values[0][-1])
+
+    def test_csv_accepts_mappings_with_missing_fields(self):
+        output = io.BytesIO()
+
+        export_rows([{"POD": "RO005E100000001", "factura": "EON1"}], output, export_format="csv")
+
+        header, row = csv.reader(io.StringIO(output.getvalue().decode("utf-8-sig")))
+        self.assertEqual(dict(zip(header, row))["POD"], "RO005E100000001")
+
+    @skipIf(pq is None, "pyarrow nu e instalat")
+    def test_parquet_matches_jsonl(self):
+        parquet, jsonl = io.BytesIO(), io.BytesIO()
+
+        self.assertEqual(export_rows(_rows(), parquet, export_format="parquet"), 2)
+        export_rows(_rows(), jsonl, export_format="jsonl")
+
+        parquet.seek(0)
+        table = pq.read_table(parquet)
+        self.assertEqual(table.column_names, [name for _, name in EXPORT_COLUMNS])
+        self.assertEqual(table.to_pylist(), [json.loads(line) for line in jsonl.getvalue().decode().splitlines()])
@@ -0,0 +1,51 @@
+from django.test import TestCase
+
+from extrage_facturi import InvoiceRow
+from procesare.invoices import save_rows
+from procesare.models import Invoice, Job, Reading
+
+
+def _row(fisier, factura, pod="RO005E100000001", **values):
+    return InvoiceRow(fisier=fisier, factura=factura, POD=pod, perioada_start="01.01.2024", **values)
+
+
+class SaveRowsTests(TestCase):
+    def test_reuploaded_invoice_replaces_the_old_version(self):
+        save_rows([_row("a.pdf", "EON1", total_plata=10.0)])
+        save_rows([_row("a.pdf", "EON1", total_plata=12.5)])
+
+        self.assertEqual(list(Invoice.objects.values_list("numar", "total_plata")), [("EON1", 12.5)])
+        self.assertEqual(Reading.objects.count(), 1)
+
+    def test_same_number_in_another_file_is_kept(self):
+        save_rows([_row("a.pdf", "EON1")])
+        save_rows([_row("b.pdf", "EON1")])
+
+        self.assertEqual(sorted(Invoice.objects.values_list("fisier", flat=True)), ["a.pdf", "b.pdf"])
+
+    def test_invoice_without_number_is_replaced_per_file(self):
+        save_rows([_row("a.pdf", ""), _row("a.pdf", "", pod="RO005E100000002")])
+        save_rows([_row("a.pdf", "")])
+        save_rows([_row("b.pdf", "")])
+
+        self.assertEqual(sorted(Invoice.objects.values_list("fisier", flat=True)), ["a.pdf", "b.pdf"])
+        self.assertEqual(Reading.objects.filter(invoice__fisier="a.pdf").count(), 1)
+
+    def test_rerun_job_replaces_its_own_invoices(self):
+        job = Job.objects.create(input_dir="/tmp/x")
+        for _ in range(2):
+            save_rows([_row("a.pdf", "EON1"), _row("a.pdf", "EON1", pod="RO005E100000002")], job=job)
+
+        self.assertEqual(Invoice.objects.filter(job=job).count(), 1)
+        self.assertEqual(Reading.objects.count(), 2)
+
+
+class ReadingsViewTests(TestCase):
+    def test_limit_must_be_a_non_negative_number(self):
+        save_rows([_row("a.pdf", "EON1"), _row("a.pdf", "EON1", pod="RO005E100000002")])
+
+        self.assertEqual(self.client.get("/citiri/", {"limit": "-1"}).status_code, 400)
+        self.assertEqual(self.client.get("/citiri/", {"limit": "x"}).status_code, 400)
+        response = self.client.get("/citiri/", {"limit": "1"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 1)
@@ -0,0 +1,94 @@
+import os
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from procesare import jobs
+from procesare.jobs import claim_next_job, enqueue_job, process_in_memory, run_job
+from procesare.models import Invoice, Job, Reading
+
+from .helpers import TempMediaMixin, pdf_upload
+
+
+@override_settings(JOB_TIMEOUT=3600)
+class ClaimNextJobTests(TestCase):
+    def test_pending_job_is_claimed_once(self):
+        job = Job.objects.create(input_dir="/tmp/x", total_files=1)
+
+        claimed = claim_next_job()
+
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.status, Job.STATUS_RUNNING)
+        self.assertIsNotNone(claimed.started_at)
+        self.assertIsNone(claim_next_job())
+
+    def test_running_job_of_a_dead_worker_is_reclaimed(self):
+        started_at = timezone.now() - timedelta(hours=2)
+        job = Job.objects.create(input_dir="/tmp/x", status=Job.STATUS_RUNNING, started_at=started_at,
+                                 processed_files=3)
+
+        claimed = claim_next_job()
+
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertGreater(claimed.started_at, started_at)
+        self.assertEqual(claimed.processed_files, 0)
+
+    def test_streamed_upload_is_never_claimed(self):
+        Job.objects.create(status=Job.STATUS_RUNNING, started_at=timezone.now() - timedelta(hours=2))
+
+        self.assertIsNone(claim_next_job())
+
+    def test_recently_started_job_is_not_reclaimed(self):
+        Job.objects.create(input_dir="/tmp/x", status=Job.STATUS_RUNNING,
+                           started_at=timezone.now() - timedelta(minutes=5))
+
+        self.assertIsNone(claim_next_job())
+
+
+class RunJobTests(TempMediaMixin, TestCase):
+    def test_job_extracts_rows_and_removes_its_input(self):
+        enqueue_job([pdf_upload("a.pdf", 0), pdf_upload("b.pdf", 1)], format="csv")
+
+        job = run_job(claim_next_job())
+
+        self.assertEqual(job.status, Job.STATUS_DONE, job.error)
+        self.assertEqual(job.processed_files, 2)
+        self.assertEqual(job.rows, 6)
+        self.assertTrue(os.path.exists(job.result_path))
+        self.assertFalse(os.path.exists(job.input_dir))
+        self.assertEqual(Invoice.objects.filter(job=job).count(), 2)
+
+    def test_worker_does_not_overwrite_a_reclaimed_job(self):
+        enqueue_job([pdf_upload()], format="csv")
+        job = claim_next_job()
+        # Alt worker a preluat jobul între timp (started_at diferit)
+        Job.objects.filter(pk=job.pk).update(started_at=job.started_at + timedelta(seconds=1))
+
+        result = run_job(job)
+
+        self.assertEqual(result.status, Job.STATUS_RUNNING)
+        self.assertEqual(result.rows, 0)
+        self.assertTrue(os.path.isdir(job.input_dir))
+
+    @override_settings(JOB_TIMEOUT=3600)
+    def test_reclaimed_job_does_not_index_its_invoices_twice(self):
+        enqueue_job([pdf_upload("a.pdf", 0), pdf_upload("b.pdf", 1)], format="csv")
+        job = claim_next_job()
+        # Primul worker extrage tot, dar e considerat oprit înainte să marcheze jobul terminat
+        Job.objects.filter(pk=job.pk).update(started_at=job.started_at - timedelta(hours=2))
+        run_job(job)
+
+        job = run_job(claim_next_job())
+
+        self.assertEqual(job.status, Job.STATUS_DONE, job.error)
+        self.assertEqual((Invoice.objects.count(), Reading.objects.count()), (2, 6))
+
+    @override_settings(PDF_WORKERS=4)
+    def test_inline_batch_is_extracted_without_a_process_pool(self):
+        with mock.patch("procesare.jobs.iter_source_rows", wraps=jobs.iter_source_rows) as iter_source_rows:
+            nr_rows, _ = process_in_memory([pdf_upload("a.pdf", 0)], format="csv")
+
+        self.assertEqual(nr_rows, 3)
+        self.assertEqual(iter_source_rows.call_args.kwargs["workers"], 1)
@@ -0,0 +1,26 @@
+from django.test import SimpleTestCase
+
+from extrage_facturi import (GENERIC_LAYOUT, DocumentContext, detect_layout, extract_data_from_text, resolve_layout,
+                             split_pdf_by_blocuri)
+from benchmarks.sintetic import factura_text
+
+
+def _first_row(text):
+    return extract_data_from_text(split_pdf_by_blocuri(text)[0], context=DocumentContext(text))
+
+
+class LayoutTests(SimpleTestCase):
+    def test_layout_only_reorders_the_generic_variants(self):
+        layout = resolve_layout("eon")
+
+        self.assertEqual(layout["cantitate"][0], ("cantitate", "total_ea"))
+        for field in ("loc_consum", "total_plata", "cantitate"):
+            self.assertCountEqual(layout[field], GENERIC_LAYOUT[field])
+        self.assertEqual(resolve_layout(None), GENERIC_LAYOUT)
+
+    def test_recognized_layout_falls_back_to_generic_variants(self):
+        text = factura_text(0, 1).replace("Total EA 3155 kWh", "Cantitate facturată 3155 kWh")
+        self.assertEqual(detect_layout(text), "eon")
+
+        self.assertEqual(_first_row(text)["cantitate"], 3155)
+        self.assertEqual(_first_row(factura_text(0, 1))["cantitate"], 3155)
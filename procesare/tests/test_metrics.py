@@ -0,0 +1,44 @@
+import re
+import threading
+
+from django.test import SimpleTestCase
+
+from extrage_facturi import PATTERNS, DocumentContext, collect_metrics, extract_data_from_text, split_pdf_by_blocuri
+from benchmarks.sintetic import factura_text
+
+
+def _extract_first_block(text):
+    return extract_data_from_text(split_pdf_by_blocuri(text)[0], context=DocumentContext(text))
+
+
+class CollectMetricsTests(SimpleTestCase):
+    def test_counts_regex_without_replacing_patterns(self):
+        text = factura_text(0, 2)
+
+        with collect_metrics() as metrics:
+            _extract_first_block(text)
+
+        self.assertGreater(metrics.regex["POD"]["hit"], 0)
+        self.assertIsInstance(dict.__getitem__(PATTERNS, "POD"), re.Pattern)
+        self.assertIsInstance(PATTERNS["POD"], re.Pattern)
+
+    def test_other_threads_are_not_counted(self):
+        text = factura_text(0, 2)
+        started, done = threading.Event(), threading.Event()
+        seen = []
+
+        def other():
+            started.wait()
+            seen.append(type(PATTERNS["POD"]))
+            _extract_first_block(text)
+            done.set()
+
+        thread = threading.Thread(target=other)
+        thread.start()
+        with collect_metrics() as metrics:
+            started.set()
+            done.wait()
+        thread.join()
+
+        self.assertEqual(seen, [re.Pattern])
+        self.assertEqual(metrics.regex, {})
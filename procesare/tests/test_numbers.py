@@ -0,0 +1,27 @@
+from django.test import SimpleTestCase
+
+from benchmarks import extractor_initial
+from extrage_facturi import parse_number, sum_numbers
+
+
+class ParseNumberTests(SimpleTestCase):
+    def test_decimal_comma_and_thousands_separators(self):
+        self.assertEqual(parse_number("12,50"), 12.5)
+        self.assertEqual(parse_number("1.234"), 1234)
+        self.assertEqual(parse_number("1.234.567,89"), 1234567.89)
+        self.assertEqual(parse_number("1\xa0234,5"), 1234.5)
+        self.assertEqual(parse_number("12.5"), 12.5)
+
+    def test_unicode_minus_signs(self):
+        for minus in "-−–—":
+            self.assertEqual(parse_number(f"{minus}1.234,56"), -1234.56)
+
+    def test_empty_or_invalid_values_are_zero(self):
+        for value in ("", None, "1.2.3", "n/a"):
+            self.assertEqual(parse_number(value), 0)
+
+    def test_same_values_as_the_initial_extractor(self):
+        values = ["0,00", "3155", "1.234,56", "−12,00", "– 5", "1\xa0000,1", "7.000.000", "1.2.3", "", ",5"]
+
+        self.assertEqual([parse_number(v) for v in values], [extractor_initial.parse_number(v) for v in values])
+        self.assertEqual(sum_numbers(values), sum(extractor_initial.parse_number(v) for v in values))
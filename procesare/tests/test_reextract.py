@@ -0,0 +1,78 @@
+import io
+import json
+import os
+import shutil
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+
+from benchmarks.sintetic import factura_pdf
+from procesare.batch import RESULTS_NAME
+
+from .helpers import TempMediaMixin
+
+
+class ReextractCommandTests(TempMediaMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = os.path.join(self.tmp, "facturi")
+        self.output_dir = os.path.join(self.tmp, "rezultat")
+        os.makedirs(self.root)
+        for i in range(2):
+            with open(os.path.join(self.root, f"factura_{i}.pdf"), "wb") as f:
+                f.write(factura_pdf(i, 2))
+        call_command("proceseaza_director", self.root, self.output_dir, "--workers", "1", "--format", "csv",
+                     stdout=io.StringIO())
+        self.export_path = os.path.join(self.output_dir, "facturi.csv")
+        with open(self.export_path, "rb") as f:
+            self.exported = f.read()
+
+    def _results(self):
+        with open(os.path.join(self.output_dir, RESULTS_NAME), encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def _corrupt(self, **values):
+        # Ca după o regex greșită: valorile vechi din rezultate.jsonl diferă de ce extrage codul curent
+        records = self._results()
+        for record in records:
+            for data in record["rows"]:
+                data.update(values)
+        with open(os.path.join(self.output_dir, RESULTS_NAME), "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+    def _reextract(self, *args):
+        stdout = io.StringIO()
+        call_command("reextrage", self.output_dir, "--format", "csv", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_full_reextract_restores_the_export(self):
+        self._corrupt(total_plata=0, loc_consum="gresit")
+
+        output = self._reextract()
+
+        self.assertIn("2 fișiere re-extrase (0 doar pe câmpurile cerute, 2 modificate)", output)
+        with open(self.export_path, "rb") as f:
+            self.assertEqual(f.read(), self.exported)
+
+    def test_selected_fields_only_replace_those_values(self):
+        self._corrupt(total_plata=0, loc_consum="gresit")
+
+        output = self._reextract("--campuri", "total_plata", "--fara-export")
+
+        self.assertIn("(2 doar pe câmpurile cerute, 2 modificate)", output)
+        rows = [data for record in self._results() for data in record["rows"]]
+        self.assertTrue(all(data["total_plata"] > 0 for data in rows))
+        self.assertEqual({data["loc_consum"] for data in rows}, {"gresit"})
+
+    def test_files_without_page_text_keep_their_rows(self):
+        shutil.rmtree(os.path.join(self.tmp, "texte"))
+        self._corrupt(total_plata=0)
+
+        self.assertIn("2 fără text păstrat", self._reextract("--fara-export"))
+        self.assertEqual({data["total_plata"] for record in self._results() for data in record["rows"]}, {0})
+
+    def test_unknown_fields_and_missing_text_store_are_rejected(self):
+        with self.assertRaisesMessage(CommandError, "Câmpuri necunoscute: nu_exista"):
+            self._reextract("--campuri", "total_plata,nu_exista")
+        with override_settings(PAGE_TEXT_DIR=None), self.assertRaises(CommandError):
+            self._reextract()
@@ -0,0 +1,86 @@
+import os
+from datetime import timedelta
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from extrage_facturi import VALIDATION_RULES, InvoiceRow
+from procesare import results
+from procesare.models import StoredResult
+from procesare.results import evict_results, export_stored, find_result, hash_uploads
+
+from .helpers import TempMediaMixin, pdf_upload
+
+
+def _same_upload(upload):
+    # Fiecare PDF generat are alt /ID în trailer → aceeași factură se refolosește ca bytes
+    upload.seek(0)
+    return SimpleUploadedFile(upload.name, upload.read(), content_type="application/pdf")
+
+
+def _rows(**values):
+    return [InvoiceRow(POD="RO005E100000001", factura="EON1", **values)]
+
+
+class StoredResultTests(TempMediaMixin, TestCase):
+    def _store(self, batch_hash, size=0, age=0):
+        _, path = export_stored(_rows(), batch_hash, "csv", VALIDATION_RULES)
+        if size:
+            with open(path, "ab") as f:
+                f.write(b" " * size)
+            StoredResult.objects.filter(batch_hash=batch_hash).update(size=os.path.getsize(path))
+        StoredResult.objects.filter(batch_hash=batch_hash).update(last_access=timezone.now() - timedelta(seconds=age))
+        return path
+
+    def test_batch_hash_depends_on_content_names_and_format(self):
+        upload = pdf_upload("a.pdf", 0)
+        key = hash_uploads([upload], "csv", VALIDATION_RULES)
+
+        self.assertEqual(key, hash_uploads([_same_upload(upload)], "csv", VALIDATION_RULES))
+        renamed = _same_upload(upload)
+        renamed.name = "b.pdf"
+        self.assertNotEqual(key, hash_uploads([renamed], "csv", VALIDATION_RULES))
+        self.assertNotEqual(key, hash_uploads([pdf_upload("a.pdf", 0)], "csv", VALIDATION_RULES))
+        self.assertNotEqual(key, hash_uploads([_same_upload(upload)], "jsonl", VALIDATION_RULES))
+
+    @override_settings(INLINE_MAX_FILES=5, INLINE_MAX_BYTES=10 * 1024 * 1024)
+    def test_identical_upload_is_served_from_the_store(self):
+        upload = pdf_upload("a.pdf", 0)
+        first = self.client.post("/", {"pdf_files": [upload], "format": "csv"})
+        second = self.client.post("/", {"pdf_files": [_same_upload(upload)], "format": "csv"})
+
+        self.assertEqual(b"".join(first.streaming_content), b"".join(second.streaming_content))
+        self.assertEqual(StoredResult.objects.count(), 1)
+        self.assertEqual(len(os.listdir(results.RESULT_DIR)), 1)
+
+    def test_incomplete_extraction_is_not_stored(self):
+        export_stored(_rows(campuri_depasite=("index/activ",)), "a" * 64, "csv", VALIDATION_RULES)
+
+        self.assertIsNone(find_result("a" * 64))
+
+    def test_missing_file_invalidates_the_entry(self):
+        os.remove(self._store("a" * 64))
+
+        self.assertIsNone(find_result("a" * 64))
+        self.assertFalse(StoredResult.objects.exists())
+
+    def test_expired_results_are_evicted(self):
+        old = self._store("a" * 64, age=3600)
+        recent = self._store("b" * 64)
+
+        self.assertEqual(evict_results(ttl=60, max_bytes=10 ** 9, dry_run=True)[0], 1)
+        self.assertTrue(os.path.exists(old))
+        removed, _ = evict_results(ttl=60, max_bytes=10 ** 9)
+
+        self.assertEqual(removed, 1)
+        self.assertFalse(os.path.exists(old))
+        self.assertEqual(list(StoredResult.objects.values_list("path", flat=True)), [recent])
+
+    def test_least_recently_used_are_evicted_over_the_size_limit(self):
+        paths = [self._store(key * 64, size=1000, age=age) for key, age in (("a", 30), ("b", 20), ("c", 10))]
+
+        evict_results(ttl=3600, max_bytes=sum(os.path.getsize(path) for path in paths[1:]))
+
+        self.assertEqual([os.path.exists(path) for path in paths], [False, True, True])
+        self.assertEqual(StoredResult.objects.count(), 2)
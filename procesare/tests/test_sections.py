@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase
+
+from benchmarks import extractor_initial
+from benchmarks.sintetic import factura_text
+from extrage_facturi import DocumentContext, extract_data_from_text, split_pdf_by_blocuri, tokenize_sections
+
+
+def _rows(text):
+    context = DocumentContext(text)
+    return [extract_data_from_text(bloc, context=context).to_dict() for bloc in split_pdf_by_blocuri(text)]
+
+
+def _tips(text):
+    # „TOTAL” apare și în „Total EA” etc.; contează ordinea secțiunilor cu nume
+    return [section.tip for section in tokenize_sections(text) if section.tip != "total"]
+
+
+class SplitBlocuriTests(SimpleTestCase):
+    def test_same_blocks_as_the_initial_splitter(self):
+        text = factura_text(0, 3)
+
+        self.assertEqual(split_pdf_by_blocuri(text), extractor_initial.split_pdf_by_blocuri(text))
+        self.assertEqual(_tips(text), ["header"] + ["loc_consum", "citiri", "produse"] * 3)
+
+    def test_crlf_text(self):
+        text = factura_text(0, 2)
+        crlf = text.replace("\n", "\r\n").replace("DETALII CITIRI", "DETALII\r\nCITIRI")
+
+        self.assertEqual(split_pdf_by_blocuri(crlf), extractor_initial.split_pdf_by_blocuri(crlf))
+        self.assertEqual(_tips(crlf), _tips(text))
+        self.assertEqual(_rows(crlf), _rows(text))
+
+    def test_document_without_sections(self):
+        text = "Localitatea CLUJ-NAPOCA Cod postal 400001\nPOD: RO005E100000000\nTotal EA 12 kWh"
+
+        self.assertEqual(_tips(text), ["header"])
+        self.assertEqual(split_pdf_by_blocuri(text), [text])
+        self.assertEqual(split_pdf_by_blocuri(text), extractor_initial.split_pdf_by_blocuri(text))
+
+    def test_empty_loc_consum_section_does_not_fall_back_to_the_address(self):
+        text = factura_text(0, 1).replace(
+            "DETALII LOC DE CONSUM\n", "DETALII LOC DE CONSUM\nDenumirea produsului contractat Energie electrica activa\n")
+        bloc = split_pdf_by_blocuri(text)[0]
+
+        self.assertEqual(_rows(text)[0]["loc_consum"], "")
+        self.assertEqual(extractor_initial.extract_data_from_text(bloc, global_text=text)["loc_consum"], "")
@@ -0,0 +1,82 @@
+import csv
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from benchmarks.sintetic import factura_pdf
+from procesare import spool
+from procesare.spool import claim_files, init_spool, merge_spool, requeue_stale, run_spool_worker
+
+
+class SpoolTests(SimpleTestCase):
+    def setUp(self):
+        self.spool = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool, ignore_errors=True)
+        init_spool(self.spool)
+
+    def _queue(self, n):
+        for i in range(n):
+            path = os.path.join(self.spool, "intrare", f"lot{i % 2}", f"factura_{i}.pdf")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(factura_pdf(i, n_blocuri=2))
+
+    def _worker(self, name, age=0):
+        worker_dir = os.path.join(self.spool, "lucru", name)
+        claimed = claim_files(self.spool, worker_dir, limit=2)
+        heartbeat = os.path.join(self.spool, "heartbeat", name)
+        seen = spool._touch(heartbeat) - age
+        os.utime(heartbeat, (seen, seen))
+        return worker_dir, claimed
+
+    def _merged(self):
+        output_path = os.path.join(self.spool, "facturi.csv")
+        merge_spool(self.spool, output_path, export_format="csv")
+        with open(output_path, encoding="utf-8-sig") as f:
+            return sorted(row["fisier"] for row in csv.DictReader(f))
+
+    def test_claim_stops_at_the_limit(self):
+        self._queue(5)
+        worker_dir, claimed = self._worker("w1")
+
+        self.assertEqual(len(claimed), 2)
+        self.assertEqual(sorted(spool._pending_pdfs(worker_dir)), sorted(claimed))
+        self.assertEqual(len(spool._pending_pdfs(os.path.join(self.spool, "intrare"))), 3)
+
+    def test_staleness_uses_the_spool_clock(self):
+        self._queue(4)
+        fresh_dir, _ = self._worker("viu")
+        stale_dir, claimed = self._worker("oprit", age=1000)
+
+        # Ceasul local decalat cu o oră nu face heartbeat-ul proaspăt să pară vechi
+        with mock.patch("time.time", return_value=time.time() + 3600):
+            self.assertEqual(requeue_stale(self.spool, stale_seconds=600), 2)
+
+        self.assertTrue(os.path.exists(fresh_dir))
+        self.assertFalse(os.path.exists(stale_dir))
+        self.assertFalse(os.path.exists(os.path.join(self.spool, "heartbeat", "oprit")))
+        self.assertEqual(len(spool._pending_pdfs(os.path.join(self.spool, "intrare"))), 2)
+
+    def test_worker_declared_stale_keeps_running(self):
+        self._queue(5)
+        process_source = spool.process_source
+        requeued = []
+
+        def slow_process(source, cache):
+            # Un alt worker îl declară oprit în timp ce procesează primul fișier
+            if not requeued:
+                requeued.append(requeue_stale(self.spool, stale_seconds=-1))
+            return process_source(source, cache)
+
+        with mock.patch("procesare.spool.process_source", side_effect=slow_process):
+            stats = run_spool_worker(self.spool, claim_files_limit=2, once=True)
+
+        self.assertEqual(requeued, [2])
+        self.assertEqual(stats["erori"], 0)
+        self.assertEqual(os.listdir(os.path.join(self.spool, "lucru")), [])
+        self.assertEqual(os.listdir(os.path.join(self.spool, "heartbeat")), [])
+        self.assertEqual(self._merged(), sorted(f"lot{i % 2}/factura_{i}.pdf" for i in range(5) for _ in range(2)))
@@ -0,0 +1,79 @@
+from django.test import TestCase, override_settings
+
+from procesare.models import Invoice, Job
+
+from .helpers import TempMediaMixin, pdf_upload
+
+
+def _uploads(n):
+    return [pdf_upload(f"factura_{i}.pdf", i, n_blocuri=2) for i in range(n)]
+
+
+@override_settings(INLINE_MAX_FILES=2, INLINE_MAX_BYTES=10 * 1024 * 1024)
+class UploadRoutingTests(TempMediaMixin, TestCase):
+    def test_small_batch_is_processed_in_the_request(self):
+        response = self.client.post("/", {"pdf_files": _uploads(2), "format": "csv"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("attachment", response["Content-Disposition"])
+        self.assertEqual(Invoice.objects.count(), 2)
+        self.assertFalse(Job.objects.exists())
+
+    def test_large_batch_becomes_a_job(self):
+        response = self.client.post("/", {"pdf_files": _uploads(3), "format": "csv"})
+
+        self.assertEqual(response.status_code, 202)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.total_files), (Job.STATUS_PENDING, 3))
+
+    @override_settings(JOB_QUEUE_MAX=0)
+    def test_many_small_files_count_against_the_job_queue(self):
+        response = self.client.post("/", {"pdf_files": _uploads(3), "format": "csv"})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "60")
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(JOB_QUEUE_MAX=0)
+    async def test_stream_counts_many_small_files_against_the_job_queue(self):
+        response = await self.async_client.post("/upload/stream/", {"pdf_files": _uploads(3), "format": "csv"})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(await Job.objects.aexists())
+
+    async def test_stream_follows_a_job_for_large_batches(self):
+        response = await self.async_client.post("/upload/stream/", {"pdf_files": _uploads(3), "format": "csv"})
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = aiter(response.streaming_content)
+        self.assertIn(b"event: start", await anext(events))
+        job = await Job.objects.aget()
+        self.assertEqual(job.status, Job.STATUS_PENDING)
+
+        await Job.objects.filter(pk=job.pk).aupdate(status=Job.STATUS_DONE, processed_files=3, rows=6)
+        rest = b"".join([chunk async for chunk in events])
+        self.assertIn(b'"procesate": 3', rest)
+        self.assertIn(b"event: gata", rest)
+
+    async def test_stream_processes_small_batches_inline(self):
+        response = await self.async_client.post("/upload/stream/", {"pdf_files": _uploads(2), "format": "csv"})
+
+        body = b"".join([chunk async for chunk in response.streaming_content])
+
+        self.assertEqual(body.count(b"event: fisier"), 2)
+        self.assertIn(b'"rows": 4', body)
+        self.assertEqual(await Invoice.objects.acount(), 2)
+
+    @override_settings(INLINE_MAX_BYTES=1024)
+    async def test_stream_checks_the_job_queue_for_large_bodies(self):
+        response = await self.async_client.post("/upload/stream/", {"pdf_files": _uploads(3), "format": "csv"})
+
+        self.assertIn(b"event: start", await anext(aiter(response.streaming_content)))
+        self.assertEqual(await Job.objects.acount(), 1)
+
+    @override_settings(INLINE_MAX_BYTES=1024, JOB_QUEUE_MAX=0)
+    async def test_stream_rejects_large_bodies_when_the_job_queue_is_full(self):
+        response = await self.async_client.post("/upload/stream/", {"pdf_files": _uploads(3), "format": "csv"})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "60")
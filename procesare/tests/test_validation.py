@@ -0,0 +1,64 @@
+from django.test import SimpleTestCase
+
+from extrage_facturi import VALIDATION_RULES, InvoiceRow, iter_source_rows, validate_rows
+from benchmarks.sintetic import factura_pdf
+
+
+def _row(pod="RO005E100000001", perioada_start="01.01.2024", perioada_end="31.01.2024", **values):
+    return InvoiceRow(POD=pod, perioada_start=perioada_start, perioada_end=perioada_end, **values)
+
+
+class ValidateRowsTests(SimpleTestCase):
+    def test_index_difference_must_match_quantity(self):
+        rows = validate_rows([
+            _row(index_activ_vechi=100, index_activ_nou=150, cantitate_activ=50),
+            _row(pod="RO005E100000002", index_activ_vechi=100, index_activ_nou=150, cantitate_activ=40),
+        ])
+
+        self.assertEqual(rows[0]["alerte"], ())
+        self.assertEqual(rows[1]["alerte"], ("index_activ",))
+        self.assertEqual(rows[1]["alerta"], VALIDATION_RULES["index_activ"]["mesaj"])
+
+    def test_vat_accepts_every_configured_rate_and_ignores_missing_values(self):
+        rows = validate_rows([
+            _row(pod="A1", valoare_fara_TVA=100, valoare_cu_TVA=119),
+            _row(pod="A2", valoare_fara_TVA=100, valoare_cu_TVA=121),
+            _row(pod="A3", valoare_fara_TVA=100, valoare_cu_TVA=150),
+            _row(pod="A4", valoare_fara_TVA=0, valoare_cu_TVA=150),
+        ])
+
+        self.assertEqual([("tva" in data["alerte"]) for data in rows], [False, False, True, False])
+
+    def test_duplicates_are_found_across_batches(self):
+        state = {}
+        first = validate_rows([_row(), _row(pod="")], state=state)
+        second = validate_rows([_row(), _row(pod=""), _row(perioada_start="01.02.2024")], state=state)
+
+        self.assertEqual([data["alerte"] for data in first], [(), ()])
+        self.assertEqual([data["alerte"] for data in second], [("duplicat",), (), ()])
+
+    def test_custom_rules_and_thresholds(self):
+        rules = {"reactiv": {"tip": "citit_vs_facturat", "energie": "reactivc", "prag": 5, "mesaj": "reactiv C"}}
+
+        rows = validate_rows([_row(cantitate_reactivc=10, cantitate_facturata_reactivc=14),
+                              _row(cantitate_reactivc=10, cantitate_facturata_reactivc=16)], rules)
+
+        self.assertEqual([data["alerta"] for data in rows], ["", "reactiv C"])
+
+    def test_plain_dicts_are_validated_too(self):
+        rows = validate_rows([_row(index_activ_vechi=1, index_activ_nou=5).to_dict()])
+
+        self.assertEqual(rows[0]["alerte"], ("index_activ",))
+
+
+class IterSourceRowsTests(SimpleTestCase):
+    def test_progress_is_reported_per_file_before_the_batch_is_validated(self):
+        sources = [(f"factura_{i}.pdf", factura_pdf(i, 2)) for i in range(3)]
+        events = []
+
+        rows = iter_source_rows(sources, on_progress=lambda filename, *_: events.append(("extras", filename)),
+                                on_file=lambda filename, *_: events.append(("validat", filename)))
+        nr_rows = sum(1 for _ in rows)
+
+        self.assertEqual(nr_rows, 6)
+        self.assertEqual(events, [("extras", name) for name, _ in sources] + [("validat", name) for name, _ in sources])
@@ -0,0 +1,70 @@
+import re
+import threading
+
+from django.test import SimpleTestCase
+
+from extrage_facturi import MatchBudget, WindowedPattern, _budget, match_budget
+
+
+def _pattern(window=20):
+    pattern = WindowedPattern(re.compile(r"Total EA.*?([\d.,]+)\s*kWh", re.DOTALL), r"Total EA", window)
+    pattern.key = "cantitate/total_ea"
+    return pattern
+
+
+class _CountedBudget(MatchBudget):
+    # Bugetul se termină după un număr fix de verificări, nu după timp → test determinist
+    def __init__(self, checks):
+        super().__init__(60)
+        self.checks = checks
+
+    def exhausted(self, key):
+        self.checks -= 1
+        if self.checks >= 0:
+            return False
+        self.skipped.add(key)
+        return True
+
+
+class WindowedPatternTests(SimpleTestCase):
+    def test_value_inside_the_window(self):
+        self.assertEqual(_pattern().findall("Total EA 12,5 kWh / Total EA 7 kWh"), ["12,5", "7"])
+
+    def test_value_cut_by_the_window_end_is_read_whole(self):
+        pattern = _pattern(window=len("Total EA  1.234"))
+
+        self.assertEqual(pattern.search("Total EA  1.234.567,89 kWh").group(1), "1.234.567,89")
+
+    def test_value_after_the_window_is_still_found(self):
+        self.assertEqual(_pattern().search("Total EA" + " x" * 100 + " 42 kWh").group(1), "42")
+
+    def test_label_without_value_does_not_hide_the_next_line(self):
+        pattern = WindowedPattern(re.compile(r"Total EA.*?([\d.,]+)\s*kWh"), r"Total EA")
+
+        self.assertEqual(pattern.findall("Total EA lipsă\nTotal EA 3 kWh"), ["3"])
+        self.assertEqual(_pattern().findall("Total EA lipsă " * 1000), [])
+
+    def test_exhausted_budget_skips_the_search(self):
+        with match_budget(-1) as budget:
+            self.assertIsNone(_pattern().search("Total EA 12,5 kWh"))
+
+        self.assertEqual(budget.skipped, {"cantitate/total_ea"})
+
+    def test_budget_is_checked_while_the_window_grows(self):
+        budget = _CountedBudget(checks=2)
+        token = _budget.set(budget)
+        try:
+            self.assertIsNone(_pattern().search("Total EA" + " x" * 5000 + " 42 kWh"))
+        finally:
+            _budget.reset(token)
+
+        self.assertEqual(budget.skipped, {"cantitate/total_ea"})
+
+    def test_budget_is_local_to_the_thread(self):
+        found = []
+        with match_budget(-1):
+            thread = threading.Thread(target=lambda: found.append(_pattern().search("Total EA 12,5 kWh")))
+            thread.start()
+            thread.join()
+
+        self.assertEqual(found[0].group(1), "12,5")
@@ -1,6 +1,15 @@
 from django.urls import path
-from .views import upload_view
+from .views import (upload_view, upload_stream_view, admission_metrics_view, job_status_view, job_metrics_view, job_download_view,
+                    result_download_view, readings_view, readings_excel_view)
 
 urlpatterns = [
     path('', upload_view, name='upload'),
+    path('upload/stream/', upload_stream_view, name='upload_stream'),
+    path('admitere/metrici/', admission_metrics_view, name='admission_metrics'),
+    path('job/<uuid:job_id>/status/', job_status_view, name='job_status'),
+    path('job/<uuid:job_id>/metrics/', job_metrics_view, name='job_metrics'),
+    path('job/<uuid:job_id>/download/', job_download_view, name='job_download'),
+    path('rezultat/<str:batch_hash>/', result_download_view, name='result_download'),
+    path('citiri/', readings_view, name='readings'),
+    path('citiri/excel/', readings_excel_view, name='readings_excel'),
 ]
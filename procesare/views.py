@@ -1,40 +1,221 @@
+import io
 import os
 import uuid
+from functools import partial
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.http import FileResponse
-from django.shortcuts import render
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
-from extrage_facturi import process_pdfs, finalize_excel
+from extrage_facturi import DEFAULT_EXPORT_FORMAT, EXPORTERS, export_filename, export_rows
+from .admission import AdmissionRejected, check_upload_limits, client_id, get_admission, with_retry_after
+from .invoices import filter_readings, iter_reading_rows
+from .jobs import enqueue_job, get_validation_rules, process_in_memory, runs_inline
+from .models import Job
+from .results import find_result, hash_uploads, touch_result
+from .streaming import AdmittedStream, iter_job_events, iter_stored_events, iter_upload_events
+
+
+def _render_upload(request, context=None, status=200):
+    context = {'formats': list(EXPORTERS), 'default_format': DEFAULT_EXPORT_FORMAT, **(context or {})}
+    return render(request, 'procesare/upload.html', context, status=status)
+
+
+def _result_response(path):
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=os.path.basename(path))
 
-UPLOAD_DIR = os.path.join(settings.BASE_DIR, "media", "temp_uploads")
-RESULT_DIR = os.path.join(settings.BASE_DIR, "media", "temp_results")
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-os.makedirs(RESULT_DIR, exist_ok=True)
 
 @csrf_exempt
 def upload_view(request):
     if request.method == 'POST':
-        files = request.FILES.getlist('pdf_files')
-        if not files:
-            return render(request, 'procesare/upload.html', {'error': 'Nu ai trimis fișiere'})
+        # Limitele de mărime se verifică înaintea citirii corpului: un upload respins nu ajunge în memorie sau pe disc
+        try:
+            check_upload_limits(request)
+            return _process_upload(request)
+        except AdmissionRejected as e:
+            return with_retry_after(_render_upload(request, {'error': e.reason}, status=e.status), e)
+
+    return _render_upload(request)
+
+
+def _process_upload(request):
+    files = request.FILES.getlist('pdf_files')
+    if not files:
+        return _render_upload(request, {'error': 'Nu ai trimis fișiere'})
+    format = request.POST.get('format') or DEFAULT_EXPORT_FORMAT
+    if format not in EXPORTERS:
+        return _render_upload(request, {'error': f'Format necunoscut: {format}'}, status=400)
+
+    profile = bool(request.POST.get('profile'))
+    batch_hash = hash_uploads(files, format, get_validation_rules())
+    stored = None if profile else find_result(batch_hash)
+    if stored is not None:
+        # Același lot (aceleași fișiere, format și reguli) a mai fost procesat → fișierul păstrat, imediat
+        return _result_response(stored.path)
+
+    if runs_inline(files):
+        # Lot mic: procesat direct din memorie, fiecare request cu propriile buffere; doar aici se ocupă un loc
+        # de admitere (punerea în coadă a unui job sau un rezultat păstrat nu extrag nimic în request)
+        with get_admission().admit(client_id(request)):
+            _, output_path = process_in_memory(files, format=format, batch_hash=batch_hash)
+        return _result_response(output_path)
+
+    # Lot mare: fișierele ajung în directorul jobului, procesarea rulează în worker
+    # (manage.py proceseaza_joburi); aici doar punem jobul în coadă
+    job = enqueue_job(files, profile=profile, format=format, batch_hash=batch_hash)
+    return _render_upload(request, {'job': job}, status=202)
+
+
+def _upload_files(request):
+    return request.FILES.getlist('pdf_files')
+
+
+def _read_upload(files):
+    return [(os.path.basename(f.name), f.read()) for f in files]
+
+
+def _enqueue_upload(files, format):
+    batch_hash = hash_uploads(files, format, get_validation_rules())
+    stored = find_result(batch_hash)
+    if stored is not None:
+        return None, stored
+    return enqueue_job(files, format=format, batch_hash=batch_hash), None
+
+
+def _event_stream(events):
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx nu trebuie să țină evenimentele în buffer
+    return response
+
+
+@csrf_exempt
+async def upload_stream_view(request):
+    # Varianta async a upload-ului, cu progresul ca Server-Sent Events; rulează doar sub ASGI (vezi streaming.py).
+    # Loturile mici (runs_inline) se extrag aici; cele mari devin joburi, iar stream-ul urmărește progresul lor.
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Metodă nepermisă'}, status=405)
+    try:
+        # Numărarea joburilor în așteptare e o interogare ORM sincronă → în thread
+        await sync_to_async(check_upload_limits)(request)
+    except AdmissionRejected as e:
+        return with_retry_after(JsonResponse({'error': e.reason}, status=e.status), e)
+
+    # Parsarea multipart e blocantă → în thread; fișierele mari ajung pe disc (FILE_UPLOAD_MAX_MEMORY_SIZE)
+    files = await sync_to_async(_upload_files)(request)
+    format = request.POST.get('format') or DEFAULT_EXPORT_FORMAT
+    if not files or format not in EXPORTERS:
+        error = f'Format necunoscut: {format}' if files else 'Nu ai trimis fișiere'
+        return JsonResponse({'error': error}, status=400)
+
+    if not runs_inline(files):
+        try:
+            job, stored = await sync_to_async(_enqueue_upload)(files, format)
+        except AdmissionRejected as e:
+            return with_retry_after(JsonResponse({'error': e.reason}, status=e.status), e)
+        if stored is not None:
+            return _event_stream(iter_stored_events(stored, len(files)))
+        return _event_stream(iter_job_events(job))
+
+    # Locul de admitere se ține până la ultimul eveniment (AdmittedStream.close)
+    admission = get_admission()
+    client = client_id(request)
+    try:
+        started = await admission.aacquire(client)
+    except AdmissionRejected as e:
+        return with_retry_after(JsonResponse({'error': e.reason}, status=e.status), e)
+    release = partial(admission.release, client, started)
+    try:
+        sources = await sync_to_async(_read_upload)(files)
+    except BaseException:
+        release()
+        raise
+    return _event_stream(AdmittedStream(iter_upload_events(sources, format), release))
+
+
+def admission_metrics_view(request):
+    # Starea admiterii în acest proces: locuri ocupate, adâncimea cozii, timpi de așteptare, respingeri
+    metrics = get_admission().snapshot()
+    metrics['joburi_in_asteptare'] = Job.objects.filter(status=Job.STATUS_PENDING).count()
+    metrics['max_joburi_in_asteptare'] = settings.JOB_QUEUE_MAX
+    return JsonResponse(metrics)
+
+
+def job_status_view(request, job_id):
+    job = get_object_or_404(Job, pk=job_id)
+    return JsonResponse({
+        'id': str(job.pk),
+        'status': job.status,
+        'total_files': job.total_files,
+        'processed_files': job.processed_files,
+        'rows': job.rows,
+        'error': job.error,
+        'download_url': reverse('job_download', args=[job.pk]) if job.status == Job.STATUS_DONE else None,
+        'metrics_url': reverse('job_metrics', args=[job.pk]) if job.metrics is not None else None,
+    })
+
+
+def job_metrics_view(request, job_id):
+    # Rezumatul JSON al instrumentării: timpi pe etape și fișiere, hit/miss per regex, profil cProfile
+    job = get_object_or_404(Job, pk=job_id)
+    if job.metrics is None:
+        raise Http404("Metricile nu sunt încă disponibile")
+    return JsonResponse(job.metrics, json_dumps_params={'ensure_ascii': False})
+
+
+def job_download_view(request, job_id):
+    job = get_object_or_404(Job, pk=job_id)
+    if job.status != Job.STATUS_DONE or not os.path.exists(job.result_path):
+        # Jobul e încă în lucru sau rezultatul a fost evacuat (curata_rezultate)
+        raise Http404("Rezultatul nu este disponibil")
+    touch_result(job.result_path)
+    return _result_response(job.result_path)
+
+
+def result_download_view(request, batch_hash):
+    stored = find_result(batch_hash)
+    if stored is None:
+        raise Http404("Rezultatul nu este disponibil")
+    return _result_response(stored.path)
 
-        # Șterge fișiere vechi
-        for f in os.listdir(UPLOAD_DIR):
-            os.remove(os.path.join(UPLOAD_DIR, f))
 
-        for f in files:
-            path = os.path.join(UPLOAD_DIR, f.name)
-            with open(path, 'wb+') as dest:
-                for chunk in f.chunks():
-                    dest.write(chunk)
+def _readings_from_request(request):
+    # Filtre: ?pod=...&factura=...&luni=24 sau ?de_la=2024-01-01&pana_la=2024-12-31 (perioada de facturare)
+    params = request.GET
+    try:
+        luni = int(params['luni']) if params.get('luni') else None
+        de_la = parse_date(params['de_la']) if params.get('de_la') else None
+        pana_la = parse_date(params['pana_la']) if params.get('pana_la') else None
+    except ValueError:
+        return None
+    return filter_readings(pod=params.get('pod'), factura=params.get('factura'), de_la=de_la, pana_la=pana_la,
+                           luni=luni)
 
-        # Generează fișier excel
-        output_filename = f"rezultate_facturi_{uuid.uuid4().hex[:6]}.xlsx"
-        output_path = os.path.join(RESULT_DIR, output_filename)
 
-        rows = process_pdfs(UPLOAD_DIR, output_path)
-        finalize_excel(rows, output_path)
+def readings_view(request):
+    readings = _readings_from_request(request)
+    if readings is None:
+        return JsonResponse({'error': 'Parametri invalizi'}, status=400)
+    try:
+        limit = int(request.GET.get('limit', 5000))
+    except ValueError:
+        limit = -1
+    if limit < 0:
+        return JsonResponse({'error': 'Parametri invalizi'}, status=400)
+    rows = [data.to_dict() for data in iter_reading_rows(readings[:limit])]
+    return JsonResponse({'count': len(rows), 'rows': rows}, json_dumps_params={'ensure_ascii': False})
 
-        return FileResponse(open(output_path, 'rb'), as_attachment=True, filename=output_filename)
 
-    return render(request, 'procesare/upload.html')
+def readings_excel_view(request):
+    # Export generat din index, fără re-parsarea PDF-urilor; ?format=csv|jsonl|parquet (implicit xlsx)
+    readings = _readings_from_request(request)
+    format = request.GET.get('format') or DEFAULT_EXPORT_FORMAT
+    if readings is None or format not in EXPORTERS:
+        return JsonResponse({'error': 'Parametri invalizi'}, status=400)
+    output = io.BytesIO()
+    export_rows(iter_reading_rows(readings), output, export_format=format, rules=get_validation_rules())
+    output.seek(0)
+    output_filename = export_filename(f"rezultate_facturi_{uuid.uuid4().hex[:6]}", format)
+    return FileResponse(output, as_attachment=True, filename=output_filename)